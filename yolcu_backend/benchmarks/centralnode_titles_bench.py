@@ -0,0 +1,123 @@
+"""
+Proje önerilerinde kullanılan "son yol haritasının ana düğüm başlıkları" sorgusunu büyük yol
+haritalarıyla ölçer.
+
+Karşılaştırılan yollar:
+- legacy:  son Roadmap satırını içeriğiyle yükleyip JSON'u Python'da gezen eski yöntem (birebir kopya)
+- current: db_service.get_centralnode_titles (sadece başlıklar veritabanından okunur)
+- jsonb:   (sadece PostgreSQL) indekslenmemiş yol haritası için jsonb_path_query yolu
+
+Varsayılan olarak geçici bir SQLite veritabanı kullanılır; PostgreSQL ölçmek için DATABASE_URL verin
+(benchmark kendi kullanıcısını oluşturur ve sonunda siler).
+
+Çalıştırma (repo kökünden):
+    python -m yolcu_backend.benchmarks.centralnode_titles_bench
+    DATABASE_URL=postgresql://... python -m yolcu_backend.benchmarks.centralnode_titles_bench --roadmaps 200
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import tempfile
+import time
+import uuid
+
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'titles_bench.db')}"
+
+from yolcu_backend.database import SessionLocal, engine, Base  # noqa: E402
+from yolcu_backend.models import Roadmap, User  # noqa: E402
+from yolcu_backend.schema_upgrades import upgrade_schema  # noqa: E402
+from yolcu_backend.services import db_service, roadmap_index  # noqa: E402
+
+
+def build_roadmap(stage_count: int, nodes_per_stage: int = 4, items_per_side: int = 6) -> dict:
+    item_id = 0
+    stages = []
+    for stage_no in range(stage_count):
+        nodes = []
+        for node_no in range(nodes_per_stage):
+            sides = {}
+            for side in ("leftItems", "rightItems"):
+                sides[side] = []
+                for _ in range(items_per_side):
+                    item_id += 1
+                    sides[side].append({"id": f"uuid_{item_id}", "name": f"Öğrenilecek Konsept {item_id} " * 3})
+            nodes.append({"centralNodeTitle": f"Alt Konu {stage_no}.{node_no}", **sides})
+        stages.append({"stageName": f"Ana Aşama {stage_no}", "subNodes": nodes})
+    return {"diagramTitle": "Benchmark", "mainStages": stages}
+
+
+# --- Eski yaklaşım (karşılaştırma için birebir kopya) ---
+def legacy_centralnode_titles(db, user_id: int) -> list[str]:
+    latest_roadmap = db.query(Roadmap).filter(Roadmap.user_id == user_id).order_by(Roadmap.created_at.desc()).first()
+    if not latest_roadmap:
+        return []
+    content_data = latest_roadmap.content
+    if isinstance(content_data, str):
+        content_data = json.loads(content_data)
+    titles = set()
+    for stage in content_data.get("mainStages") or []:
+        for sub_node in stage.get("subNodes") or []:
+            title = sub_node.get("centralNodeTitle")
+            if title and isinstance(title, str):
+                titles.add(title)
+    return list(titles)
+
+
+def _median_ms(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark for central node title extraction.")
+    parser.add_argument("--roadmaps", type=int, default=50, help="roadmaps stored for the benchmark user")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    # db_service her çağrıda INFO log yazar; ölçümü etkilemesin
+    logging.getLogger("yolcu_backend.services.db_service").setLevel(logging.WARNING)
+    Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
+    is_postgres = engine.dialect.name == "postgresql"
+
+    db = SessionLocal()
+    suffix = uuid.uuid4().hex[:8]
+    user = User(username=f"bench_{suffix}", email=f"bench_{suffix}@example.com", first_name="Bench",
+                last_name="User", password_hash="-")
+    db.add(user)
+    db.commit()
+    try:
+        print(f"database: {engine.dialect.name}, roadmaps per user: {args.roadmaps}")
+        print(f"{'stages':>6} {'content_kb':>10} {'legacy_ms':>10} {'current_ms':>11} {'jsonb_ms':>9}")
+        for stage_count in (4, 12, 30, 60):
+            content = build_roadmap(stage_count)
+            for _ in range(args.roadmaps):
+                roadmap_index.create_roadmap(db, user_id=user.id, content=json.loads(json.dumps(content)))
+            latest_id = db_service.get_latest_roadmap_id(db, user.id)
+            assert sorted(db_service.get_centralnode_titles(db, user.id)) == sorted(legacy_centralnode_titles(db, user.id))
+
+            legacy_ms = _median_ms(lambda: (legacy_centralnode_titles(db, user.id), db.expire_all()), args.repeat)
+            current_ms = _median_ms(lambda: db_service.get_centralnode_titles(db, user.id), args.repeat)
+            jsonb_ms = "-"
+            if is_postgres:
+                jsonb_ms = f"{_median_ms(lambda: db_service._central_node_titles_from_content(db, latest_id), args.repeat):.3f}"
+
+            size_kb = len(json.dumps(content, ensure_ascii=False).encode()) / 1024
+            print(f"{stage_count:>6} {size_kb:>10.1f} {legacy_ms:>10.3f} {current_ms:>11.3f} {jsonb_ms:>9}")
+    finally:
+        db.rollback()
+        db.query(Roadmap).filter(Roadmap.user_id == user.id).delete(synchronize_session=False)
+        db.query(User).filter(User.id == user.id).delete(synchronize_session=False)
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,510 @@
+"""
+Uç nokta (endpoint) seviyesinde yük testi.
+
+yolcu_backend.main uygulamasını ayrı bir uvicorn sürecinde, yerel bir SQLite veritabanı ve sahte
+yapay zeka backend'i (AI_BACKEND=fake) ile başlatır. Ardından gerçekçi bir kullanıcı akışını
+aşama aşama çalıştırır:
+
+    signup -> login -> roadmap_generate -> summaries -> quiz_generate -> cv_upload
+    -> project_suggestions -> project_evaluate -> ws_chat (eşzamanlı hackathon sohbet odaları)
+
+Her aşamada --users kadar sanal kullanıcı aynı anda istek atar. Her uç nokta için p50/p95/p99
+gecikme, saniyedeki istek sayısı (RPS), hata sayısı ve aşama boyunca sunucu sürecinin en yüksek
+RSS değeri raporlanır. Sonuçlar, commit bilgisiyle birlikte JSON olarak kaydedilir; iki sonuç
+dosyası karşılaştırılarak commit'ler arasındaki gerilemeler görülebilir.
+
+Ek bağımlılıklar (httpx, websockets) requirements-bench.txt'dedir:
+    pip install -r requirements-bench.txt
+
+Çalıştırma (repo kökünden):
+    python -m yolcu_backend.benchmarks.endpoint_bench run --users 20 --out bench_before.json
+    python -m yolcu_backend.benchmarks.endpoint_bench compare bench_before.json bench_after.json
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import httpx
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ROADMAP_FIELDS = ["Python", "Frontend Geliştirici", "Veri Bilimi", "DevOps", "Mobil Geliştirme",
+                  "Siber Güvenlik", "Oyun Geliştirme", "Backend Geliştirici"]
+
+CV_TEXT = (
+    "Ahmet Yılmaz - Backend Developer\n"
+    "Deneyim: 3 yıl Python, Django, FastAPI, PostgreSQL ve Docker ile REST API geliştirme.\n"
+    "Projeler: Mikroservis mimarisiyle ödeme sistemi, Redis önbellekli raporlama servisi.\n"
+    "Eğitim: Bilgisayar Mühendisliği, 2020.\n"
+    "Yetenekler: Python, SQL, Git, Linux, CI/CD, AWS, unit testing, agile, teamwork, communication.\n"
+)
+
+
+# ------------------ Ölçüm ------------------
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = (len(sorted_values) - 1) * pct / 100
+    low = int(index)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (index - low)
+
+
+class EndpointStats:
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.errors = 0
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.peak_rss_kb: Optional[int] = None
+
+    def record(self, started: float, ok: bool) -> None:
+        now = time.perf_counter()
+        self.latencies.append(now - started)
+        if not ok:
+            self.errors += 1
+        self.started = started if self.started is None else min(self.started, started)
+        self.finished = now if self.finished is None else max(self.finished, now)
+
+    def summary(self) -> dict:
+        values = sorted(self.latencies)
+        elapsed = (self.finished - self.started) if self.started is not None else 0.0
+        return {
+            "requests": len(values),
+            "errors": self.errors,
+            "p50_ms": round(_percentile(values, 50) * 1000, 2),
+            "p95_ms": round(_percentile(values, 95) * 1000, 2),
+            "p99_ms": round(_percentile(values, 99) * 1000, 2),
+            "mean_ms": round(statistics.fmean(values) * 1000, 2) if values else 0.0,
+            "rps": round(len(values) / elapsed, 2) if elapsed > 0 else 0.0,
+            "peak_rss_mb": round(self.peak_rss_kb / 1024, 1) if self.peak_rss_kb else None,
+        }
+
+
+def read_rss_kb(pid: int) -> Optional[int]:
+    """Sürecin anlık RSS değerini (KB) /proc üzerinden okur; Linux dışında None döner."""
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+class RSSSampler:
+    """Sunucu sürecinin RSS değerini arka planda örnekler; her aşamanın en yüksek değerini tutar."""
+
+    def __init__(self, pid: int, interval: float = 0.05):
+        self.pid = pid
+        self.interval = interval
+        self.peak_kb: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def reset(self) -> None:
+        self.peak_kb = read_rss_kb(self.pid)
+
+    async def _run(self) -> None:
+        while True:
+            rss = read_rss_kb(self.pid)
+            if rss is not None and (self.peak_kb is None or rss > self.peak_kb):
+                self.peak_kb = rss
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+
+# ------------------ Sunucu ------------------
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workdir: str, port: int, latency: str) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.update({
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        "AI_BACKEND": "fake",
+        "AI_FAKE_LATENCY": latency,
+        "GEMINI_API_KEY": env.get("GEMINI_API_KEY", "bench"),
+    })
+    env["PYTHONPATH"] = REPO_ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    log_file = open(os.path.join(workdir, "server.log"), "w")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "yolcu_backend.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=REPO_ROOT, env=env, stdout=log_file, stderr=subprocess.STDOUT,
+    )
+
+
+async def wait_until_ready(base_url: str, process: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError("Server process exited during startup (see server.log).")
+            try:
+                if (await client.get("/openapi.json")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError("Server did not become ready in time.")
+
+
+def seed_hackathons(database_url: str) -> List[int]:
+    """Sohbet odaları için örnek hackathon'ları benchmark veritabanına ekler."""
+    os.environ["DATABASE_URL"] = database_url
+    from yolcu_backend import crud, schemas
+    from yolcu_backend.database import SessionLocal
+    from yolcu_backend.sample_data import HACKATHONS
+
+    db = SessionLocal()
+    try:
+        return [crud.create_hackathon(db, schemas.HackathonCreate(**data)).id for data in HACKATHONS]
+    finally:
+        db.close()
+
+
+# ------------------ Test verileri ------------------
+def build_cv_pdf() -> bytes:
+    import fitz
+
+    document = fitz.open()
+    page = document.new_page()
+    page.insert_text((50, 72), CV_TEXT, fontsize=10)
+    data = document.tobytes()
+    document.close()
+    return data
+
+
+def build_project_zip(file_count: int = 6) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("README.md", "# Görev Yöneticisi\nBasit bir görev takip uygulaması.\n")
+        for index in range(file_count):
+            body = "\n".join(
+                f"def task_{index}_{line}(items):\n    return [item for item in items if item.get('done')]\n"
+                for line in range(20)
+            )
+            archive.writestr(f"app/module_{index}.py", body)
+    return buffer.getvalue()
+
+
+# ------------------ Senaryo ------------------
+class VirtualUser:
+    def __init__(self, index: int, run_id: str):
+        self.username = f"bench_{run_id}_{index}"
+        self.email = f"{self.username}@bench.local"
+        self.password = "Bench-Password-123"
+        self.user_id: Optional[int] = None
+        self.headers: Dict[str, str] = {}
+        self.roadmap: Optional[dict] = None
+        self.project_id: Optional[int] = None
+
+    def roadmap_item_ids(self) -> List[str]:
+        ids = []
+        for stage in (self.roadmap or {}).get("content", {}).get("mainStages", []):
+            for node in stage.get("subNodes", []):
+                for item in node.get("leftItems", []) + node.get("rightItems", []):
+                    ids.append(item["id"])
+        return ids
+
+
+class EndpointBenchmark:
+    def __init__(self, base_url: str, server_pid: int, users: int, summaries_per_user: int,
+                 chat_rooms: int, clients_per_room: int, messages_per_client: int, hackathon_ids: List[int]):
+        self.base_url = base_url
+        self.ws_url = base_url.replace("http://", "ws://", 1)
+        self.users = [VirtualUser(index, str(int(time.time()))) for index in range(users)]
+        self.summaries_per_user = summaries_per_user
+        self.chat_rooms = chat_rooms
+        self.clients_per_room = clients_per_room
+        self.messages_per_client = messages_per_client
+        self.hackathon_ids = hackathon_ids
+        self.sampler = RSSSampler(server_pid)
+        self.stats: Dict[str, EndpointStats] = {}
+        self.cv_pdf = build_cv_pdf()
+        self.project_zip = build_project_zip()
+
+    async def _timed(self, name: str, request) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await request
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            response, ok = None, False
+        self.stats[name].record(started, ok)
+        return response if ok else None
+
+    async def _phase(self, name: str, step) -> None:
+        self.stats[name] = EndpointStats()
+        self.sampler.reset()
+        await asyncio.gather(*(step(user) for user in self.users))
+        self.stats[name].peak_rss_kb = self.sampler.peak_kb
+        summary = self.stats[name].summary()
+        print(f"  {name:<20} {summary['requests']:>5} req  p50={summary['p50_ms']:>8.1f}ms  "
+              f"p95={summary['p95_ms']:>8.1f}ms  rps={summary['rps']:>7.1f}  errors={summary['errors']}")
+
+    # --- Adımlar ---
+    async def _signup(self, client: httpx.AsyncClient, user: VirtualUser) -> None:
+        payload = {"first_name": "Bench", "last_name": "User", "username": user.username, "email": user.email,
+                   "password": user.password}
+        await self._timed("signup", client.post("/signup", json=payload))
+
+    async def _login(self, client: httpx.AsyncClient, user: VirtualUser) -> None:
+        payload = {"email_or_username": user.username, "password": user.password}
+        response = await self._timed("login", client.post("/login", json=payload))
+        if response is not None:
+            data = response.json()
+            user.user_id = data["user"]["id"]
+            user.headers = {"Authorization": f"Bearer {data['access_token']}"}
+
+    async def _roadmap(self, client: httpx.AsyncClient, user: VirtualUser) -> None:
+        field = ROADMAP_FIELDS[self.users.index(user) % len(ROADMAP_FIELDS)]
+        response = await self._timed("roadmap_generate", client.post(
+            "/api/roadmaps/generate", json={"field": field}, headers=user.headers))
+        if response is not None:
+            user.roadmap = response.json()
+
+    async def _summaries(self, client: httpx.AsyncClient, user: VirtualUser) -> None:
+        if user.roadmap is None:
+            return
+        for item_id in user.roadmap_item_ids()[:self.summaries_per_user]:
+            await self._timed("summaries", client.get(
+                f"/api/roadmaps/{user.roadmap['id']}/summaries", params={"item_id": item_id}, headers=user.headers))
+
+    async def _quiz(self, client: httpx.AsyncClient, user: VirtualUser) -> None:
+        if user.roadmap is None:
+            return
+        await self._timed("quiz_generate", client.post(
+            "/api/quizzes/generate", json={"roadmap_id": user.roadmap["id"]}, headers=user.headers))
+
+    async def _cv(self, client: httpx.AsyncClient, user: VirtualUser) -> None:
+        files = {"file": ("cv.pdf", self.cv_pdf, "application/pdf")}
+        await self._timed("cv_upload", client.post("/api/cv/analyze", files=files, headers=user.headers))
+
+    async def _suggestions(self, client: httpx.AsyncClient, user: VirtualUser) -> None:
+        response = await self._timed("project_suggestions", client.get("/project-suggestions", headers=user.headers))
+        if response is not None:
+            for level in response.json().get("project_levels", []):
+                if level["projects"]:
+                    user.project_id = level["projects"][0]["id"]
+                    break
+
+    async def _evaluate(self, client: httpx.AsyncClient, user: VirtualUser) -> None:
+        if user.project_id is None:
+            return
+        files = {"file": ("project.zip", self.project_zip, "application/zip")}
+        await self._timed("project_evaluate", client.post(
+            f"/api/projects/{user.project_id}/evaluate", files=files, headers=user.headers))
+
+    async def _chat_client(self, hackathon_id: int, user: VirtualUser, start: asyncio.Event) -> None:
+        """Her mesajın gönderilmesinden odadaki yayının gönderene geri gelmesine kadar geçen süreyi ölçer."""
+        import websockets
+
+        stats = self.stats["ws_chat"]
+        async with websockets.connect(f"{self.ws_url}/ws/hackathon/{hackathon_id}/{user.user_id}") as websocket:
+            await start.wait()
+            for message_no in range(self.messages_per_client):
+                marker = f"{user.username}#{message_no}"
+                started = time.perf_counter()
+                try:
+                    await websocket.send(marker)
+                    while not (await asyncio.wait_for(websocket.recv(), timeout=10)).endswith(marker):
+                        pass
+                    stats.record(started, True)
+                except (asyncio.TimeoutError, websockets.WebSocketException):
+                    stats.record(started, False)
+                    return
+
+    async def _chat(self) -> None:
+        name = "ws_chat"
+        self.stats[name] = EndpointStats()
+        self.sampler.reset()
+        ready_users = [user for user in self.users if user.user_id is not None]
+        start = asyncio.Event()
+        tasks = []
+        for room_no in range(self.chat_rooms):
+            hackathon_id = self.hackathon_ids[room_no % len(self.hackathon_ids)]
+            for client_no in range(self.clients_per_room):
+                user = ready_users[(room_no * self.clients_per_room + client_no) % len(ready_users)]
+                tasks.append(asyncio.create_task(self._chat_client(hackathon_id, user, start)))
+        # Tüm istemciler bağlandıktan sonra aynı anda mesaj göndermeye başlar
+        await asyncio.sleep(0.5)
+        start.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        self.stats[name].errors += sum(1 for result in results if isinstance(result, Exception))
+        self.stats[name].peak_rss_kb = self.sampler.peak_kb
+        summary = self.stats[name].summary()
+        print(f"  {name:<20} {summary['requests']:>5} msg  p50={summary['p50_ms']:>8.1f}ms  "
+              f"p95={summary['p95_ms']:>8.1f}ms  rps={summary['rps']:>7.1f}  errors={summary['errors']}")
+
+    async def run(self) -> Dict[str, dict]:
+        self.sampler.start()
+        limits = httpx.Limits(max_connections=len(self.users) * 2)
+        try:
+            async with httpx.AsyncClient(base_url=self.base_url, timeout=120, limits=limits) as client:
+                steps = [
+                    ("signup", self._signup),
+                    ("login", self._login),
+                    ("roadmap_generate", self._roadmap),
+                    ("summaries", self._summaries),
+                    ("quiz_generate", self._quiz),
+                    ("cv_upload", self._cv),
+                    ("project_suggestions", self._suggestions),
+                    ("project_evaluate", self._evaluate),
+                ]
+                for name, step in steps:
+                    await self._phase(name, lambda user, step=step: step(client, user))
+            if self.chat_rooms and any(user.user_id is not None for user in self.users):
+                await self._chat()
+        finally:
+            await self.sampler.stop()
+        return {name: stats.summary() for name, stats in self.stats.items()}
+
+
+# ------------------ Sonuçlar ------------------
+def git_metadata() -> dict:
+    def git(*args: str) -> Optional[str]:
+        try:
+            return subprocess.check_output(["git", *args], cwd=REPO_ROOT, stderr=subprocess.DEVNULL,
+                                           text=True).strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    status = git("status", "--porcelain", "--untracked-files=no")
+    return {
+        "commit": git("rev-parse", "HEAD"),
+        "subject": git("log", "-1", "--format=%s"),
+        "dirty": bool(status) if status is not None else None,
+    }
+
+
+def run(args: argparse.Namespace) -> dict:
+    workdir = tempfile.mkdtemp(prefix="yolcu_bench_")
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    print(f"Starting server on {base_url} (workdir: {workdir})")
+    process = start_server(workdir, port, args.latency)
+    try:
+        asyncio.run(wait_until_ready(base_url, process))
+        hackathon_ids = seed_hackathons(f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+        benchmark = EndpointBenchmark(
+            base_url=base_url,
+            server_pid=process.pid,
+            users=args.users,
+            summaries_per_user=args.summaries,
+            chat_rooms=args.chat_rooms,
+            clients_per_room=args.clients_per_room,
+            messages_per_client=args.messages,
+            hackathon_ids=hackathon_ids,
+        )
+        endpoints = asyncio.run(benchmark.run())
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+    result = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git": git_metadata(),
+        "environment": {"python": platform.python_version(), "platform": platform.platform()},
+        "config": {
+            "users": args.users,
+            "summaries_per_user": args.summaries,
+            "chat_rooms": args.chat_rooms,
+            "clients_per_room": args.clients_per_room,
+            "messages_per_client": args.messages,
+            "fake_latency": args.latency,
+        },
+        "endpoints": endpoints,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"Results saved to {args.out}")
+    return result
+
+
+def _delta(before: Optional[float], after: Optional[float]) -> str:
+    if not before or after is None:
+        return "-"
+    return f"{(after - before) / before:+.0%}"
+
+
+def compare(before_path: str, after_path: str) -> None:
+    with open(before_path, "r", encoding="utf-8") as f:
+        before = json.load(f)
+    with open(after_path, "r", encoding="utf-8") as f:
+        after = json.load(f)
+
+    print(f"before: {before['git'].get('commit')} {before['git'].get('subject')}")
+    print(f"after:  {after['git'].get('commit')} {after['git'].get('subject')}")
+    if before["config"] != after["config"]:
+        print("WARNING: benchmark configs differ, numbers are not directly comparable.")
+
+    metrics = ["p50_ms", "p95_ms", "p99_ms", "rps", "peak_rss_mb"]
+    print(f"\n{'endpoint':<20} " + " ".join(f"{metric:>20}" for metric in metrics) + f" {'errors':>10}")
+    for name, after_stats in after["endpoints"].items():
+        before_stats = before["endpoints"].get(name, {})
+        cells = []
+        for metric in metrics:
+            old, new = before_stats.get(metric), after_stats.get(metric)
+            cells.append(f"{new if new is not None else '-':>10} {_delta(old, new):>9}")
+        errors = f"{before_stats.get('errors', '-')}->{after_stats['errors']}"
+        print(f"{name:<20} " + " ".join(cells) + f" {errors:>10}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Endpoint-level benchmark for the Yolcu backend.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Start the app with a fake AI backend and run the scenario.")
+    run_parser.add_argument("--users", type=int, default=20, help="Concurrent virtual users per phase.")
+    run_parser.add_argument("--summaries", type=int, default=3, help="Summary requests per user.")
+    run_parser.add_argument("--chat-rooms", type=int, default=3, help="Concurrent websocket chat rooms.")
+    run_parser.add_argument("--clients-per-room", type=int, default=10, help="Websocket clients per room.")
+    run_parser.add_argument("--messages", type=int, default=20, help="Messages sent by each chat client.")
+    run_parser.add_argument("--latency", default="lognormal:0.8,0.5",
+                            help="Fake AI latency distribution (see services/fake_ai_backend.py).")
+    run_parser.add_argument("--out", help="Write results as JSON to this path.")
+
+    compare_parser = subparsers.add_parser("compare", help="Diff two saved benchmark results.")
+    compare_parser.add_argument("before")
+    compare_parser.add_argument("after")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        run(args)
+    else:
+        compare(args.before, args.after)
+
+
+if __name__ == "__main__":
+    main()
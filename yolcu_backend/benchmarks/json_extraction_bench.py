@@ -0,0 +1,100 @@
+"""
+Ortak JSON çıkarıcı (services/json_extractor.py) ile generator'lardaki eski regex + json.loads
+yaklaşımını karşılaştıran benchmark.
+
+Çalıştırma (repo kökünden):
+    python -m yolcu_backend.benchmarks.json_extraction_bench
+"""
+import json
+import re
+import statistics
+import time
+
+from yolcu_backend.services.json_extractor import StreamingJSONExtractor, extract_json
+
+CHUNK_SIZE = 64  # Gemini akışındaki tipik parça boyutuna yakın
+
+
+def build_roadmap_response(stage_count: int, nodes_per_stage: int = 3, items_per_side: int = 4) -> str:
+    item_id = 0
+    stages = []
+    for stage_no in range(stage_count):
+        nodes = []
+        for node_no in range(nodes_per_stage):
+            sides = {}
+            for side in ("leftItems", "rightItems"):
+                sides[side] = []
+                for _ in range(items_per_side):
+                    item_id += 1
+                    sides[side].append({"id": f"uuid_{item_id}", "name": f"Öğrenilecek Konsept {item_id}"})
+            nodes.append({"centralNodeTitle": f"Alt Konu {stage_no}.{node_no}", **sides})
+        stages.append({"stageName": f"Ana Aşama {stage_no}", "subNodes": nodes})
+    document = {"diagramTitle": "Python", "mainStages": stages}
+    return "```json\n" + json.dumps(document, ensure_ascii=False, indent=2) + "\n```"
+
+
+# --- Eski yaklaşımlar (karşılaştırma için birebir kopya) ---
+def legacy_roadmap_parse(raw_text: str) -> dict:
+    clean_text = re.sub(r'```json\s*|\s*```', '', raw_text, flags=re.DOTALL).strip()
+    return json.loads(clean_text)
+
+
+def legacy_evaluator_parse(raw_text: str) -> str:
+    try:
+        clean_text = re.sub(r'```json\s*|\s*```', '', raw_text, flags=re.DOTALL)
+        clean_text = re.sub(r'[\*]', '', clean_text)
+        clean_text = clean_text.strip()
+        json.loads(clean_text)
+        return clean_text
+    except json.JSONDecodeError:
+        start_index = raw_text.find('{')
+        end_index = raw_text.rfind('}')
+        json_part = re.sub(r'[\*]', '', raw_text[start_index: end_index + 1])
+        json.loads(json_part)
+        return json_part
+
+
+def _median_ms(fn, repeat: int = 30) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def _stream(raw_text: str) -> tuple[int, int]:
+    """Metni parça parça besler; ilk aşamanın kaçıncı parçada çıktığını ve toplam parça sayısını döner."""
+    extractor = StreamingJSONExtractor(array_key="mainStages")
+    first_stage_chunk = None
+    chunks = [raw_text[i:i + CHUNK_SIZE] for i in range(0, len(raw_text), CHUNK_SIZE)]
+    for index, chunk in enumerate(chunks, start=1):
+        if extractor.feed(chunk) and first_stage_chunk is None:
+            first_stage_chunk = index
+    extractor.result()
+    return first_stage_chunk or len(chunks), len(chunks)
+
+
+def main() -> None:
+    print(f"{'stages':>6} {'size_kb':>8} {'legacy_ms':>10} {'extract_ms':>11} {'legacy_fallback_ms':>19} "
+          f"{'stream_total_ms':>16} {'first_stage_at':>15}")
+    for stage_count in (2, 6, 12, 30):
+        raw = build_roadmap_response(stage_count)
+        # Başında/sonunda açıklama olan cevap, eski koddaki yedek (find/rfind) yolunu tetikler
+        chatty = "İşte yol haritanız:\n" + raw + "\nUmarım faydalı olur!"
+
+        legacy_ms = _median_ms(lambda: legacy_roadmap_parse(raw))
+        extract_ms = _median_ms(lambda: extract_json(raw))
+        fallback_ms = _median_ms(lambda: legacy_evaluator_parse(chatty))
+        stream_ms = _median_ms(lambda: _stream(raw))
+        first_chunk, total_chunks = _stream(raw)
+
+        print(f"{stage_count:>6} {len(raw.encode()) / 1024:>8.1f} {legacy_ms:>10.3f} {extract_ms:>11.3f} "
+              f"{fallback_ms:>19.3f} {stream_ms:>16.3f} {first_chunk / total_chunks:>14.0%}")
+
+    print("\nfirst_stage_at: ilk ana aşamanın, cevabın yüzde kaçı geldiğinde kullanıcıya gönderilebildiği "
+          "(eski yaklaşımda her zaman %100).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+CV anahtar kelime skorlamasını (services/keyword_engine.py) eski CVAnalyzer yaklaşımıyla karşılaştırır.
+
+Karşılaştırılan yollar:
+- legacy:      eski score_cv_text adımları (extract_keywords + ats_score_advanced; metin iki kez
+               kelimelere ayrılır, anahtar kelimeler aynı CV'den çıkarıldığı için eksik listesi hep boş)
+- legacy_dict: eski ats_score_advanced'e beceri sözlüğünün tüm ifadeleri verilince (ifade başına
+               metinde alt dizi araması, O(ifade x metin))
+- current:     KeywordEngine.analyze (tek kelimelere ayırma + Aho-Corasick ile tek geçiş)
+
+CV'ler sayfa başına ~500 kelimelik sentetik metinlerdir; varsayılan ölçüm 5 sayfalık CV'yi içerir.
+
+Çalıştırma (repo kökünden):
+    python -m yolcu_backend.benchmarks.keyword_engine_bench
+    python -m yolcu_backend.benchmarks.keyword_engine_bench --pages 1 5 10 --repeat 100
+"""
+import argparse
+import random
+import re
+import statistics
+import time
+from collections import Counter
+from typing import Any, Dict, List
+
+from yolcu_backend.services.keyword_engine import KeywordEngine, get_keyword_engine
+from yolcu_backend.services.skill_dictionary import SKILLS
+
+WORDS_PER_PAGE = 500
+
+FILLER = (
+    "developed maintained designed implemented improved team project customer requirements performance "
+    "production service application system feature release responsible collaborated delivered analysis "
+    "geliştirdim tasarladım ekip proje müşteri gereksinim performans uygulama sistem özellik sorumlu "
+    "university bachelor degree computer engineering bilgisayar mühendisliği üniversite stajyer intern "
+    "and the with for in of ve ile için bir"
+).split()
+SKILL_MENTIONS = [
+    "Python", "Django", "PostgreSQL", "Docker", "Kubernetes", "RESTful API", "React.js", "TypeScript",
+    "CI/CD", "GitHub Actions", "machine learning", "pandas", "scikit-learn", "Git", "Linux", "Redis",
+    "makine öğrenmesi", "Node.js", "C++", "unit tests", "Agile", "Scrum", "AWS", "Terraform",
+]
+
+
+def build_cv(pages: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(pages * WORDS_PER_PAGE // 12):
+        words = [rng.choice(FILLER) for _ in range(10)] + rng.sample(SKILL_MENTIONS, 2)
+        rng.shuffle(words)
+        lines.append(" ".join(words).capitalize() + ".")
+    return "\n".join(lines)
+
+
+# --- Eski yaklaşım (karşılaştırma için birebir kopya) ---
+def legacy_extract_keywords(text: str, top_n: int = 15) -> Dict[str, List[str]]:
+    words = re.findall(r"\b[a-zA-ZğüşöçıİĞÜŞÖÇ]+\b", text.lower())
+    stopwords = {"ve", "ile", "bir", "için", "the", "to", "of", "in", "a", "an", "on", "at"}
+    filtered_words = [w for w in words if w not in stopwords and len(w) > 2]
+    counts = Counter(filtered_words).most_common(top_n)
+
+    keywords = [w for w, _ in counts]
+    return {"found": keywords, "missing": []}
+
+
+def legacy_ats_score_basic(text: str, keywords: List[str]) -> Dict[str, Any]:
+    text_lower = text.lower()
+    found = [kw for kw in keywords if kw.lower() in text_lower]
+    missing = [kw for kw in keywords if kw.lower() not in text_lower]
+    score = round(len(found) / len(keywords) * 100, 2) if keywords else 0
+
+    return {
+        "basic_score": score,
+        "found_keywords": found,
+        "missing_keywords": missing,
+        "total_keywords": len(keywords),
+        "found_count": len(found),
+    }
+
+
+def legacy_ats_score_advanced(text: str, keywords: List[str]) -> Dict[str, Any]:
+    base_result = legacy_ats_score_basic(text, keywords)
+
+    counts = Counter(re.findall(r"\b[a-zA-ZğüşöçıİĞÜŞÖÇ]+\b", text.lower()))
+    weighted_score = 0
+    for kw in keywords:
+        weighted_score += min(10, counts.get(kw.lower(), 0))
+
+    max_weighted = len(keywords) * 10
+    weighted_pct = (weighted_score / max_weighted) * 100 if max_weighted else 0
+
+    final_score = round((base_result["basic_score"] + weighted_pct) / 2, 2)
+
+    base_result["final_score"] = final_score
+    return base_result
+
+
+def legacy_score(cv_text: str) -> Dict[str, Any]:
+    keywords = legacy_extract_keywords(cv_text)["found"]
+    return legacy_ats_score_advanced(cv_text, keywords)
+
+
+def _median_ms(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark for CV keyword scoring.")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 5, 10], help="CV lengths in pages")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    KeywordEngine()
+    build_ms = (time.perf_counter() - start) * 1000
+    engine = get_keyword_engine()
+    terms = [term for skill, aliases in SKILLS.items() for term in (skill, *aliases)]
+    print(f"dictionary: {len(SKILLS)} skills, {len(terms)} terms, automaton build: {build_ms:.2f} ms (once per process)")
+
+    print(f"{'pages':>5} {'words':>6} {'legacy_ms':>10} {'legacy_dict_ms':>15} {'current_ms':>11} {'missing':>8}")
+    for pages in args.pages:
+        cv_text = build_cv(pages)
+        legacy_ms = _median_ms(lambda: legacy_score(cv_text), args.repeat)
+        legacy_dict_ms = _median_ms(lambda: legacy_ats_score_advanced(cv_text, terms), args.repeat)
+        current_ms = _median_ms(lambda: engine.analyze(cv_text), args.repeat)
+        # Eski yolda eksik listesi hep boştur; yenisinde hedef profile göre dolar
+        assert legacy_score(cv_text)["missing_keywords"] == []
+        missing = len(engine.analyze(cv_text)["missing_keywords"])
+        print(f"{pages:>5} {len(cv_text.split()):>6} {legacy_ms:>10.3f} {legacy_dict_ms:>15.3f} {current_ms:>11.3f} "
+              f"{missing:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,92 +1,99 @@
-import re
 import fitz
 import chardet
 import json
-from typing import List, Dict, Any
+import logging
+from typing import List, Dict, Any, Optional
 from langdetect import detect, DetectorFactory
-from collections import Counter
 from yolcu_backend.services.ai_service import GeminiService
+from yolcu_backend.services.keyword_engine import KeywordEngine, TokenizedText, get_keyword_engine, keyword_score
+from yolcu_backend.services.prompt_budget import PromptBudget
 from yolcu_backend.prompts.cv_prompts import CV_FEEDBACK_PROMPT
 
 DetectorFactory.seed = 0  # Dil tespiti deterministik olsun diye
 
+logger = logging.getLogger(__name__)
+
+# Geri bildirim prompt'unun toplam token bütçesi (CV metni bölüm/paragraf sınırlarından kısaltılır)
+CV_FEEDBACK_TOKEN_BUDGET = 2000
+
+BASIC_SCORE_FIELDS = ("basic_score", "found_keywords", "missing_keywords", "total_keywords", "found_count")
+
 
 class CVAnalyzer:
-    def __init__(self, ai_service: GeminiService):
+    def __init__(self, ai_service: GeminiService, token_budget: Optional[int] = None):
         self.gemini = ai_service
+        self.prompt_budget = PromptBudget(CV_FEEDBACK_PROMPT, token_budget or CV_FEEDBACK_TOKEN_BUDGET)
 
     # ------------------ CV Okuma ------------------
+    # Bayt tabanlı okuyucular statiktir; yükleme hattının süreç havuzunda çalıştırılabilir
+    @staticmethod
+    def read_pdf_bytes(data: bytes) -> str:
+        """Bellekteki PDF'ten metin okur."""
+        with fitz.open(stream=data, filetype="pdf") as doc:
+            text = "".join(page.get_text("text") for page in doc)
+        return text.strip()
+
+    @staticmethod
+    def read_txt_bytes(data: bytes) -> str:
+        """Bellekteki TXT'den metin okur (encoding tespit ederek)."""
+        enc = chardet.detect(data)["encoding"] or "utf-8"
+        return data.decode(enc, errors="ignore")
+
+    @staticmethod
+    def read_cv_bytes(data: bytes, file_name: str) -> str:
+        """Yüklenen CV'yi (PDF veya TXT) dosya adının uzantısına göre okur."""
+        if file_name.lower().endswith(".pdf"):
+            return CVAnalyzer.read_pdf_bytes(data)
+        elif file_name.lower().endswith(".txt"):
+            return CVAnalyzer.read_txt_bytes(data)
+        else:
+            raise ValueError("Unsupported file format. Only PDF or TXT allowed.")
+
     def read_pdf(self, file_path: str) -> str:
         """PDF dosyasından metin okur."""
-        text = ""
-        with fitz.open(file_path) as doc:
-            for page in doc:
-                text += page.get_text("text")
-        return text.strip()
+        with open(file_path, "rb") as f:
+            return self.read_pdf_bytes(f.read())
 
     def read_txt(self, file_path: str) -> str:
         """TXT dosyasından metin okur (encoding tespit ederek)."""
         with open(file_path, "rb") as f:
-            raw_data = f.read()
-        enc = chardet.detect(raw_data)["encoding"] or "utf-8"
-        return raw_data.decode(enc, errors="ignore")
+            return self.read_txt_bytes(f.read())
 
     def read_cv(self, file_path: str) -> str:
         """CV dosyasını (PDF veya TXT) okur."""
-        if file_path.lower().endswith(".pdf"):
-            return self.read_pdf(file_path)
-        elif file_path.lower().endswith(".txt"):
-            return self.read_txt(file_path)
-        else:
-            raise ValueError("Unsupported file format. Only PDF or TXT allowed.")
+        with open(file_path, "rb") as f:
+            return self.read_cv_bytes(f.read(), file_path)
 
     # ------------------ Anahtar Kelime Analizi ------------------
-    def extract_keywords(self, text: str, top_n: int = 15) -> Dict[str, List[str]]:
+    # Metin bir kez kelimelere ayrılır; eşleştirme keyword_engine'deki Aho-Corasick otomatıyla yapılır
+    @staticmethod
+    def extract_keywords(text: str, top_n: int = 15) -> Dict[str, List[str]]:
         """CV'den en sık geçen anahtar kelimeleri çıkarır."""
-        words = re.findall(r"\b[a-zA-ZğüşöçıİĞÜŞÖÇ]+\b", text.lower())
-        stopwords = {"ve", "ile", "bir", "için", "the", "to", "of", "in", "a", "an", "on", "at"}
-        filtered_words = [w for w in words if w not in stopwords and len(w) > 2]
-        counts = Counter(filtered_words).most_common(top_n)
+        keywords = KeywordEngine.top_keywords(TokenizedText.from_text(text), top_n)
+        return {"found": keywords, "missing": []}  # eksikler hedef profile göre analyze_keywords'te
 
-        keywords = [w for w, _ in counts]
-        return {"found": keywords, "missing": []}  # missing ATS analizinde dolacak
-
-    def ats_score_basic(self, text: str, keywords: List[str]) -> Dict[str, Any]:
+    @staticmethod
+    def ats_score_basic(text: str, keywords: List[str]) -> Dict[str, Any]:
         """Anahtar kelime eşleşmesine göre basit ATS skoru döndürür."""
-        text_lower = text.lower()
-        found = [kw for kw in keywords if kw.lower() in text_lower]
-        missing = [kw for kw in keywords if kw.lower() not in text_lower]
-        score = round(len(found) / len(keywords) * 100, 2) if keywords else 0
-
-        return {
-            "basic_score": score,
-            "found_keywords": found,
-            "missing_keywords": missing,
-            "total_keywords": len(keywords),
-            "found_count": len(found),
-        }
-
-    def ats_score_advanced(self, text: str, keywords: List[str]) -> Dict[str, Any]:
-        """ATS skoru + ağırlıklı analiz (önemli keywordler daha fazla puan getirir)."""
-        base_result = self.ats_score_basic(text, keywords)
+        result = CVAnalyzer.ats_score_advanced(text, keywords)
+        return {key: result[key] for key in BASIC_SCORE_FIELDS}
 
-        counts = Counter(re.findall(r"\b[a-zA-ZğüşöçıİĞÜŞÖÇ]+\b", text.lower()))
-        weighted_score = 0
-        for kw in keywords:
-            weighted_score += min(10, counts.get(kw.lower(), 0))  # tekrar limiti
-
-        # Weighted score'u normalize et
-        max_weighted = len(keywords) * 10  # en fazla olabilecek değer
-        weighted_pct = (weighted_score / max_weighted) * 100 if max_weighted else 0
-
-        # Final score = base + weighted (her ikisi % üzerinden)
-        final_score = round((base_result["basic_score"] + weighted_pct) / 2, 2)
+    @staticmethod
+    def ats_score_advanced(text: str, keywords: List[str]) -> Dict[str, Any]:
+        """ATS skoru + ağırlıklı analiz (önemli keywordler daha fazla puan getirir)."""
+        return keyword_score(KeywordEngine.match(TokenizedText.from_text(text), keywords), keywords)
 
-        base_result["final_score"] = final_score
-        return base_result
+    @staticmethod
+    def analyze_keywords(text: str, target_profile: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Beceri sözlüğüyle eşleşen becerileri ve hedef profile göre bulunan/eksik anahtar kelimeleri,
+        skorlarla birlikte döndürür. target_profile verilmezse CV'ye en uygun profil seçilir.
+        """
+        return get_keyword_engine().analyze(text, target_profile)
 
     # ------------------ Dil Tespiti ------------------
-    def detect_language(self, text: str) -> str:
+    @staticmethod
+    def detect_language(text: str) -> str:
         """CV'nin dilini tespit eder."""
         try:
             lang = detect(text[:1000])  # ilk 1000 karakter
@@ -111,14 +118,16 @@ class CVAnalyzer:
         return tips
 
     # ------------------ AI Feedback ------------------
-    def generate_ai_feedback(self, cv_text: str, issues: Dict[str, Any]) -> str:
+    async def generate_ai_feedback(self, cv_text: str, issues: Dict[str, Any]) -> str:
         """Gemini ile ATS odaklı geri bildirim üretir ve gereksiz karakterleri temizler."""
         try:
-            prompt = CV_FEEDBACK_PROMPT.format(
+            prompt, budgeted = self.prompt_budget.build(
+                "cv_text", cv_text,
                 issues_context=json.dumps(issues, ensure_ascii=False, indent=2),
-                cv_text=cv_text[:4000]  # 4K karakter limiti
             )
-            response = self.gemini.generate_content(prompt)
+            if budgeted.truncated:
+                logger.info("CV text shortened for feedback prompt: %s", budgeted.report())
+            response = await self.gemini.generate_content_async(prompt, generator="cv_feedback")
 
             # --- Temizleme ---
             cleaned = response.replace("*", "")  # yıldız işaretlerini kaldır
@@ -129,14 +138,14 @@ class CVAnalyzer:
             return f"AI feedback error: {e}"
 
     # ------------------ Anahtar Analiz + Feedback ------------------
-    def analyze_cv(self, file_path: str, keywords: List[str]) -> Dict[str, Any]:
+    async def analyze_cv(self, file_path: str, keywords: List[str]) -> Dict[str, Any]:
         """Anahtar kelime + ATS analizi + AI feedback döndürür."""
         try:
             cv_text = self.read_cv(file_path)
-            basic_score = self.ats_score_basic(cv_text, keywords)
             advanced_score = self.ats_score_advanced(cv_text, keywords)
+            basic_score = {key: advanced_score[key] for key in BASIC_SCORE_FIELDS}
             language = self.detect_language(cv_text)
-            feedback = self.generate_ai_feedback(cv_text, advanced_score)
+            feedback = await self.generate_ai_feedback(cv_text, advanced_score)
             tips = self.get_ats_optimization_tips(advanced_score)
 
             return {
@@ -150,3 +159,14 @@ class CVAnalyzer:
             }
         except Exception as e:
             return {"success": False, "error": str(e)}
+
+
+def score_cv_text(cv_text: str, target_profile: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Geri bildirimden önceki CPU yoğun adımlar (anahtar kelime, ATS skoru, dil tespiti).
+    Yükleme hattının süreç havuzunda çalıştırıldığı için modül seviyesindedir.
+    """
+    return {
+        "advanced": CVAnalyzer.analyze_keywords(cv_text, target_profile),
+        "language": CVAnalyzer.detect_language(cv_text),
+    }
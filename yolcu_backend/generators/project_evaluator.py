@@ -1,69 +1,94 @@
+import asyncio
+import hashlib
 import json
-import re
+import logging
 import fitz  # PyMuPDF
-import os
-import zipfile
-import tempfile
+from typing import Dict, List, Optional, Tuple
 from yolcu_backend.services.ai_service import GeminiService
-from yolcu_backend.prompts.evaluation_prompt import EVALUATION_PROMPT
+from yolcu_backend.services.json_extractor import extract_json
+from yolcu_backend.services.prompt_budget import FILE_HEADER, DroppedPart, PromptBudget
+from yolcu_backend.services.zip_ingest import ZipLimits, read_zip
+from yolcu_backend.prompts.evaluation_prompt import EVALUATION_PROMPT, EVALUATION_CHUNK_PROMPT, \
+    EVALUATION_REDUCE_PROMPT
 
+logger = logging.getLogger(__name__)
+
+# Değerlendirme prompt'unun toplam token bütçesi; proje kodu dosya/bölüm/paragraf sınırlarından kısaltılır
+EVALUATION_TOKEN_BUDGET = 30000
+# Parçalı değerlendirmede en fazla parça sayısı ve aynı anda değerlendirilen parça sayısı
+EVALUATION_MAX_CHUNKS = 8
+EVALUATION_CONCURRENCY = 4
+# Bölünen dosyanın sonraki parçasına eklenen "(devamı)" başlığı için ayrılan pay
+CONTINUATION_HEADER_TOKENS = 30
+FILE_LIST_MAX_NAMES = 200
+# Dosya başlığı olmayan içerik (ör. PDF) için kullanılan ad
+UNNAMED_FILE = "document"
 
 # ARTIK DESTEKLENEN UZANTI LİSTESİ YOK
 
 class ProjectEvaluator:
-    def __init__(self, ai_service: GeminiService):
+    def __init__(self, ai_service: GeminiService, token_budget: Optional[int] = None, map_reduce: bool = False,
+                 chunk_token_budget: Optional[int] = None, max_chunks: int = EVALUATION_MAX_CHUNKS,
+                 concurrency: int = EVALUATION_CONCURRENCY):
         """
         Initializes the ProjectEvaluator with an AI service instance.
+        token_budget: maximum prompt size in tokens; larger projects are trimmed to fit,
+        or split into parts of chunk_token_budget when map_reduce is enabled. At most max_chunks parts
+        are evaluated, concurrency of them at a time.
         """
         self.ai_service = ai_service
+        self.prompt_budget = PromptBudget(EVALUATION_PROMPT, token_budget or EVALUATION_TOKEN_BUDGET)
+        self.map_reduce = map_reduce
+        self.chunk_budget = PromptBudget(EVALUATION_CHUNK_PROMPT, chunk_token_budget or EVALUATION_TOKEN_BUDGET)
+        self.reduce_budget = PromptBudget(EVALUATION_REDUCE_PROMPT, token_budget or EVALUATION_TOKEN_BUDGET)
+        self.max_chunks = max(1, max_chunks)
+        self.concurrency = max(1, concurrency)
 
     def read_project_file(self, file_path: str, original_filename: str) -> str:
+        """Reads a project file from disk; see read_project_bytes."""
+        with open(file_path, 'rb') as f:
+            return self.read_project_bytes(f.read(), original_filename)
+
+    @staticmethod
+    def read_project_bytes(data: bytes, original_filename: str, zip_limits: Optional[ZipLimits] = None) -> str:
+        """Reads an uploaded project from memory; see ingest_project_bytes."""
+        return ProjectEvaluator.ingest_project_bytes(data, original_filename, zip_limits)[0]
+
+    @staticmethod
+    def ingest_project_bytes(data: bytes, original_filename: str,
+                             zip_limits: Optional[ZipLimits] = None) -> Tuple[str, List[Dict]]:
         """
-        Reads a project file, extracting text content using a best-effort approach.
-        - Handles PDF and ZIP files with special logic.
-        - Attempts to read any other file as text; fails if it's a binary file.
+        Reads an uploaded project from memory, extracting text content using a best-effort approach.
+        - PDF: page text.
+        - ZIP: members are streamed from the archive within zip_limits (see zip_ingest); vendor/build
+          directories, lockfiles, minified and binary files are skipped and source files come first.
+        - Anything else is read as UTF-8 text; fails if it's a binary file.
+        Returns the text and the list of skipped files. Static so that the upload pipeline can run it
+        in a process pool.
         """
         lower_filename = original_filename.lower()
 
         try:
             # PDF dosyalarını oku
             if lower_filename.endswith('.pdf'):
-                text = ""
-                with fitz.open(file_path) as doc:
-                    for page in doc:
-                        text += page.get_text()
-                return text
+                with fitz.open(stream=data, filetype="pdf") as doc:
+                    return "".join(page.get_text() for page in doc), []
 
-            # ZIP arşivlerini işle
+            # ZIP arşivlerini işle (üyeler diske çıkarılmadan, sınırlı okunur)
             elif lower_filename.endswith('.zip'):
-                all_text_content = []
-                with zipfile.ZipFile(file_path, 'r') as zip_ref:
-                    with tempfile.TemporaryDirectory() as temp_dir:
-                        zip_ref.extractall(temp_dir)
-
-                        for root, _, files in os.walk(temp_dir):
-                            for filename in files:
-                                file_to_read_path = os.path.join(root, filename)
-                                try:
-                                    # Her dosyayı metin olarak okumayı dene
-                                    with open(file_to_read_path, 'r', encoding='utf-8', errors='strict') as f:
-                                        content = f.read()
-                                        all_text_content.append(f"--- Dosya: {filename} ---\n{content}")
-                                except (UnicodeDecodeError, IOError):
-                                    # Okunamayanlar (binary dosyalar) atlanır
-                                    print(f"Atlanan binary dosya (ZIP içinde): {filename}")
-                                    continue
-
-                if not all_text_content:
+                project = read_zip(data, zip_limits)
+                if project.skipped:
+                    logger.info(f"Skipped {len(project.skipped)} entries in {original_filename}: "
+                                f"{[(skipped.path, skipped.reason) for skipped in project.skipped[:20]]}")
+                if not project.files:
                     raise ValueError("ZIP archive does not contain any readable text files.")
-                return "\n\n".join(all_text_content)
+                return project.text(), project.skipped_report()
 
             # Diğer tüm dosyalar için metin olarak okumayı dene
             else:
                 try:
-                    with open(file_path, 'r', encoding='utf-8', errors='strict') as f:
-                        return f.read()
-                except (UnicodeDecodeError, IOError):
+                    return data.decode('utf-8', errors='strict'), []
+                except UnicodeDecodeError:
                     # Bu bir binary dosya ise, hata fırlat
                     raise ValueError(
                         f"'{original_filename}' dosyası metin olarak okunamadı. "
@@ -75,47 +100,166 @@ class ProjectEvaluator:
             print(f"Error processing file {original_filename}: {e}")
             raise
 
-    def evaluate_project(self, project_code: str, original_suggestion: dict) -> str:
+    @staticmethod
+    def file_names(project_code: str) -> List[str]:
+        """Names of the files in the project text ("--- Dosya: x ---" headers)."""
+        names = FILE_HEADER.findall(project_code)
+        return names or ([UNNAMED_FILE] if project_code.strip() else [])
+
+    async def evaluate_project(self, project_code: str, original_suggestion: dict) -> str:
         """
         Generates a structured JSON evaluation based on the user's code
-        and the original project suggestion.
+        and the original project suggestion. The files that were evaluated are listed under "covered_files".
+        If the code does not fit the token budget, it is evaluated in parts when map-reduce is enabled;
+        otherwise the parts left out of the prompt are listed under "dropped_content".
         """
-        prompt = EVALUATION_PROMPT.format(
-            suggestion_title=original_suggestion.get('title', 'Başlık belirtilmemiş'),
-            suggestion_description=original_suggestion.get('description', 'Açıklama belirtilmemiş'),
-            project_code=project_code
-        )
-        raw_evaluation = self.ai_service.generate_content(prompt)
-        print(f"--- Raw AI Evaluation Response ---\n{raw_evaluation}")
+        fields = {
+            "suggestion_title": original_suggestion.get('title', 'Başlık belirtilmemiş'),
+            "suggestion_description": original_suggestion.get('description', 'Açıklama belirtilmemiş'),
+        }
+        prompt, budgeted = self.prompt_budget.build("project_code", project_code, **fields)
+        if budgeted.truncated and self.map_reduce:
+            return await self._evaluate_map_reduce(project_code, fields)
+
+        raw_evaluation = await self.ai_service.generate_content_async(prompt, generator="project_evaluation")
+        logger.debug("Raw AI evaluation response: %s", raw_evaluation)
         cleaned_json = self._clean_and_parse_json_string(raw_evaluation)
-        print(f"--- Cleaned & Parsed JSON ---\n{cleaned_json}")
-        return cleaned_json
+        logger.debug("Cleaned & parsed evaluation JSON: %s", cleaned_json)
+
+        evaluation = json.loads(cleaned_json)
+        dropped_files = {part.name for part in budgeted.dropped if part.unit == "file" and not part.partial}
+        evaluation["covered_files"] = [name for name in self.file_names(project_code) if name not in dropped_files]
+        if budgeted.truncated:
+            evaluation["dropped_content"] = budgeted.report()
+        return json.dumps(evaluation, ensure_ascii=False)
+
+    # ------------------ Map-reduce (büyük projeler) ------------------
+    async def _evaluate_map_reduce(self, project_code: str, fields: Dict[str, str]) -> str:
+        """
+        Splits the project into file groups that fit the chunk budget, evaluates up to max_chunks of them
+        concurrently (map) and merges the partial findings into the usual evaluation JSON (reduce).
+        """
+        overhead = self.chunk_budget.count_tokens(EVALUATION_CHUNK_PROMPT.format(
+            **fields, file_list=self._format_file_list(self.file_names(project_code)), project_code="",
+            part_no=self.max_chunks, part_count=self.max_chunks,
+        ))
+        chunk_tokens = max(1, self.chunk_budget.max_tokens - overhead - CONTINUATION_HEADER_TOKENS)
+        parts = self._label_parts(self.chunk_budget.chunk(project_code, chunk_tokens))
+        evaluated, left_out = parts[:self.max_chunks], parts[self.max_chunks:]
+        logger.info(f"Evaluating project in {len(evaluated)} parts ({len(left_out)} parts over the limit)")
+
+        file_list = self._format_file_list(list(dict.fromkeys(name for names, _ in evaluated for name in names)))
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def evaluate_part(part_no: int, code: str) -> Optional[dict]:
+            prompt = EVALUATION_CHUNK_PROMPT.format(**fields, file_list=file_list, project_code=code,
+                                                    part_no=part_no, part_count=len(evaluated))
+            async with semaphore:
+                try:
+                    raw = await self.ai_service.generate_content_async(prompt, generator="project_evaluation",
+                                                                       template="evaluation_chunk")
+                except Exception as e:
+                    logger.warning(f"Evaluation of part {part_no}/{len(evaluated)} failed: {e}")
+                    return None
+            try:
+                parsed = extract_json(raw.replace('*', ''))
+                if isinstance(parsed, dict):
+                    return parsed
+            except Exception:
+                pass
+            self.ai_service.record_json_parse_failure("project_evaluation", "evaluation_chunk")
+            return None
+
+        findings = await asyncio.gather(*(evaluate_part(part_no, code)
+                                          for part_no, (_, code) in enumerate(evaluated, start=1)))
+        succeeded = [(names, code, finding) for (names, code), finding in zip(evaluated, findings) if finding is not None]
+        failed = [part for part, finding in zip(evaluated, findings) if finding is None]
+        if not succeeded:
+            raise RuntimeError("Project evaluation failed for every part.")
+
+        covered = list(dict.fromkeys(name for names, _, _ in succeeded for name in names))
+        partial_findings = "\n\n".join(
+            f"--- Parça {part_no} ({', '.join(names)}) ---\n{json.dumps(finding, ensure_ascii=False, indent=2)}"
+            for part_no, (names, _, finding) in enumerate(succeeded, start=1)
+        )
+        prompt, _ = self.reduce_budget.build("partial_findings", partial_findings, **fields,
+                                             file_list=self._format_file_list(covered))
+        raw_evaluation = await self.ai_service.generate_content_async(prompt, generator="project_evaluation",
+                                                                      template="evaluation_reduce")
+        evaluation = json.loads(self._clean_and_parse_json_string(raw_evaluation))
+        evaluation["covered_files"] = covered
+        evaluation["evaluated_parts"] = len(succeeded)
+
+        dropped = self._dropped_parts(left_out + failed, covered)
+        if dropped:
+            evaluation["dropped_content"] = {
+                "budget_tokens": self.chunk_budget.max_tokens * self.max_chunks,
+                "kept_tokens": sum(self.chunk_budget.count_tokens(code) for _, code, _ in succeeded),
+                "dropped_tokens": sum(part.tokens for part in dropped),
+                "dropped": [part.to_dict() for part in dropped],
+                "failed_parts": len(failed),
+            }
+        return json.dumps(evaluation, ensure_ascii=False)
+
+    @staticmethod
+    def _label_parts(chunks: List[str]) -> List[Tuple[List[str], str]]:
+        """
+        (file names, code) for each chunk. A chunk that continues a file split across chunks is
+        prefixed with a "(devamı)" header so the model knows which file it is reading.
+        """
+        parts = []
+        current_name = None
+        for chunk in chunks:
+            names = FILE_HEADER.findall(chunk)
+            if not FILE_HEADER.match(chunk):
+                if current_name is not None:
+                    chunk = f"--- Dosya: {current_name} (devamı) ---\n{chunk}"
+                    names = [current_name, *names]
+                elif not names:
+                    names = [UNNAMED_FILE]
+            if names:
+                current_name = names[-1]
+            parts.append((list(dict.fromkeys(names)), chunk))
+        return parts
+
+    def _dropped_parts(self, parts: List[Tuple[List[str], str]], covered: List[str]) -> List[DroppedPart]:
+        dropped: Dict[str, DroppedPart] = {}
+        for names, code in parts:
+            tokens = self.chunk_budget.count_tokens(code)
+            for name in names:
+                if name in dropped:
+                    dropped[name].tokens += tokens // len(names)
+                else:
+                    dropped[name] = DroppedPart(unit="file", name=name, tokens=tokens // len(names),
+                                                partial=name in covered)
+        return list(dropped.values())
+
+    @staticmethod
+    def _format_file_list(names: List[str]) -> str:
+        listed = ", ".join(names[:FILE_LIST_MAX_NAMES])
+        if len(names) > FILE_LIST_MAX_NAMES:
+            listed += f" ve {len(names) - FILE_LIST_MAX_NAMES} diğer"
+        return listed
+
+    @staticmethod
+    def content_hash(project_code: str) -> str:
+        """
+        SHA-256 of the extracted project text with line endings and trailing whitespace normalized,
+        so re-zipping or re-uploading the same code gives the same hash.
+        """
+        lines = project_code.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+        normalized = "\n".join(line.rstrip() for line in lines).strip()
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
 
     def _clean_and_parse_json_string(self, raw_text: str) -> str:
         """
         Cleans a raw string from an AI to extract a valid JSON object string.
         """
         try:
-            clean_text = re.sub(r'```json\s*|\s*```', '', raw_text, flags=re.DOTALL)
-            clean_text = re.sub(r'[\*]', '', clean_text)
-            clean_text = clean_text.strip()
-            parsed = json.loads(clean_text)
-
+            parsed = extract_json(raw_text.replace('*', ''))
             if isinstance(parsed, dict):
-                return clean_text
-            else:
-                return "{}"
-        except json.JSONDecodeError:
-            try:
-                start_index = raw_text.find('{')
-                end_index = raw_text.rfind('}')
-                if start_index != -1 and end_index != -1 and end_index > start_index:
-                    json_part = raw_text[start_index: end_index + 1]
-                    json_part_cleaned = re.sub(r'[\*]', '', json_part)
-                    json.loads(json_part_cleaned)
-                    return json_part_cleaned
-                return "{}"
-            except Exception:
-                return "{}"
+                return json.dumps(parsed, ensure_ascii=False)
         except Exception:
-            return "{}"
\ No newline at end of file
+            pass
+        self.ai_service.record_json_parse_failure("project_evaluation")
+        return "{}"
@@ -1,40 +1,141 @@
-import json
-import re
-from typing import List, Dict
+import asyncio
+from typing import Any, AsyncIterator, List, Dict, Tuple
+
+from pydantic import ValidationError
+
+from yolcu_backend.schemas import QuizLevel
 from yolcu_backend.services.ai_service import GeminiService
-from yolcu_backend.prompts.quiz_prompts import QUIZ_GENERATOR_PROMPT_TEMPLATE
+from yolcu_backend.services.json_extractor import JSONExtractionError, StreamingJSONExtractor, extract_json
+from yolcu_backend.prompts.quiz_prompts import QUIZ_GENERATOR_PROMPT_TEMPLATE, QUIZ_LEVEL_PROMPT_TEMPLATE, \
+    QUIZ_LEVELS
+
+QUIZ_TITLE = "Konu Değerlendirme Sınavı"
 
 
 class QuizGenerator:
-    def __init__(self, ai_service: GeminiService):
+    def __init__(self, ai_service: GeminiService, parallel_levels: bool = False, level_retries: int = 2):
+        """
+        parallel_levels: True ise her seviye ayrı bir istekle eşzamanlı üretilir; süre tüm quiz yerine
+        en yavaş seviye kadar olur ve hatalı bir seviye sadece kendisi tekrar denenir.
+        level_retries: seviye bazlı üretimde hatalı seviyenin en fazla kaç kez tekrar deneneceği
+        """
         self.ai_service = ai_service
+        self.parallel_levels = parallel_levels
+        self.level_retries = level_retries
 
     def _clean_and_parse_json(self, raw_text: str) -> dict:
-        clean_text = re.sub(r'```json\s*|\s*```', '', raw_text, flags=re.DOTALL).strip()
-
-        if not clean_text:
+        if not raw_text or not raw_text.strip():
             raise ValueError("AI service returned an empty or invalid response. Cannot generate quiz.")
 
         try:
-            return json.loads(clean_text)
-        except json.JSONDecodeError as e:
+            return extract_json(raw_text)
+        except ValueError as e:
+            self.ai_service.record_json_parse_failure("quiz")
             # Raise a new error with more context
-            raise ValueError(f"Failed to decode JSON from AI response. Error: {e}. Response was: '{clean_text}'")
-
-    def create_quiz(self, roadmap_id: int, rightItems: List[Dict], leftItems: List[Dict]) -> dict:
-        print(f"Roadmap ID '{roadmap_id}' için quiz mantığı çalıştırılıyor...")
+            raise ValueError(f"Failed to decode JSON from AI response. Error: {e}. Response was: '{raw_text}'")
 
+    def _build_prompt(self, rightItems: List[Dict], leftItems: List[Dict]) -> str:
         right_items_str = ", ".join([item['name'] for item in rightItems])
         left_items_str = ", ".join([item['name'] for item in leftItems])
 
-        final_prompt = QUIZ_GENERATOR_PROMPT_TEMPLATE.format(
+        return QUIZ_GENERATOR_PROMPT_TEMPLATE.format(
             rightItems=right_items_str,
             leftItems=left_items_str
         )
 
-        raw_response = self.ai_service.generate_content(final_prompt)
+    async def create_quiz(self, roadmap_id: int, rightItems: List[Dict], leftItems: List[Dict]) -> dict:
+        print(f"Roadmap ID '{roadmap_id}' için quiz mantığı çalıştırılıyor...")
+        if self.parallel_levels:
+            levels = await asyncio.gather(*(self._generate_level_with_retries(level, rightItems, leftItems)
+                                            for level in QUIZ_LEVELS))
+            return self._merge_levels(roadmap_id, levels)
+
+        final_prompt = self._build_prompt(rightItems, leftItems)
+        raw_response = await self.ai_service.generate_content_async(final_prompt, generator="quiz")
         quiz_json = self._clean_and_parse_json(raw_response)
 
         quiz_json['roadmap_id'] = roadmap_id
 
         return quiz_json
+
+    async def stream_quiz(self, roadmap_id: int, rightItems: List[Dict],
+                          leftItems: List[Dict]) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Quiz'i Gemini ürettikçe ayrıştırır.
+        Her seviye kapandığında ("level", seviye) döner, en sonda ("quiz", tüm_json) döner.
+        Seviye bazlı üretimde seviyeler bitiş sırasıyla gelir; son quiz yine seviye sırasındadır.
+        """
+        if self.parallel_levels:
+            tasks = [asyncio.create_task(self._generate_level_with_retries(level, rightItems, leftItems))
+                     for level in QUIZ_LEVELS]
+            try:
+                for completed in asyncio.as_completed(tasks):
+                    level = await completed
+                    if level is not None:
+                        yield "level", level
+            finally:
+                for task in tasks:
+                    task.cancel()
+            yield "quiz", self._merge_levels(roadmap_id, [task.result() for task in tasks])
+            return
+
+        final_prompt = self._build_prompt(rightItems, leftItems)
+        extractor = StreamingJSONExtractor(array_key="levels")
+        try:
+            async for chunk in self.ai_service.stream_content_async(final_prompt, generator="quiz"):
+                for level in extractor.feed(chunk):
+                    yield "level", level
+            quiz_json = extractor.result()
+        except JSONExtractionError as e:
+            self.ai_service.record_json_parse_failure("quiz")
+            raise ValueError(f"Failed to decode JSON from AI response. Error: {e}")
+
+        quiz_json['roadmap_id'] = roadmap_id
+        yield "quiz", quiz_json
+
+    # --- Seviye bazlı üretim ---
+    def _build_level_prompt(self, level: Tuple[int, str, str], rightItems: List[Dict], leftItems: List[Dict]) -> str:
+        level_no, level_title, level_description = level
+        return QUIZ_LEVEL_PROMPT_TEMPLATE.format(
+            level=level_no,
+            level_title=level_title,
+            level_description=level_description,
+            rightItems=", ".join([item['name'] for item in rightItems]),
+            leftItems=", ".join([item['name'] for item in leftItems]),
+        )
+
+    async def _generate_level(self, level: Tuple[int, str, str], rightItems: List[Dict],
+                              leftItems: List[Dict]) -> dict:
+        """Tek bir seviyeyi üretir ve QuizLevel şemasına göre doğrular."""
+        prompt = self._build_level_prompt(level, rightItems, leftItems)
+        raw_response = await self.ai_service.generate_content_async(prompt, generator="quiz", template="quiz_level")
+        try:
+            parsed = extract_json(raw_response)
+            quiz_level = QuizLevel.model_validate(parsed)
+        except (ValueError, ValidationError):
+            self.ai_service.record_json_parse_failure("quiz", "quiz_level")
+            raise
+        if not quiz_level.questions:
+            raise ValueError(f"Level {level[0]} has no questions.")
+
+        # Model seviye numarasını yanlış yazsa da seviye sırası prompt'takiyle aynı kalır
+        quiz_level.level = level[0]
+        return quiz_level.model_dump()
+
+    async def _generate_level_with_retries(self, level: Tuple[int, str, str], rightItems: List[Dict],
+                                           leftItems: List[Dict]):
+        """Seviyeyi üretir; hata olursa sadece bu seviyeyi tekrar dener. Yine olmazsa None döner."""
+        for attempt in range(self.level_retries + 1):
+            try:
+                return await self._generate_level(level, rightItems, leftItems)
+            except Exception as e:
+                print(f"Quiz seviye {level[0]} üretilemedi (deneme {attempt + 1}): {e}")
+        return None
+
+    @staticmethod
+    def _merge_levels(roadmap_id: int, levels: List) -> dict:
+        generated = [level for level in levels if level is not None]
+        if not generated:
+            raise ValueError("AI service failed to generate any quiz level.")
+        failed = [level_no for (level_no, _, _), level in zip(QUIZ_LEVELS, levels) if level is None]
+        return {"quizTitle": QUIZ_TITLE, "levels": generated, "failedLevels": failed, "roadmap_id": roadmap_id}
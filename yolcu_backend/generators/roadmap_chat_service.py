@@ -1,7 +1,10 @@
 # generators/roadmap_chat_service.py
-from typing import List, TYPE_CHECKING
+from typing import AsyncIterator, List, Optional, TYPE_CHECKING
 import json
 
+from yolcu_backend.services.stream_cleaners import ChatAnswerStreamCleaner
+from yolcu_backend.services.topic_matcher import get_topic_index
+
 if TYPE_CHECKING:
     from yolcu_backend.services.ai_service import GeminiService
 
@@ -27,22 +30,32 @@ class RoadmapChatService:
                             topics.append(item["name"])
         return list(set(topics))  # Return unique topics
 
-    def generate_answer(self, question: str, roadmap_content: dict) -> str:
+    async def _resolve_topic(self, question: str, roadmap_content: dict,
+                             topics: Optional[List[str]] = None) -> tuple[Optional[str], Optional[str]]:
         """
-        Handles a user's question using a robust two-step LLM process.
+        Sorunun hangi yol haritası konusuyla ilgili olduğunu bulur.
+        (hazır_cevap, eşleşen_konu) döner; hazır cevap varsa LLM ile cevap üretmeye gerek yoktur.
+        topics: yol haritası öğe indeksinden gelen konu listesi; verilmezse içerikten çıkarılır.
         """
         normalized_question = question.lower().strip().replace("?", "").replace("'", "")
 
         # --- 1. Programatik Selamlama Kontrolü ---
         if normalized_question in self.GREETINGS:
             if normalized_question in ["nasılsın", "naber"]:
-                return "Teşekkür ederim, iyiyim! Yol haritanla ilgili bir konuda yardımcı olabilirim."
-            return "Merhaba! Yol haritanla ilgili nasıl yardımcı olabilirim?"
+                return "Teşekkür ederim, iyiyim! Yol haritanla ilgili bir konuda yardımcı olabilirim.", None
+            return "Merhaba! Yol haritanla ilgili nasıl yardımcı olabilirim?", None
 
-        # --- 2. Yapay Zeka ile Alaka Kontrolü (1. LLM Çağrısı) ---
-        topic_list = self.extract_topics(roadmap_content)
+        topic_list = topics if topics is not None else self.extract_topics(roadmap_content)
         if not topic_list:
-            return "Üzgünüm, bu yol haritasında henüz bir konu bulunmuyor."
+            return "Üzgünüm, bu yol haritasında henüz bir konu bulunmuyor.", None
+
+        # --- 2. Yerel Konu Eşleştirme ---
+        # Soru bir konuyu açıkça anıyorsa LLM'e sormadan o konu kullanılır
+        match = get_topic_index(topic_list).match(question, general_topics=[roadmap_content.get("diagramTitle")])
+        if match.confident:
+            return None, match.topic
+
+        # --- 3. Yapay Zeka ile Alaka Kontrolü (Emin olunamayan sorular için LLM Çağrısı) ---
 
         relevance_check_prompt = f"""
         Kullanıcının sorusu: '{question}'
@@ -55,16 +68,19 @@ class RoadmapChatService:
         """
 
         try:
-            matched_topic = self.ai_service.generate_content(relevance_check_prompt).strip()
+            matched_topic = (await self.ai_service.generate_content_async(relevance_check_prompt, generator="chat",
+                                                                          template="chat_relevance")).strip()
         except Exception as e:
             print(f"Relevance check failed: {e}")
-            return "Sorunuzu analiz ederken bir sorunla karşılaştım."
+            return "Sorunuzu analiz ederken bir sorunla karşılaştım.", None
 
         if "İlgisiz" in matched_topic or matched_topic not in topic_list:
-            return "Bu soru, mevcut yol haritanızdaki konularla ilgili görünmüyor. Lütfen yol haritanızdaki bir konu hakkında soru sorun."
+            return "Bu soru, mevcut yol haritanızdaki konularla ilgili görünmüyor. Lütfen yol haritanızdaki bir konu hakkında soru sorun.", None
+
+        return None, matched_topic
 
-        # --- 3. Alakalıysa Cevap Üretme (2. LLM Çağrısı) ---
-        answer_generation_prompt = f"""
+    def _answer_prompt(self, question: str, matched_topic: str) -> str:
+        return f"""
         Bir kullanıcı, '{matched_topic}' konusu hakkında bir soru sordu.
         Kullanıcının sorusu: '{question}'
         Lütfen bu soruya, konuyu hiç bilmeyen birine anlatır gibi, açık, anlaşılır ve öğretici bir cevap ver.
@@ -72,12 +88,44 @@ class RoadmapChatService:
         ÖNEMLİ: Cevabında markdown formatlaması (yıldız, liste, kalın metin vb.) KESİNLİKLE kullanma. Cevabı sadece düz metin olarak, paragraflar halinde yaz.
         """
 
+    async def generate_answer(self, question: str, roadmap_content: dict, topics: Optional[List[str]] = None) -> str:
+        """
+        Handles a user's question: resolves the topic (locally when possible, otherwise with the LLM),
+        then generates the answer with the LLM.
+        """
+        reply, matched_topic = await self._resolve_topic(question, roadmap_content, topics)
+        if reply is not None:
+            return reply
+
+        # --- 4. Alakalıysa Cevap Üretme ---
         try:
-            raw_answer = self.ai_service.generate_content(answer_generation_prompt)
+            raw_answer = await self.ai_service.generate_content_async(self._answer_prompt(question, matched_topic),
+                                                                      generator="chat", template="chat_answer")
             # --- CEVAP TEMİZLEME (GARANTİLİ YÖNTEM) ---
             # Yeni satır karakterlerini boşlukla değiştir ve baş/sondaki boşlukları temizle
             cleaned_answer = raw_answer.replace('\n', ' ').strip()
             return cleaned_answer
         except Exception as e:
             print(f"Answer generation failed: {e}")
-            return f"'{matched_topic}' konusuyla ilgili cevabı oluştururken bir sorunla karşılaştım."
\ No newline at end of file
+            return f"'{matched_topic}' konusuyla ilgili cevabı oluştururken bir sorunla karşılaştım."
+
+    async def stream_answer(self, question: str, roadmap_content: dict,
+                            topics: Optional[List[str]] = None) -> AsyncIterator[str]:
+        """
+        generate_answer'ın akışlı hali: cevap Gemini ürettikçe temizlenerek parça parça döner.
+        """
+        reply, matched_topic = await self._resolve_topic(question, roadmap_content, topics)
+        if reply is not None:
+            yield reply
+            return
+
+        cleaner = ChatAnswerStreamCleaner()
+        try:
+            async for chunk in self.ai_service.stream_content_async(self._answer_prompt(question, matched_topic),
+                                                                    generator="chat", template="chat_answer"):
+                cleaned = cleaner.feed(chunk)
+                if cleaned:
+                    yield cleaned
+        except Exception as e:
+            print(f"Answer generation failed: {e}")
+            yield f"'{matched_topic}' konusuyla ilgili cevabı oluştururken bir sorunla karşılaştım."
@@ -1,18 +1,60 @@
-import json
-import re
+from typing import Any, AsyncIterator, Optional, Tuple
+
 from yolcu_backend.services.ai_service import GeminiService
+from yolcu_backend.services.json_extractor import (JSONExtractionError, StreamingJSONExtractor, extract_complete_json,
+                                                   extract_json)
 from yolcu_backend.prompts.roadmap_prompts import VISUAL_PROMPT_TEMPLATE
 
+# Aynı alan için üretilen yol haritası bir gün boyunca önbellekten sunulur
+ROADMAP_CACHE_TTL = 24 * 60 * 60
+
+
+def _is_roadmap_json(raw_text: str) -> bool:
+    """Sadece tam (yarıda kesilmemiş) ve mainStages listesi içeren cevaplar önbelleğe alınır."""
+    parsed = extract_complete_json(raw_text)
+    return isinstance(parsed, dict) and isinstance(parsed.get("mainStages"), list)
+
+
 class RoadmapGenerator:
     def __init__(self, ai_service: GeminiService):
         self.ai_service = ai_service
 
-    # TODO: Burdaki temizleme işlemini ortak bir yere al ordan çek
     def _clean_and_parse_json(self, raw_text: str) -> dict:
-        clean_text = re.sub(r'```json\s*|\s*```', '', raw_text, flags=re.DOTALL).strip()
-        return json.loads(clean_text)
+        try:
+            return extract_json(raw_text)
+        except ValueError:
+            self.ai_service.record_json_parse_failure("roadmap")
+            raise
 
-    def create_roadmap(self, topic: str) -> dict:
+    async def create_roadmap(self, topic: str, use_cache: bool = True, coalesce: Optional[bool] = None) -> dict:
+        """
+        use_cache=False: aynı konu için yeni bir varyant istendiğinde önbellekteki cevap kullanılmaz.
+        coalesce: aynı konu için eşzamanlı çağrılar tek Gemini çağrısını paylaşır; verilmezse use_cache
+        ile aynıdır (kullanıcının açıkça istediği taze varyant başkasıyla paylaşılmaz).
+        """
         final_prompt = VISUAL_PROMPT_TEMPLATE.format(field=topic)
-        raw_response = self.ai_service.generate_content(final_prompt)
+        raw_response = await self.ai_service.generate_content_async(final_prompt, generator="roadmap",
+                                                                    cache_ttl=ROADMAP_CACHE_TTL if use_cache else None,
+                                                                    validate=_is_roadmap_json,
+                                                                    coalesce=use_cache if coalesce is None else coalesce)
         return self._clean_and_parse_json(raw_response)
+
+    async def stream_roadmap(self, topic: str, use_cache: bool = True) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Yol haritasını Gemini ürettikçe ayrıştırır.
+        Her ana aşama kapandığında ("stage", aşama) döner, en sonda ("roadmap", tüm_json) döner.
+        """
+        final_prompt = VISUAL_PROMPT_TEMPLATE.format(field=topic)
+        extractor = StreamingJSONExtractor(array_key="mainStages")
+        try:
+            async for chunk in self.ai_service.stream_content_async(
+                    final_prompt, generator="roadmap", cache_ttl=ROADMAP_CACHE_TTL if use_cache else None,
+                    validate=_is_roadmap_json):
+                for stage in extractor.feed(chunk):
+                    yield "stage", stage
+            roadmap = extractor.result()
+        except JSONExtractionError:
+            self.ai_service.record_json_parse_failure("roadmap")
+            raise
+
+        yield "roadmap", roadmap
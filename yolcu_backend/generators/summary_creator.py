@@ -1,5 +1,18 @@
 import os
-from yolcu_backend.prompts.summary_prompts import SUMMARY_PROMPT
+from typing import AsyncIterator, Dict, List, Tuple
+
+from yolcu_backend.prompts.summary_prompts import SUMMARY_PROMPT, SUMMARY_BATCH_PROMPT
+from yolcu_backend.services.json_extractor import JSONExtractionError, extract_complete_json, extract_json
+from yolcu_backend.services.stream_cleaners import SummaryStreamCleaner
+
+# Konu özetleri zamanla değişmediği için bir hafta önbellekte tutulur
+SUMMARY_CACHE_TTL = 7 * 24 * 60 * 60
+
+
+def _is_batch_summary_json(raw_text: str) -> bool:
+    """Toplu özet cevabı ancak tam bir JSON nesnesiyse önbelleğe alınır."""
+    return isinstance(extract_complete_json(raw_text), dict)
+
 
 class SummaryCreator:
     def __init__(self, ai_service):
@@ -20,43 +33,75 @@ class SummaryCreator:
         formatted_text = f"{main_topic}:\n" + "\n".join(lines)
         return formatted_text
 
-    def generate_summary(
+    async def generate_summary(
         self,
-        roadmap_json: dict,
-        item_id: str
+        topic_title: str,
+        center_node_title: str
     ) -> str:
         """
-        roadmap_json: Roadmap.content
-        item_id: left veya right item ID
-        """
-        topic_title = None
-        center_node_title = None
-
-        for stage in roadmap_json.get("mainStages", []):
-            for node in stage.get("subNodes", []):
-                for side in ["leftItems", "rightItems"]:
-                    for item in node.get(side, []):
-                        if item.get("id") == item_id:
-                            topic_title = item.get("name")
-                            center_node_title = node.get("centralNodeTitle")
-                            break
-                    if topic_title:
-                        break
-                if topic_title:
-                    break
-            if topic_title:
-                break
-
-        if not topic_title:
-            raise ValueError("Item not found in roadmap JSON.")
-
+        topic_title: left veya right item adı
+        center_node_title: öğenin bağlı olduğu ana düğüm başlığı
+        (ikisi de services/roadmap_index.get_item ile bulunur)
+        """
         # Promptu SUMMARY_PROMPT ile oluştur
         prompt = SUMMARY_PROMPT.format(topic=topic_title, center_node=center_node_title)
 
         # Gemini API çağrısı
-        raw_summary = self.ai_service.generate_content(prompt)
+        raw_summary = await self.ai_service.generate_content_async(prompt, generator="summary",
+                                                                   cache_ttl=SUMMARY_CACHE_TTL, coalesce=True)
 
         # Metni temizle
         clean_summary = self.clean_summary_text(raw_summary, topic_title)
 
-        return clean_summary
\ No newline at end of file
+        return clean_summary
+
+    async def stream_summary(self, topic_title: str, center_node_title: str) -> AsyncIterator[str]:
+        """
+        generate_summary'nin akışlı hali: temizlenmiş özeti Gemini ürettikçe parça parça döndürür.
+        """
+        prompt = SUMMARY_PROMPT.format(topic=topic_title, center_node=center_node_title)
+
+        cleaner = SummaryStreamCleaner(topic_title)
+        async for chunk in self.ai_service.stream_content_async(prompt, generator="summary",
+                                                                cache_ttl=SUMMARY_CACHE_TTL):
+            cleaned = cleaner.feed(chunk)
+            if cleaned:
+                yield cleaned
+
+        tail = cleaner.flush()
+        if tail:
+            yield tail
+
+    async def generate_batch_summaries(
+        self,
+        center_node_title: str,
+        items: List[Tuple[str, str]]
+    ) -> Dict[str, str]:
+        """
+        Aynı ana düğümdeki öğelerin özetlerini tek Gemini isteğiyle üretir.
+        items: (item_id, konu adı) çiftleri
+        Dönen sözlük item_id -> temizlenmiş özet; modelin atladığı veya boş döndürdüğü öğeler yer almaz.
+        """
+        topics = "\n".join(f"- {item_id}: {name}" for item_id, name in items)
+        prompt = SUMMARY_BATCH_PROMPT.format(center_node=center_node_title, topics=topics)
+
+        raw_summaries = await self.ai_service.generate_content_async(prompt, generator="summary",
+                                                                     template="summary_batch",
+                                                                     cache_ttl=SUMMARY_CACHE_TTL,
+                                                                     validate=_is_batch_summary_json,
+                                                                     coalesce=True)
+        try:
+            parsed = extract_json(raw_summaries)
+        except JSONExtractionError:
+            self.ai_service.record_json_parse_failure("summary", "summary_batch")
+            raise
+        if not isinstance(parsed, dict):
+            self.ai_service.record_json_parse_failure("summary", "summary_batch")
+            raise JSONExtractionError("Toplu özet cevabı bir JSON nesnesi değil.")
+
+        summaries = {}
+        for item_id, name in items:
+            text = parsed.get(item_id)
+            if isinstance(text, str) and text.strip():
+                summaries[item_id] = self.clean_summary_text(text, name)
+        return summaries
@@ -1,46 +1,80 @@
 import os
 import json
+import asyncio
 import traceback
-import tempfile
-from typing import List
+import zipfile
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import List, Optional
 
 from fastapi import FastAPI, UploadFile, File, Path, Body, Depends, HTTPException, status, WebSocket, \
-    WebSocketDisconnect, Query
+    WebSocketDisconnect, Query, BackgroundTasks, Form
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
 
 from sqlalchemy.orm import Session
 
-from yolcu_backend.auth import get_password_hash, verify_password, create_access_token, get_current_user, get_db
+from yolcu_backend.auth import get_password_hash, verify_password, create_access_token, get_current_user, get_db, \
+    verify_token
 from yolcu_backend.settings import settings
 from yolcu_backend.services.ai_service import GeminiService
+from yolcu_backend.services.ai_backends import build_ai_backend
+from yolcu_backend.services.llm_cache import LLMCache, SQLiteCacheStore
+from yolcu_backend.services.job_queue import JobQueue, get_finished_jobs, get_user_job
+from yolcu_backend.services.keyword_engine import get_keyword_engine
+from yolcu_backend.services.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from yolcu_backend.services.motivational_pool import MotivationalMessagePool
+from yolcu_backend.services.single_flight import SingleFlight
+from yolcu_backend.services.sse import SSE_HEADERS, format_sse
+from yolcu_backend.services.upload_pipeline import ParsePool, read_upload
+from yolcu_backend.services.zip_ingest import ZipLimits
 from yolcu_backend.generators.roadmap_generator import RoadmapGenerator
-from yolcu_backend.generators.cv_analyzer import CVAnalyzer
+from yolcu_backend.generators.cv_analyzer import CVAnalyzer, score_cv_text
 from yolcu_backend.generators.summary_creator import SummaryCreator
 from yolcu_backend.generators.roadmap_chat_service import RoadmapChatService
 from yolcu_backend.generators.project_suggestion_generator import ProjectSuggestionGenerator
 from yolcu_backend.generators.project_evaluator import ProjectEvaluator
 from yolcu_backend.generators.quiz_generator import QuizGenerator
-from yolcu_backend.prompts.motivational_prompt import MOTIVATIONAL_PROMPT
+from yolcu_backend.prompts.summary_prompts import SUMMARY_PROMPT_VERSION
+from yolcu_backend.prompts.evaluation_prompt import EVALUATION_PROMPT_VERSION
 from yolcu_backend.schemas import UserCreate, UserOut, TopicRequest, RoadmapOut, CVOut, LoginSchema, TokenUserResponse, \
-    ProjectOut, ProjectSuggestionResponse, ProjectLevel, ProjectIdea, QuizRequest, QuizResponse
-from yolcu_backend.models import User, Roadmap, CV, Project, Quiz
-from yolcu_backend.services import db_service
+    ProjectOut, ProjectSuggestionResponse, ProjectLevel, ProjectIdea, QuizRequest, QuizResponse, JobOut, \
+    RoadmapListResponse, ProjectEvaluationOut, TargetProfileOut
+from yolcu_backend.models import User, Roadmap, RoadmapTemplate, CV, Project, Quiz, Job
+from yolcu_backend.services import db_service, roadmap_index, roadmap_templates
 
 # Hackathon ile ilgili importlar
 from yolcu_backend.websocket_manager import manager
 from yolcu_backend import models, schemas, crud
 from yolcu_backend.database import engine as hackathon_engine, SessionLocal, Base as HackathonBase
 from yolcu_backend.database import engine as yolcu_engine, Base as YolcuBase
+from yolcu_backend.schema_upgrades import upgrade_schema
 
 import uvicorn
 
 # --- Veritabanı Tablolarını Oluşturma ---
 YolcuBase.metadata.create_all(bind=yolcu_engine)
 HackathonBase.metadata.create_all(bind=hackathon_engine)
+upgrade_schema(yolcu_engine)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Motivasyon mesajı havuzu arka planda doldurulur
+    motivational_pool.start()
+    parse_pool.start()
+    job_queue.start()
+    yield
+    await job_queue.stop()
+    parse_pool.shutdown()
+    await motivational_pool.stop()
+
 
 app = FastAPI(
     title="Yolcu Backend API",
-    description="Service for Roadmaps, CVs, Hackathons, Teams, and Chat."
+    description="Service for Roadmaps, CVs, Hackathons, Teams, and Chat.",
+    lifespan=lifespan
 )
 
 # --- CORS Middleware ---
@@ -59,14 +93,54 @@ app.add_middleware(
 )
 
 # --- Servislerin Başlatılması ---
-gemini_service = GeminiService(api_key=settings.GEMINI_API_KEY)
+llm_cache = None
+if settings.LLM_CACHE_ENABLED:
+    llm_cache = LLMCache(
+        max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+        disk_store=SQLiteCacheStore(settings.LLM_CACHE_DB_PATH) if settings.LLM_CACHE_DB_PATH else None,
+    )
+
+ai_backend = build_ai_backend(
+    backend=settings.AI_BACKEND,
+    api_key=settings.GEMINI_API_KEY,
+    fake_latency=settings.AI_FAKE_LATENCY,
+    replay_file=settings.AI_REPLAY_FILE,
+    record_file=settings.AI_RECORD_FILE,
+)
+
+gemini_service = GeminiService(
+    api_key=settings.GEMINI_API_KEY,
+    backend=ai_backend,
+    max_concurrency=settings.AI_MAX_CONCURRENCY,
+    generator_concurrency=settings.AI_GENERATOR_CONCURRENCY,
+    cache=llm_cache,
+)
 roadmap_generator = RoadmapGenerator(ai_service=gemini_service)
-cv_analyzer = CVAnalyzer(ai_service=gemini_service)
+# Şablonu eksik bir konu için eşzamanlı gelen istekler (topic_key bazında) tek bir varyant üretimini paylaşır
+roadmap_template_flight = SingleFlight()
+cv_analyzer = CVAnalyzer(ai_service=gemini_service, token_budget=settings.PROMPT_TOKEN_BUDGETS.get("cv_feedback"))
 summary_creator = SummaryCreator(ai_service=gemini_service)
 chat_service = RoadmapChatService(ai_service=gemini_service)
 project_suggestion_generator = ProjectSuggestionGenerator(ai_service=gemini_service)
-project_evaluator = ProjectEvaluator(ai_service=gemini_service)
-quiz_generator = QuizGenerator(ai_service=gemini_service)
+project_evaluator = ProjectEvaluator(ai_service=gemini_service,
+                                     token_budget=settings.PROMPT_TOKEN_BUDGETS.get("evaluation"),
+                                     map_reduce=settings.EVALUATION_MAP_REDUCE,
+                                     chunk_token_budget=settings.PROMPT_TOKEN_BUDGETS.get("evaluation_chunk"),
+                                     max_chunks=settings.EVALUATION_MAX_CHUNKS,
+                                     concurrency=settings.EVALUATION_CONCURRENCY)
+quiz_generator = QuizGenerator(ai_service=gemini_service, parallel_levels=settings.QUIZ_PARALLEL_LEVELS,
+                               level_retries=settings.QUIZ_LEVEL_RETRIES)
+parse_pool = ParsePool(workers=settings.UPLOAD_PARSE_WORKERS)
+# Beceri otomatı açılışta kurulur; havuz süreçleri fork ile kurulmuş halini devralır
+keyword_engine = get_keyword_engine()
+zip_limits = ZipLimits(max_total_bytes=settings.ZIP_MAX_TOTAL_BYTES, max_file_bytes=settings.ZIP_MAX_FILE_BYTES,
+                       max_files=settings.ZIP_MAX_FILES)
+motivational_pool = MotivationalMessagePool(
+    ai_service=gemini_service,
+    size=settings.MOTIVATIONAL_POOL_SIZE,
+    refresh_interval=settings.MOTIVATIONAL_POOL_REFRESH_SECONDS,
+    startup_jitter=settings.MOTIVATIONAL_POOL_STARTUP_JITTER_SECONDS,
+)
 
 
 # --- Endpoint'ler ---
@@ -129,176 +203,496 @@ def get_user_by_id(user_id: int = Path(..., description="ID of the user to retri
 
 
 # --- Roadmap ---
+@app.get("/api/roadmaps", response_model=RoadmapListResponse, tags=["Roadmaps"])
+def list_roadmaps(limit: int = Query(20, ge=1, le=100), cursor: Optional[str] = Query(None),
+                  db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """
+    Kullanıcının yol haritalarını yeniden eskiye listeler; içerik yerine başlık, aşama/öğe ve quiz sayıları döner.
+    Sonraki sayfa için yanıttaki next_cursor, cursor parametresi olarak gönderilir.
+    """
+    try:
+        items, next_cursor = db_service.list_roadmaps(db, current_user.id, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@app.get("/api/roadmaps/{roadmap_id}", response_model=RoadmapOut, tags=["Roadmaps"])
+def get_roadmap(roadmap_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    roadmap = db_service.get_roadmap_with_content(db, current_user.id, roadmap_id)
+    if not roadmap:
+        raise HTTPException(status_code=404, detail="Roadmap not found or you don't have access.")
+    return roadmap
+
+
+def _uses_templates(request: TopicRequest) -> bool:
+    return not request.fresh and settings.ROADMAP_TEMPLATE_VARIANTS > 0
+
+
 @app.post("/api/roadmaps/generate", response_model=RoadmapOut, tags=["Roadmaps"])
-def generate_roadmap(request: TopicRequest, db: Session = Depends(get_db),
-                     current_user: User = Depends(get_current_user)):
-    roadmap_json = roadmap_generator.create_roadmap(request.field)
-    roadmap = Roadmap(user_id=current_user.id, content=roadmap_json)
-    db.add(roadmap)
-    db.commit()
-    db.refresh(roadmap)
+async def generate_roadmap(request: TopicRequest, db: Session = Depends(get_db),
+                           current_user: User = Depends(get_current_user)):
+    """
+    Konu için ortak bir şablon varsa Gemini'ye gitmeden ona bağlı bir yol haritası oluşturur.
+    fresh=True ise kullanıcıya özel yeni bir varyant üretilir ve içerik yol haritasında saklanır.
+    """
+    return await _create_roadmap(db, current_user.id, request)
+
+
+# Async endpoint'lerdeki veritabanı işleri (sorgu, commit, refresh) event loop'u bloklamasın diye
+# senkron yardımcılarda toplanır ve run_in_threadpool ile çalıştırılır; Gemini çağrıları loop'ta beklenir.
+def _save_roadmap(db: Session, user_id: int, content: Optional[dict] = None, template=None) -> RoadmapOut:
+    roadmap = roadmap_index.create_roadmap(db, user_id=user_id, content=content, template=template)
+    return RoadmapOut.model_validate(roadmap)
+
+
+def _save_roadmap_from_template(db: Session, user_id: int, key: str, field: str,
+                                roadmap_json: Optional[dict] = None) -> Optional[RoadmapOut]:
+    """roadmap_json verilirse yeni şablon olarak kaydedilir; verilmezse mevcut bir şablon seçilir (yoksa None)."""
+    if roadmap_json is not None:
+        template = roadmap_templates.save_template(db, key, field, roadmap_json, settings.ROADMAP_TEMPLATE_VARIANTS)
+    else:
+        template = roadmap_templates.pick_template(db, key, settings.ROADMAP_TEMPLATE_VARIANTS)
+        if template is None:
+            return None
+    return _save_roadmap(db, user_id, template=template)
+
+
+def _save_template(key: str, field: str, roadmap_json: dict) -> int:
+    # Üretim birden fazla isteğe ortak olduğu için isteklerden birinin oturumu değil ayrı bir oturum kullanılır
+    db = SessionLocal()
+    try:
+        return roadmap_templates.save_template(db, key, field, roadmap_json, settings.ROADMAP_TEMPLATE_VARIANTS).id
+    finally:
+        db.close()
+
+
+def _save_roadmap_for_template(db: Session, user_id: int, template_id: int) -> RoadmapOut:
+    return _save_roadmap(db, user_id, template=db.get(RoadmapTemplate, template_id))
+
+
+async def _generate_template(key: str, field: str) -> int:
+    """Konu için yeni bir şablon varyantı üretip kaydeder ve id'sini döndürür."""
+    roadmap_json = await roadmap_generator.create_roadmap(field, use_cache=False)
+    return await run_in_threadpool(_save_template, key, field, roadmap_json)
+
+
+async def _create_roadmap(db: Session, user_id: int, request: TopicRequest) -> RoadmapOut:
+    if not _uses_templates(request):
+        roadmap_json = await roadmap_generator.create_roadmap(request.field, use_cache=not request.fresh)
+        return await run_in_threadpool(_save_roadmap, db, user_id, content=roadmap_json)
+
+    key = roadmap_templates.topic_key(request.field)
+    roadmap = await run_in_threadpool(_save_roadmap_from_template, db, user_id, key, request.field)
+    if roadmap is None:
+        template_id = await roadmap_template_flight.do(key, lambda: _generate_template(key, request.field))
+        roadmap = await run_in_threadpool(_save_roadmap_for_template, db, user_id, template_id)
     return roadmap
 
 
-@app.get("/api/roadmaps/{roadmap_id}/summaries", tags=["Roadmaps"])
-def summarize_item(roadmap_id: int, item_id: str = Query(..., description="Left or right item ID"),
-                   db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    roadmap = db.query(Roadmap).filter(Roadmap.id == roadmap_id, Roadmap.user_id == current_user.id).first()
+@app.post("/api/roadmaps/generate/stream", tags=["Roadmaps"])
+async def stream_generate_roadmap(request: TopicRequest, current_user: User = Depends(get_current_user)):
+    """
+    Yol haritasının ana aşamalarını, Gemini ürettikçe tek tek Server-Sent Events olarak gönderir.
+    Akış bitince yol haritası kaydedilir ve "done" olayında kaydın tamamı döner.
+    Konu için ortak bir şablon varsa aşamalar doğrudan şablondan gönderilir.
+    """
+    user_id = current_user.id
+    use_templates = _uses_templates(request)
+    key = roadmap_templates.topic_key(request.field)
+
+    def save_streamed_roadmap(roadmap_json: Optional[dict] = None) -> Optional[RoadmapOut]:
+        # Akış sürerken istek oturumu kapanmış olabileceği için ayrı bir oturum açılır
+        stream_db = SessionLocal()
+        try:
+            if use_templates:
+                return _save_roadmap_from_template(stream_db, user_id, key, request.field, roadmap_json)
+            return _save_roadmap(stream_db, user_id, content=roadmap_json)
+        finally:
+            stream_db.close()
+
+    async def event_stream():
+        try:
+            if use_templates:
+                roadmap = await run_in_threadpool(save_streamed_roadmap)
+                if roadmap is not None:
+                    for stage_index, stage in enumerate(roadmap.content.get("mainStages") or []):
+                        yield format_sse({"index": stage_index, "stage": stage}, event="stage")
+                    yield format_sse(roadmap.model_dump(mode="json"), event="done")
+                    return
+
+            stage_index = 0
+            async for kind, data in roadmap_generator.stream_roadmap(request.field,
+                                                                     use_cache=not (use_templates or request.fresh)):
+                if kind == "stage":
+                    yield format_sse({"index": stage_index, "stage": data}, event="stage")
+                    stage_index += 1
+                    continue
+
+                roadmap = await run_in_threadpool(save_streamed_roadmap, data)
+                yield format_sse(roadmap.model_dump(mode="json"), event="done")
+        except Exception as e:
+            traceback.print_exc()
+            yield format_sse({"detail": f"An error occurred: {e}"}, event="error")
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+def _load_summary_item(db: Session, roadmap_id: int, user_id: int, item_id: str):
+    """(öğe, kayıtlı özet veya None); yol haritası veya öğe yoksa 404."""
+    roadmap = db.query(Roadmap).filter(Roadmap.id == roadmap_id, Roadmap.user_id == user_id).first()
     if not roadmap:
         raise HTTPException(status_code=404, detail="Roadmap not found")
 
-    topic_title, center_node_title = None, None
-    for stage in roadmap.content.get("mainStages", []):
-        for node in stage.get("subNodes", []):
-            for side in ["leftItems", "rightItems"]:
-                for item in node.get(side, []):
-                    if item.get("id") == item_id:
-                        topic_title = item.get("name")
-                        center_node_title = node.get("centralNodeTitle")
-                        break
-                if topic_title: break
-            if topic_title: break
-        if topic_title: break
-
-    if not topic_title:
+    item = roadmap_index.get_item(db, roadmap, item_id)
+    if not item:
         raise HTTPException(status_code=404, detail="Item not found in roadmap.")
+    return item, db_service.get_stored_summary(db, roadmap.id, item_id, SUMMARY_PROMPT_VERSION)
+
+
+def _save_summaries(roadmap_id: int, summaries: dict) -> None:
+    """Özetleri ayrı bir oturumla kaydeder (akış ve arka plan görevlerinde istek oturumu kapanmış olabilir)."""
+    summary_db = SessionLocal()
+    try:
+        for item_id, summary in summaries.items():
+            db_service.save_summary(summary_db, roadmap_id, item_id, summary, SUMMARY_PROMPT_VERSION)
+    finally:
+        summary_db.close()
+
 
-    summary = summary_creator.generate_summary(roadmap_json=roadmap.content, item_id=item_id)
-    return {"roadmap_id": roadmap.id, "center_node": center_node_title, "item_id": item_id, "topic": topic_title,
+@app.get("/api/roadmaps/{roadmap_id}/summaries", tags=["Roadmaps"])
+async def summarize_item(roadmap_id: int, item_id: str = Query(..., description="Left or right item ID"),
+                         db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    item, summary = await run_in_threadpool(_load_summary_item, db, roadmap_id, current_user.id, item_id)
+    if summary is None:
+        summary = await summary_creator.generate_summary(topic_title=item.name, center_node_title=item.central_node)
+        await run_in_threadpool(db_service.save_summary, db, roadmap_id, item_id, summary, SUMMARY_PROMPT_VERSION)
+    return {"roadmap_id": roadmap_id, "center_node": item.central_node, "item_id": item_id, "topic": item.name,
             "summary": summary}
 
 
-@app.post("/api/roadmaps/{roadmap_id}/chat", tags=["Roadmaps"])
-def roadmap_chat(roadmap_id: int, question: str = Body(..., embed=True), db: Session = Depends(get_db),
-                 current_user: User = Depends(get_current_user)):
+@app.get("/api/roadmaps/{roadmap_id}/summaries/stream", tags=["Roadmaps"])
+async def stream_summary(roadmap_id: int, item_id: str = Query(..., description="Left or right item ID"),
+                         db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """
+    Özeti Server-Sent Events olarak, Gemini ürettikçe gönderir.
+    Daha önce kaydedilmiş bir özet varsa tek parça halinde gönderilir.
+    """
+    item, stored_summary = await run_in_threadpool(_load_summary_item, db, roadmap_id, current_user.id, item_id)
+    topic_title, center_node_title = item.name, item.central_node
+    meta = {"roadmap_id": roadmap_id, "center_node": center_node_title, "item_id": item_id, "topic": topic_title}
+
+    async def event_stream():
+        yield format_sse(meta, event="meta")
+        if stored_summary is not None:
+            yield format_sse({"text": stored_summary})
+            yield format_sse(meta, event="done")
+            return
+        try:
+            chunks = []
+            async for chunk in summary_creator.stream_summary(topic_title=topic_title,
+                                                              center_node_title=center_node_title):
+                chunks.append(chunk)
+                yield format_sse({"text": chunk})
+
+            await run_in_threadpool(_save_summaries, roadmap_id, {item_id: "".join(chunks)})
+            yield format_sse(meta, event="done")
+        except Exception as e:
+            traceback.print_exc()
+            yield format_sse({"detail": f"An error occurred: {e}"}, event="error")
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+async def _prefetch_node_summaries(roadmap_id: int, center_node: str, items: List[tuple]):
+    """Bir ana düğümün özeti olmayan öğelerini toplu prompt'larla üretip kaydeder (arka plan görevi)."""
+    batch_size = max(1, settings.SUMMARY_PREFETCH_BATCH_SIZE)
+    for start in range(0, len(items), batch_size):
+        batch = items[start:start + batch_size]
+        try:
+            summaries = await summary_creator.generate_batch_summaries(center_node_title=center_node, items=batch)
+        except Exception:
+            traceback.print_exc()
+            continue
+
+        await run_in_threadpool(_save_summaries, roadmap_id, summaries)
+
+
+@app.post("/api/roadmaps/{roadmap_id}/summaries/prefetch", status_code=status.HTTP_202_ACCEPTED, tags=["Roadmaps"])
+def prefetch_summaries(roadmap_id: int, background_tasks: BackgroundTasks,
+                             center_node: str = Body(..., embed=True, description="Opened subNode title"),
+                             db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """
+    Kullanıcı bir ana düğümü (subNode) açtığında çağrılır: düğümdeki özeti henüz kaydedilmemiş öğelerin
+    özetleri arka planda toplu prompt ile üretilir, böylece sonraki tıklamalar doğrudan veritabanından döner.
+    """
     roadmap = db.query(Roadmap).filter(Roadmap.id == roadmap_id, Roadmap.user_id == current_user.id).first()
+    if not roadmap:
+        raise HTTPException(status_code=404, detail="Roadmap not found")
+
+    node_items = roadmap_index.get_node_items(db, roadmap, center_node)
+    if not node_items:
+        raise HTTPException(status_code=404, detail="Central node not found in roadmap.")
+
+    stored = db_service.get_stored_summary_item_ids(db, roadmap.id, [item.item_id for item in node_items],
+                                                    SUMMARY_PROMPT_VERSION)
+    missing = [(item.item_id, item.name) for item in node_items if item.item_id not in stored]
+    if missing and settings.SUMMARY_PREFETCH_ENABLED:
+        background_tasks.add_task(_prefetch_node_summaries, roadmap.id, center_node, missing)
+    return {"roadmap_id": roadmap.id, "center_node": center_node,
+            "queued": [item_id for item_id, _ in missing] if settings.SUMMARY_PREFETCH_ENABLED else [],
+            "cached": [item.item_id for item in node_items if item.item_id in stored]}
+
+
+def _load_chat_context(db: Session, roadmap_id: int, user_id: int) -> tuple[dict, list[str]]:
+    """(yol haritası içeriği, konu listesi); yol haritası yoksa 404."""
+    roadmap = db.query(Roadmap).filter(Roadmap.id == roadmap_id, Roadmap.user_id == user_id).first()
     if not roadmap:
         raise HTTPException(status_code=404, detail="Roadmap not found or you don't have access.")
+    return roadmap.content, roadmap_index.get_topics(db, roadmap)
+
+
+@app.post("/api/roadmaps/{roadmap_id}/chat", tags=["Roadmaps"])
+async def roadmap_chat(roadmap_id: int, question: str = Body(..., embed=True), db: Session = Depends(get_db),
+                       current_user: User = Depends(get_current_user)):
+    roadmap_content, topics = await run_in_threadpool(_load_chat_context, db, roadmap_id, current_user.id)
 
     try:
-        answer = chat_service.generate_answer(question=question, roadmap_content=roadmap.content)
-        return {"roadmap_id": roadmap.id, "question": question, "answer": answer}
+        answer = await chat_service.generate_answer(question=question, roadmap_content=roadmap_content,
+                                                    topics=topics)
+        return {"roadmap_id": roadmap_id, "question": question, "answer": answer}
     except Exception as e:
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"An error occurred: {e}")
 
 
+@app.post("/api/roadmaps/{roadmap_id}/chat/stream", tags=["Roadmaps"])
+async def stream_roadmap_chat(roadmap_id: int, question: str = Body(..., embed=True), db: Session = Depends(get_db),
+                              current_user: User = Depends(get_current_user)):
+    """Sohbet cevabını Server-Sent Events olarak, Gemini ürettikçe gönderir."""
+    roadmap_content, topics = await run_in_threadpool(_load_chat_context, db, roadmap_id, current_user.id)
+    meta = {"roadmap_id": roadmap_id, "question": question}
+
+    async def event_stream():
+        yield format_sse(meta, event="meta")
+        try:
+            async for chunk in chat_service.stream_answer(question=question, roadmap_content=roadmap_content,
+                                                          topics=topics):
+                yield format_sse({"text": chunk})
+            yield format_sse(meta, event="done")
+        except Exception as e:
+            traceback.print_exc()
+            yield format_sse({"detail": f"An error occurred: {e}"}, event="error")
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
 # --- CV Analizi ---
-@app.post("/api/cv/analyze", response_model=CVOut, tags=["CV"])
-async def analyze_cv(file: UploadFile = File(...), current_user: User = Depends(get_current_user),
-                     db: Session = Depends(get_db)):
-    if not file.filename.lower().endswith((".pdf", ".txt")):
-        raise HTTPException(status_code=400, detail="Only PDF or TXT files allowed.")
+@app.get("/api/cv/target-profiles", response_model=List[TargetProfileOut], tags=["CV"])
+def list_target_profiles():
+    return [TargetProfileOut(key=p.key, title=p.title, skills=list(p.skills)) for p in keyword_engine.profiles.values()]
+
 
-    content = await file.read()
-    if len(content) > 5 * 1024 * 1024:
-        raise HTTPException(status_code=413, detail="File too large (max 5MB).")
+@app.post("/api/cv/analyze", response_model=CVOut, tags=["CV"])
+async def analyze_cv(file: UploadFile = File(...),
+                     target_profile: Optional[str] = Form(None, description="Key from /api/cv/target-profiles; "
+                                                                            "picked from the CV when omitted"),
+                     current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    _check_target_profile(target_profile)
+    content = await _read_cv_upload(file)
 
-    temp_path = None
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file.filename)[1]) as temp_file:
-            temp_file.write(content)
-            temp_path = temp_file.name
-
-        cv_text = cv_analyzer.read_cv(temp_path)
-        keywords_result = cv_analyzer.extract_keywords(cv_text)
-        advanced_score = cv_analyzer.ats_score_advanced(cv_text, keywords_result["found"])
-        feedback = cv_analyzer.generate_ai_feedback(cv_text, advanced_score)
-
-        cv_entry = CV(
-            user_id=current_user.id,
-            file_name=file.filename,
-            content=cv_text,
-            final_score=advanced_score["final_score"],
-            found_keywords=advanced_score["found_keywords"],
-            missing_keywords=advanced_score["missing_keywords"],
-            feedback=feedback,
-            tips=cv_analyzer.get_ats_optimization_tips(advanced_score),
-            language=cv_analyzer.detect_language(cv_text),
-        )
-        db.add(cv_entry)
-        db.commit()
-        db.refresh(cv_entry)
-        return cv_entry
+        cv_text = await parse_pool.run(CVAnalyzer.read_cv_bytes, content, file.filename)
+        return await _analyze_cv_text(db, current_user.id, file.filename, cv_text, target_profile)
     except Exception as e:
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"CV analysis failed: {str(e)}")
-    finally:
-        if temp_path and os.path.exists(temp_path):
-            os.unlink(temp_path)
+
+
+async def _read_cv_upload(file: UploadFile) -> bytes:
+    if not file.filename.lower().endswith((".pdf", ".txt")):
+        raise HTTPException(status_code=400, detail="Only PDF or TXT files allowed.")
+    return await read_upload(file, settings.CV_UPLOAD_MAX_BYTES)
+
+
+def _check_target_profile(target_profile: Optional[str]) -> None:
+    if target_profile is not None and target_profile not in keyword_engine.profiles:
+        raise HTTPException(status_code=400, detail=f"Unknown target profile. "
+                                                    f"Valid profiles: {', '.join(keyword_engine.profiles)}")
+
+
+async def _analyze_cv_text(db: Session, user_id: int, file_name: str, cv_text: str,
+                           target_profile: Optional[str] = None) -> CV:
+    scores = await parse_pool.run(score_cv_text, cv_text, target_profile)
+    advanced_score = scores["advanced"]
+    feedback = await cv_analyzer.generate_ai_feedback(cv_text, advanced_score)
+
+    cv_entry = CV(
+        user_id=user_id,
+        file_name=file_name,
+        content=cv_text,
+        basic_score=advanced_score["basic_score"],
+        advanced_score=advanced_score["advanced_score"],
+        final_score=advanced_score["final_score"],
+        found_keywords=advanced_score["found_keywords"],
+        missing_keywords=advanced_score["missing_keywords"],
+        feedback=feedback,
+        tips=cv_analyzer.get_ats_optimization_tips(advanced_score),
+        language=scores["language"],
+        target_profile=advanced_score["target_profile"],
+    )
+    return await run_in_threadpool(_save_cv, db, cv_entry)
+
+
+def _save_cv(db: Session, cv_entry: CV) -> CV:
+    db.add(cv_entry)
+    db.commit()
+    db.refresh(cv_entry)
+    return cv_entry
 
 
 # --- Projeler ---
 @app.get("/project-suggestions", response_model=ProjectSuggestionResponse, tags=["Projects"])
-def get_project_suggestions(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def get_project_suggestions(refresh: bool = Query(False, description="Generate a new suggestion set"),
+                                  db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """
+    Kullanıcının son yol haritası için daha önce öneri üretildiyse kayıtlı set döner;
+    refresh=True ise yeni öneriler üretilir ve kayıtlı setin yerine geçer.
+    """
     try:
-        titles = db_service.get_centralnode_titles(db, user_id=current_user.id)
-        if not titles:
-            raise HTTPException(status_code=404, detail="No roadmap found for user. Create a roadmap first.")
-
-        suggestions_json_str = project_suggestion_generator.generate_suggestions(titles)
-        suggestions_data = json.loads(suggestions_json_str)
-
-        response_levels = []
-        for level in suggestions_data.get("project_levels", []):
-            created_projects = []
-            for project_idea in level.get("projects", []):
-                if "title" in project_idea and "description" in project_idea:
-                    new_project = Project(
-                        user_id=current_user.id,
-                        title=project_idea["title"],
-                        description=project_idea["description"]
-                    )
-                    db.add(new_project)
-                    db.flush()
-                    db.refresh(new_project)
-                    created_projects.append(ProjectIdea(
-                        id=new_project.id,
-                        title=new_project.title,
-                        description=new_project.description
-                    ))
-            response_levels.append(ProjectLevel(level_name=level["level_name"], projects=created_projects))
-
-        db.commit()
-        return ProjectSuggestionResponse(project_levels=response_levels)
+        return await _create_project_suggestions(db, current_user.id, refresh=refresh)
     except Exception as e:
-        db.rollback()
+        await run_in_threadpool(db.rollback)
         traceback.print_exc()
         raise HTTPException(status_code=500, detail="An error occurred while generating project suggestions.")
 
 
+async def _create_project_suggestions(db: Session, user_id: int, refresh: bool = False) -> ProjectSuggestionResponse:
+    stored, latest_roadmap_id, titles = await run_in_threadpool(_load_project_suggestions, db, user_id, refresh)
+    if stored is not None:
+        return stored
+
+    suggestions_json_str = await project_suggestion_generator.generate_suggestions(titles)
+    return await run_in_threadpool(_save_project_suggestions, db, user_id, latest_roadmap_id, suggestions_json_str)
+
+
+def _load_project_suggestions(db: Session, user_id: int, refresh: bool):
+    """(kayıtlı öneri seti, son yol haritası id'si, ana düğüm başlıkları); yol haritası yoksa 404."""
+    latest_roadmap_id = db_service.get_latest_roadmap_id(db, user_id)
+    if latest_roadmap_id and not refresh:
+        suggestion_set = db_service.get_suggestion_set(db, user_id, latest_roadmap_id)
+        if suggestion_set:
+            return ProjectSuggestionResponse.model_validate(suggestion_set.response), latest_roadmap_id, []
+
+    titles = db_service.get_centralnode_titles(db, user_id=user_id, roadmap_id=latest_roadmap_id)
+    if not titles:
+        raise HTTPException(status_code=404, detail="No roadmap found for user. Create a roadmap first.")
+    return None, latest_roadmap_id, titles
+
+
+def _save_project_suggestions(db: Session, user_id: int, latest_roadmap_id: Optional[int],
+                              suggestions_json_str: str) -> ProjectSuggestionResponse:
+    suggestions_data = json.loads(suggestions_json_str)
+
+    levels = []
+    project_ideas = []
+    for level in suggestions_data.get("project_levels", []):
+        ideas = [idea for idea in level.get("projects", []) if "title" in idea and "description" in idea]
+        levels.append((level["level_name"], len(ideas)))
+        project_ideas.extend(ideas)
+
+    # Tüm projeler tek sorguda eklenir, id'ler RETURNING ile gelir
+    created = iter(db_service.create_projects(db, user_id, project_ideas))
+    response_levels = [
+        ProjectLevel(level_name=level_name, projects=[ProjectIdea(**next(created)) for _ in range(count)])
+        for level_name, count in levels
+    ]
+    response = ProjectSuggestionResponse(project_levels=response_levels)
+
+    if not project_ideas:
+        db.commit()
+        return response
+    saved = db_service.save_suggestion_set(db, user_id, latest_roadmap_id, response.model_dump(mode="json"))
+    return ProjectSuggestionResponse.model_validate(saved)
+
+
 @app.post("/api/projects/{project_id}/evaluate", response_model=dict, tags=["Projects"])
 async def evaluate_specific_project(project_id: int, file: UploadFile = File(...), db: Session = Depends(get_db),
                                     current_user: User = Depends(get_current_user)):
-    project_suggestion = db.query(Project).filter(Project.id == project_id, Project.user_id == current_user.id).first()
-
-    if not project_suggestion:
-        raise HTTPException(status_code=404, detail="Project suggestion not found or you don't have access.")
+    project_suggestion = await run_in_threadpool(_get_user_project, db, project_id, current_user.id)
 
-    temp_path = None
+    content = await read_upload(file, settings.PROJECT_UPLOAD_MAX_BYTES)
     try:
-        content = await file.read()
-        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file.filename)[1]) as temp_file:
-            temp_file.write(content)
-            temp_path = temp_file.name
+        project_text, skipped_files = await _read_project_upload(content, file.filename)
+        return await _evaluate_project_text(db, project_suggestion, project_text, skipped_files, file.filename)
+    except HTTPException:
+        raise
+    except Exception as e:
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail="An internal error occurred during project evaluation.")
 
-        project_text = project_evaluator.read_project_file(temp_path, file.filename)
-        if not project_text or len(project_text) < 50:
-            raise HTTPException(status_code=400, detail="The content of the file is too short to evaluate.")
 
+def _get_user_project(db: Session, project_id: int, user_id: int) -> Project:
+    project = db.query(Project).filter(Project.id == project_id, Project.user_id == user_id).first()
+    if not project:
+        raise HTTPException(status_code=404, detail="Project suggestion not found or you don't have access.")
+    return project
+
+
+async def _read_project_upload(content: bytes, file_name: str) -> tuple[str, list[dict]]:
+    """
+    Proje metnini ve (ZIP'lerde) atlanan dosyaların listesini döndürür.
+    Bozuk ZIP veya okunamayan dosya kullanıcı hatasıdır (400).
+    """
+    try:
+        project_text, skipped_files = await parse_pool.run(ProjectEvaluator.ingest_project_bytes, content, file_name,
+                                                           zip_limits)
+    except zipfile.BadZipFile:
+        raise HTTPException(status_code=400, detail="The uploaded file is not a valid ZIP archive.")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not project_text or len(project_text) < 50:
+        raise HTTPException(status_code=400, detail="The content of the file is too short to evaluate.")
+    return project_text, skipped_files
+
+
+async def _evaluate_project_text(db: Session, project_suggestion: Project, project_text: str,
+                                 skipped_files: Optional[list[dict]] = None, file_name: Optional[str] = None) -> dict:
+    """
+    Aynı içerik bu prompt sürümüyle daha önce değerlendirildiyse kayıtlı değerlendirme döner (cached=True);
+    değilse Gemini ile değerlendirilip kaydedilir.
+    """
+    content_hash = ProjectEvaluator.content_hash(project_text)
+    stored = await run_in_threadpool(db_service.get_stored_evaluation, db, project_suggestion.id, content_hash,
+                                     EVALUATION_PROMPT_VERSION)
+    cached = stored is not None
+    if stored is None:
         suggestion_data = ProjectOut.from_orm(project_suggestion).dict()
-        evaluation_json_str = project_evaluator.evaluate_project(project_code=project_text,
-                                                                 original_suggestion=suggestion_data)
+        evaluation_json_str = await project_evaluator.evaluate_project(project_code=project_text,
+                                                                       original_suggestion=suggestion_data)
         evaluation_data = json.loads(evaluation_json_str)
-        evaluation_data["project_id"] = project_id
-
-        return evaluation_data
-    except Exception as e:
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail="An internal error occurred during project evaluation.")
-    finally:
-        if temp_path and os.path.exists(temp_path):
-            os.unlink(temp_path)
+        # Cevap ayrıştırılamadıysa (boş değerlendirme) kaydedilmez; tekrar gönderim yeniden denenir
+        if not evaluation_data.get("genelDegerlendirme"):
+            evaluation_data["project_id"] = project_suggestion.id
+            return evaluation_data
+        stored = await run_in_threadpool(db_service.save_evaluation, db, project_suggestion.id, content_hash,
+                                         EVALUATION_PROMPT_VERSION, file_name, evaluation_data)
+
+    evaluation_data = dict(stored.evaluation)
+    evaluation_data.update(project_id=project_suggestion.id, evaluation_id=stored.id, cached=cached)
+    if skipped_files:
+        evaluation_data["skipped_files"] = skipped_files
+    return evaluation_data
+
+
+@app.get("/api/projects/{project_id}/evaluations", response_model=list[ProjectEvaluationOut], tags=["Projects"])
+def get_project_evaluations(project_id: int, db: Session = Depends(get_db),
+                            current_user: User = Depends(get_current_user)):
+    """Projenin kayıtlı değerlendirme geçmişi (yeniden eskiye); Gemini çağrısı yapılmaz."""
+    project = db.query(Project.id).filter(Project.id == project_id, Project.user_id == current_user.id).first()
+    if not project:
+        raise HTTPException(status_code=404, detail="Project suggestion not found or you don't have access.")
+    return db_service.get_project_evaluations(db, project_id)
 
 
 @app.get("/api/projects", response_model=list[ProjectOut], tags=["Projects"])
@@ -308,61 +702,296 @@ def get_user_projects(db: Session = Depends(get_db), current_user: User = Depend
 
 
 # --- Motivasyon Mesajı ---
+FALLBACK_MOTIVATIONAL_MESSAGE = "Great projects are waiting for you, let's get started!"
+
+
 @app.get("/motivational-message", tags=["Utilities"])
 async def get_motivational_message():
+    message = motivational_pool.get_message()
+    if message:
+        return {"message": message}
+
+    # Havuz henüz dolmadıysa (ör. sunucu yeni açıldıysa) tek seferlik canlı üretim yapılır
     try:
-        raw_response = gemini_service.generate_content(MOTIVATIONAL_PROMPT)
-        formatted_response = " ".join(raw_response.replace("**", " ").replace("*", "").split())
-        return {"message": formatted_response}
+        message = await motivational_pool.generate_message()
     except Exception as e:
         print(f"Motivational Message Error: {e}")
-        raise HTTPException(status_code=500, detail="Great projects are waiting for you, let's get started!")
+    return {"message": message or FALLBACK_MOTIVATIONAL_MESSAGE}
+
+
+@app.get("/metrics", tags=["Utilities"], include_in_schema=False)
+def get_metrics():
+    """LLM çağrı metrikleri (generator/şablon bazında gecikme, token, hata), Prometheus metin formatında."""
+    return Response(content=gemini_service.metrics.registry.render(), media_type=METRICS_CONTENT_TYPE)
 
 
 # --- Quiz ---
+@app.get("/api/roadmaps/{roadmap_id}/quizzes/latest", response_model=QuizResponse, tags=["Quizzes"])
+def get_latest_quiz(roadmap_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    roadmap = db.query(Roadmap.id).filter(Roadmap.id == roadmap_id, Roadmap.user_id == current_user.id).first()
+    if not roadmap:
+        raise HTTPException(status_code=404, detail="Roadmap not found or access denied.")
+
+    quiz_data = db_service.get_latest_quiz(db, roadmap_id)
+    if not quiz_data:
+        raise HTTPException(status_code=404, detail="No quiz found for this roadmap.")
+    return quiz_data
+
+
 @app.post("/api/quizzes/generate", response_model=QuizResponse, tags=["Quizzes"])
-def generate_quiz(request: QuizRequest, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def generate_quiz(request: QuizRequest, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """Kayıtlı bir quiz varsa Gemini'ye gitmeden onu döndürür; regenerate=True ise yeni bir sürüm üretir."""
     try:
-        roadmap = db.query(Roadmap).filter(Roadmap.id == request.roadmap_id, Roadmap.user_id == current_user.id).first()
-        if not roadmap:
-            raise HTTPException(status_code=404, detail="Roadmap not found or access denied.")
-
-        left_items = []
-        right_items = []
-        for stage in roadmap.content.get("mainStages", []):
-            for node in stage.get("subNodes", []):
-                left_items.extend(node.get("leftItems", []))
-                right_items.extend(node.get("rightItems", []))
-
-        if not left_items and not right_items:
-            raise HTTPException(status_code=404, detail="No items found in roadmap to generate a quiz.")
-
-        quiz_data = quiz_generator.create_quiz(roadmap_id=request.roadmap_id, rightItems=right_items,
-                                               leftItems=left_items)
-
-        for level_data in quiz_data.get("levels", []):
-            level_title = level_data.get("levelTitle", "Unknown Level")
-            for question_data in level_data.get("questions", []):
-                new_question = Quiz(
-                    roadmap_id=request.roadmap_id,
-                    question=question_data.get("question"),
-                    level=level_title,
-                    options=question_data.get("options"),
-                    answer=question_data.get("answer")
-                )
-                db.add(new_question)
-
-        db.commit()
-        return quiz_data
+        return await _create_quiz(db, current_user.id, request)
+    except HTTPException:
+        raise
     except ValueError as ve:
-        db.rollback()
+        await run_in_threadpool(db.rollback)
         raise HTTPException(status_code=500, detail=str(ve))
     except Exception as e:
-        db.rollback()
+        await run_in_threadpool(db.rollback)
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"An unexpected error occurred while creating the quiz: {e}")
 
 
+def _load_quiz_source(db: Session, user_id: int, request: QuizRequest):
+    """
+    (kayıtlı quiz, sol öğeler, sağ öğeler). regenerate=False ve kayıtlı quiz varsa öğeler okunmaz.
+    Yol haritası yoksa veya quiz üretilecek öğe yoksa 404.
+    """
+    roadmap = db.query(Roadmap).filter(Roadmap.id == request.roadmap_id, Roadmap.user_id == user_id).first()
+    if not roadmap:
+        raise HTTPException(status_code=404, detail="Roadmap not found or access denied.")
+
+    if not request.regenerate:
+        stored_quiz = db_service.get_latest_quiz(db, roadmap.id)
+        if stored_quiz:
+            return stored_quiz, [], []
+
+    left_items, right_items = roadmap_index.get_quiz_items(db, roadmap)
+    if not left_items and not right_items:
+        raise HTTPException(status_code=404, detail="No items found in roadmap to generate a quiz.")
+    return None, left_items, right_items
+
+
+def _save_quiz(db: Session, roadmap_id: int, quiz_data: dict) -> None:
+    db_service.save_quiz_questions(db, roadmap_id=roadmap_id, quiz_data=quiz_data)
+
+
+async def _create_quiz(db: Session, user_id: int, request: QuizRequest) -> dict:
+    stored_quiz, left_items, right_items = await run_in_threadpool(_load_quiz_source, db, user_id, request)
+    if stored_quiz:
+        return stored_quiz
+
+    quiz_data = await quiz_generator.create_quiz(roadmap_id=request.roadmap_id, rightItems=right_items,
+                                                 leftItems=left_items)
+    await run_in_threadpool(_save_quiz, db, request.roadmap_id, quiz_data)
+    return quiz_data
+
+
+@app.post("/api/quizzes/generate/stream", tags=["Quizzes"])
+async def stream_quiz(request: QuizRequest, db: Session = Depends(get_db),
+                      current_user: User = Depends(get_current_user)):
+    """
+    Quiz seviyelerini Gemini ürettikçe Server-Sent Events olarak gönderir; bitince soruları kaydeder.
+    Kayıtlı bir quiz varsa (ve regenerate=False ise) seviyeler doğrudan kayıttan gönderilir.
+    """
+    stored_quiz, left_items, right_items = await run_in_threadpool(_load_quiz_source, db, current_user.id, request)
+
+    def save_streamed_quiz(quiz_data: dict) -> None:
+        # Akış bittiğinde istek oturumu kapanmış olabileceği için ayrı bir oturum açılır
+        stream_db = SessionLocal()
+        try:
+            _save_quiz(stream_db, request.roadmap_id, quiz_data)
+        finally:
+            stream_db.close()
+
+    async def event_stream():
+        if stored_quiz:
+            for level in stored_quiz["levels"]:
+                yield format_sse(level, event="level")
+            yield format_sse(stored_quiz, event="done")
+            return
+        try:
+            async for kind, data in quiz_generator.stream_quiz(roadmap_id=request.roadmap_id, rightItems=right_items,
+                                                               leftItems=left_items):
+                if kind == "level":
+                    yield format_sse(data, event="level")
+                    continue
+
+                await run_in_threadpool(save_streamed_quiz, data)
+                yield format_sse(data, event="done")
+        except Exception as e:
+            traceback.print_exc()
+            yield format_sse({"detail": f"An unexpected error occurred while creating the quiz: {e}"}, event="error")
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+# --- Arka Plan İşleri ---
+# Uzun AI işleri kuyruğa alınır, istek hemen iş id'siyle döner. Sonuç GET /api/jobs/{job_id} ile
+# sorgulanır veya /ws/jobs websocket'inden bildirim olarak gelir.
+def _job_message(job: Job) -> str:
+    return json.dumps(JobOut.model_validate(job).model_dump(mode="json"), ensure_ascii=False)
+
+
+async def _notify_job_finished(job: Job):
+    await manager.broadcast(_job_message(job), f"jobs-{job.user_id}")
+
+
+job_queue = JobQueue(
+    session_factory=SessionLocal,
+    backend=settings.JOB_QUEUE_BACKEND,
+    workers=settings.JOB_WORKERS,
+    poll_interval=settings.JOB_POLL_INTERVAL,
+    job_timeout=settings.JOB_TIMEOUT_SECONDS,
+    max_attempts=settings.JOB_MAX_ATTEMPTS,
+    recover_interval=settings.JOB_RECOVER_INTERVAL_SECONDS,
+    priorities=settings.JOB_PRIORITIES,
+    # database kuyruğunda iş başka bir süreçte bitebilir; bildirimler websocket tarafında yoklanarak gönderilir
+    on_finished=_notify_job_finished if settings.JOB_QUEUE_BACKEND == "memory" else None,
+)
+
+
+async def _run_roadmap_job(db: Session, job: Job):
+    roadmap = await _create_roadmap(db, job.user_id, TopicRequest(**job.payload))
+    return roadmap.model_dump(mode="json")
+
+
+async def _run_cv_analysis_job(db: Session, job: Job):
+    cv_entry = await _analyze_cv_text(db, job.user_id, job.payload["file_name"], job.payload["cv_text"],
+                                      job.payload.get("target_profile"))
+    return CVOut.model_validate(cv_entry).model_dump(mode="json")
+
+
+async def _run_project_suggestions_job(db: Session, job: Job):
+    suggestions = await _create_project_suggestions(db, job.user_id, refresh=job.payload.get("refresh", False))
+    return suggestions.model_dump(mode="json")
+
+
+async def _run_project_evaluation_job(db: Session, job: Job):
+    project = await run_in_threadpool(_get_user_project, db, job.payload["project_id"], job.user_id)
+    return await _evaluate_project_text(db, project, job.payload["project_text"], job.payload.get("skipped_files"),
+                                        job.payload.get("file_name"))
+
+
+async def _run_quiz_job(db: Session, job: Job):
+    return await _create_quiz(db, job.user_id, QuizRequest(**job.payload))
+
+
+job_queue.register("roadmap", _run_roadmap_job)
+job_queue.register("cv_analysis", _run_cv_analysis_job)
+job_queue.register("project_suggestions", _run_project_suggestions_job)
+job_queue.register("project_evaluation", _run_project_evaluation_job)
+job_queue.register("quiz", _run_quiz_job)
+
+
+@app.post("/api/jobs/roadmaps", response_model=JobOut, status_code=status.HTTP_202_ACCEPTED, tags=["Jobs"])
+def submit_roadmap_job(request: TopicRequest, db: Session = Depends(get_db),
+                       current_user: User = Depends(get_current_user)):
+    return job_queue.submit(db, current_user.id, "roadmap", request.model_dump())
+
+
+@app.post("/api/jobs/cv/analyze", response_model=JobOut, status_code=status.HTTP_202_ACCEPTED, tags=["Jobs"])
+async def submit_cv_analysis_job(file: UploadFile = File(...), target_profile: Optional[str] = Form(None),
+                                 db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    # Metin çıkarma istek içinde yapılır; kuyruğa sadece metin yazılır
+    _check_target_profile(target_profile)
+    content = await _read_cv_upload(file)
+    try:
+        cv_text = await parse_pool.run(CVAnalyzer.read_cv_bytes, content, file.filename)
+    except Exception as e:
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"CV analysis failed: {str(e)}")
+    return await run_in_threadpool(job_queue.submit, db, current_user.id, "cv_analysis",
+                                   {"file_name": file.filename, "cv_text": cv_text, "target_profile": target_profile})
+
+
+@app.post("/api/jobs/project-suggestions", response_model=JobOut, status_code=status.HTTP_202_ACCEPTED,
+          tags=["Jobs"])
+def submit_project_suggestions_job(refresh: bool = Query(False, description="Generate a new suggestion set"),
+                                   db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    return job_queue.submit(db, current_user.id, "project_suggestions", {"refresh": refresh})
+
+
+@app.post("/api/jobs/projects/{project_id}/evaluate", response_model=JobOut, status_code=status.HTTP_202_ACCEPTED,
+          tags=["Jobs"])
+async def submit_project_evaluation_job(project_id: int, file: UploadFile = File(...), db: Session = Depends(get_db),
+                                        current_user: User = Depends(get_current_user)):
+    await run_in_threadpool(_get_user_project, db, project_id, current_user.id)
+
+    # Metin çıkarma istek içinde yapılır; kuyruğa sadece metin yazılır
+    content = await read_upload(file, settings.PROJECT_UPLOAD_MAX_BYTES)
+    try:
+        project_text, skipped_files = await _read_project_upload(content, file.filename)
+    except HTTPException:
+        raise
+    except Exception:
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail="An internal error occurred during project evaluation.")
+    return await run_in_threadpool(job_queue.submit, db, current_user.id, "project_evaluation",
+                                   {"project_id": project_id, "project_text": project_text,
+                                    "skipped_files": skipped_files, "file_name": file.filename})
+
+
+@app.post("/api/jobs/quizzes", response_model=JobOut, status_code=status.HTTP_202_ACCEPTED, tags=["Jobs"])
+def submit_quiz_job(request: QuizRequest, db: Session = Depends(get_db),
+                    current_user: User = Depends(get_current_user)):
+    roadmap = db.query(Roadmap.id).filter(Roadmap.id == request.roadmap_id, Roadmap.user_id == current_user.id).first()
+    if not roadmap:
+        raise HTTPException(status_code=404, detail="Roadmap not found or access denied.")
+    return job_queue.submit(db, current_user.id, "quiz", request.model_dump())
+
+
+@app.get("/api/jobs/{job_id}", response_model=JobOut, tags=["Jobs"])
+def get_job(job_id: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    job = get_user_job(db, current_user.id, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+def _get_finished_job_messages(user_id: int, since: datetime) -> list[tuple[datetime, str]]:
+    db = SessionLocal()
+    try:
+        return [(job.finished_at, _job_message(job)) for job in get_finished_jobs(db, user_id, since)]
+    finally:
+        db.close()
+
+
+@app.websocket("/ws/jobs")
+async def jobs_websocket(websocket: WebSocket, token: str = Query(...)):
+    """Kullanıcının işleri bittikçe JobOut mesajı gönderir. Kimlik, token sorgu parametresiyle doğrulanır."""
+    try:
+        user_id = int(verify_token(token)["sub"])
+    except Exception:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    room_name = f"jobs-{user_id}"
+    await manager.connect(websocket, room_name)
+    since = datetime.utcnow()
+    try:
+        while True:
+            if job_queue.on_finished is not None:
+                await websocket.receive_text()
+                continue
+
+            try:
+                await asyncio.wait_for(websocket.receive_text(), timeout=settings.JOB_POLL_INTERVAL)
+                continue
+            except asyncio.TimeoutError:
+                pass
+            finished = await run_in_threadpool(_get_finished_job_messages, user_id, since)
+            for finished_at, message in finished:
+                since = max(since, finished_at)
+                await websocket.send_text(message)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        manager.disconnect(websocket, room_name)
+
+
 # --- Hackathon, Takım ve Sohbet ---
 @app.get("/hackathons/", response_model=List[schemas.HackathonSchema], tags=["Hackathons"])
 def get_hackathons(db: Session = Depends(get_db)):
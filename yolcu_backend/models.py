@@ -1,11 +1,15 @@
 from datetime import datetime, timezone
 
 
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, TIMESTAMP, func, Numeric, DateTime
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, TIMESTAMP, func, Numeric, DateTime, JSON, \
+    UniqueConstraint, Index
+from sqlalchemy.orm import relationship, deferred
 from yolcu_backend.database import Base
 from sqlalchemy.dialects.postgresql import JSONB
 
+# PostgreSQL'de JSONB, diğer veritabanlarında (ör. benchmark için SQLite) JSON olarak saklanır
+JSONType = JSON().with_variant(JSONB(), "postgresql")
+
 
 class User(Base):
     __tablename__ = "users"
@@ -31,12 +35,95 @@ class Roadmap(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    content = Column(JSONB, nullable=False)  # <-- JSONB olarak değişti
+    # Ortak şablondan oluşturulan yol haritalarında boştur; içerik şablondan okunur (bkz. content).
+    # Listelemede yüklenmemesi için ertelenir; ilk erişimde ayrı bir sorguyla okunur.
+    own_content = deferred(Column("content", JSONType, nullable=True))  # <-- JSONB olarak değişti
+    template_id = Column(Integer, ForeignKey("roadmap_templates.id"), nullable=True, index=True)
+    # Liste ekranı için kayıt sırasında hesaplanan özet bilgiler (bkz. roadmap_index.content_stats)
+    title = Column(String(255), nullable=True)
+    stage_count = Column(Integer, nullable=True)
+    item_count = Column(Integer, nullable=True)
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
     updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now())
 
     user = relationship("User", back_populates="roadmaps")
+    template = relationship("RoadmapTemplate")
     quizzes = relationship("Quiz", back_populates="roadmap", cascade="all, delete-orphan")
+    items = relationship("RoadmapItem", back_populates="roadmap", cascade="all, delete-orphan",
+                         order_by="RoadmapItem.position")
+    summaries = relationship("RoadmapSummary", back_populates="roadmap", cascade="all, delete-orphan")
+
+    @property
+    def content(self):
+        if self.own_content is not None:
+            return self.own_content
+        return self.template.content if self.template is not None else None
+
+    @content.setter
+    def content(self, value):
+        self.own_content = value
+
+
+# "Kullanıcının en son yol haritası" sorgusu için
+Index("ix_roadmaps_user_id_created_at", Roadmap.user_id, Roadmap.created_at.desc(), Roadmap.id.desc())
+
+
+class RoadmapTemplate(Base):
+    """
+    Aynı konu için kullanıcılar arasında paylaşılan yol haritası içeriği.
+    topic_key normalize edilmiş konu adıdır; bir konu için birden fazla varyant olabilir.
+    content_hash içeriğin SHA-256 özetidir, aynı içerik iki kez saklanmaz.
+    variant_no konunun varyant yuvasıdır (0..ROADMAP_TEMPLATE_VARIANTS-1); (topic_key, variant_no)
+    benzersiz olduğu için eşzamanlı üretimler varyant sınırını aşamaz. Eski şablonlarda boştur.
+    """
+    __tablename__ = "roadmap_templates"
+    __table_args__ = (Index("uq_roadmap_templates_topic_variant", "topic_key", "variant_no", unique=True),)
+
+    id = Column(Integer, primary_key=True)
+    topic_key = Column(String(255), nullable=False, index=True)
+    field = Column(Text, nullable=False)  # kullanıcının yazdığı ilk hali
+    content = Column(JSONType, nullable=False)
+    content_hash = Column(String(64), unique=True, nullable=False)
+    variant_no = Column(Integer, nullable=True)
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+
+
+class RoadmapItem(Base):
+    """
+    Roadmap.content içindeki her leftItems/rightItems öğesinin düz kopyası.
+    item_id ile konu, ana düğüm ve aşama bilgisine JSON'u gezmeden ulaşmak için kullanılır.
+    """
+    __tablename__ = "roadmap_items"
+    __table_args__ = (UniqueConstraint("roadmap_id", "item_id", name="uq_roadmap_items_roadmap_item"),)
+
+    id = Column(Integer, primary_key=True)
+    roadmap_id = Column(Integer, ForeignKey("roadmaps.id", ondelete="CASCADE"), nullable=False)
+    item_id = Column(String(255), nullable=False)
+    name = Column(Text, nullable=False)
+    side = Column(String(20), nullable=False)  # "leftItems" veya "rightItems"
+    central_node = Column(Text, nullable=True)
+    stage_name = Column(Text, nullable=True)
+    stage_index = Column(Integer, nullable=False)
+    position = Column(Integer, nullable=False)  # yol haritasındaki sıra
+
+    roadmap = relationship("Roadmap", back_populates="items")
+
+
+class RoadmapSummary(Base):
+    """Üretilen konu özetleri; aynı öğe tekrar açıldığında Gemini yerine buradan sunulur."""
+    __tablename__ = "roadmap_summaries"
+    __table_args__ = (
+        UniqueConstraint("roadmap_id", "item_id", "prompt_version", name="uq_roadmap_summaries_item_version"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    roadmap_id = Column(Integer, ForeignKey("roadmaps.id", ondelete="CASCADE"), nullable=False)
+    item_id = Column(String(255), nullable=False)
+    prompt_version = Column(String(20), nullable=False)
+    summary = Column(Text, nullable=False)
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+
+    roadmap = relationship("Roadmap", back_populates="summaries")
 
 class CV(Base):
     __tablename__ = "cvs"
@@ -50,13 +137,14 @@ class CV(Base):
     advanced_score = Column(Numeric(5, 2))
     final_score = Column(Numeric(5, 2))
 
-    found_keywords = Column(JSONB)
-    missing_keywords = Column(JSONB)
+    found_keywords = Column(JSONType)
+    missing_keywords = Column(JSONType)
 
     feedback = Column(Text)
-    tips = Column(JSONB)
+    tips = Column(JSONType)
 
     language = Column(String(20))
+    target_profile = Column(String(50))  # skill_dictionary.TARGET_PROFILES anahtarı
 
     created_at = Column(TIMESTAMP, server_default=func.now())
     updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
@@ -74,6 +162,44 @@ class Project(Base):
     updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now())
 
     user = relationship("User", back_populates="projects")
+    evaluations = relationship("ProjectEvaluation", back_populates="project", cascade="all, delete-orphan")
+
+
+class ProjectEvaluation(Base):
+    """
+    Proje değerlendirmeleri. Aynı içerik (yüklemeden çıkarılan metnin SHA-256'sı) aynı prompt sürümüyle
+    tekrar gönderildiğinde Gemini yerine buradan sunulur; kayıtlar projenin değerlendirme geçmişidir.
+    """
+    __tablename__ = "project_evaluations"
+    __table_args__ = (
+        UniqueConstraint("project_id", "content_hash", "prompt_version", name="uq_project_evaluations_content_version"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    content_hash = Column(String(64), nullable=False)
+    prompt_version = Column(String(20), nullable=False)
+    file_name = Column(String(255), nullable=True)
+    evaluation = Column(JSONType, nullable=False)
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+
+    project = relationship("Project", back_populates="evaluations")
+
+
+class ProjectSuggestionSet(Base):
+    """
+    Kullanıcının son yol haritası için üretilen proje önerileri (ProjectSuggestionResponse JSON'u).
+    Sayfa yenilendiğinde Gemini'ye tekrar gidilmez ve aynı projeler tekrar oluşturulmaz.
+    """
+    __tablename__ = "project_suggestion_sets"
+    __table_args__ = (UniqueConstraint("user_id", "roadmap_id", name="uq_project_suggestion_sets_user_roadmap"),)
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    roadmap_id = Column(Integer, ForeignKey("roadmaps.id", ondelete="CASCADE"), nullable=False)
+    response = Column(JSONType, nullable=False)
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now())
 
 
 class Hackathon(Base):
@@ -113,14 +239,47 @@ class ChatMessage(Base):
     sender = relationship("User")
 class Quiz(Base):
     __tablename__ = "quizzes"
+    __table_args__ = (
+        Index("ix_quizzes_roadmap_version_level", "roadmap_id", "version", "level_no"),
+        # Aynı sürümü alan eşzamanlı iki kayıttan ikincisi reddedilir (save_quiz_questions tekrar dener)
+        Index("uq_quizzes_roadmap_version_level_position", "roadmap_id", "version", "level_no", "position",
+              unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     roadmap_id = Column(Integer, ForeignKey("roadmaps.id", ondelete="CASCADE"), nullable=False)
+    # Aynı yol haritası için her yeni quiz bir sonraki sürümle kaydedilir (eski kayıtlarda boş)
+    version = Column(Integer, nullable=True)
+    quiz_title = Column(String(255), nullable=True)
+    level_no = Column(Integer, nullable=True)
+    position = Column(Integer, nullable=True)  # seviye içindeki soru sırası
     question = Column(Text, nullable=False)
-    level = Column(String(255), nullable=False)
-    options = Column(JSONB, nullable=False)
+    level = Column(String(255), nullable=False)  # seviye başlığı (levelTitle)
+    options = Column(JSONType, nullable=False)
     answer = Column(Text, nullable=False)
     created_at = Column(TIMESTAMP, server_default=func.now())
     updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
 
     roadmap = relationship("Roadmap", back_populates="quizzes")
+
+
+class Job(Base):
+    """
+    Arka planda çalışan uzun AI işleri (yol haritası, CV analizi, quiz, ...).
+    status: queued -> running -> succeeded / failed. Sonuç JSON olarak result'ta saklanır.
+    """
+    __tablename__ = "jobs"
+    __table_args__ = (Index("ix_jobs_status_priority_created", "status", "priority", "created_at"),)
+
+    id = Column(String(32), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    kind = Column(String(50), nullable=False)
+    status = Column(String(20), nullable=False, default="queued")
+    priority = Column(Integer, nullable=False, default=0)  # küçük değer önce çalışır
+    payload = Column(JSONType, nullable=False)
+    result = Column(JSONType, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
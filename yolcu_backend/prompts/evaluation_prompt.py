@@ -1,3 +1,21 @@
+# Değerlendirme JSON formatı; tek prompt ile yapılan ve parça bulgularını birleştiren değerlendirmede ortaktır
+EVALUATION_OUTPUT_FORMAT = """LÜTFEN DEĞERLENDİRMENİ AŞAĞIDAKİ JSON FORMATINDA, TÜRKÇE OLARAK SUN. SADECE JSON ÇIKTISI VER, BAŞKA HİÇBİR AÇIKLAMA EKLEME:
+
+{{
+  "projeAmaci": "Projenin, verilen öneri doğrultusundaki amacını bir veya iki cümleyle özetle.",
+  "genelDegerlendirme": "Buraya kodun genel bir özetini ve proje önerisine ne kadar uyumlu olduğuna dair ilk izlenimini yaz.",
+  "olumluYonler": [
+    "Tespit ettiğin birinci olumlu nokta.",
+    "Tespit ettiğin ikinci olumlu nokta."
+  ],
+  "gelistirilebilecekYonler": [
+    "Tespit ettiğin birinci geliştirilebilir nokta ve nedeni.",
+    "Tespit ettiğin ikinci geliştirilebilir nokta ve nedeni."
+  ],
+  "ogrenmeTavsiyesi": "Kullanıcının bu projeden yola çıkarak ve orijinal öneriyi göz önünde bulundurarak kendini geliştirmek için hangi konulara odaklanması gerektiğini belirt."
+}}
+"""
+
 EVALUATION_PROMPT = """
 ### ROL TANIMI ###
 Sen, yazılım geliştirici adaylarının projelerini inceleyen, deneyimli, yapıcı ve empatik bir teknik ekip liderisin. Amacın, adayın sadece mevcut kodunu değerlendirmek değil, aynı zamanda ona kariyer yolculuğunda ışık tutacak, somut ve eyleme geçirilebilir geri bildirimler sunmak.
@@ -22,19 +40,61 @@ DEĞERLENDİRME KRİTERLERİ:
 3.  Teknik Yeterlilik ve En İyi Pratikler (Best Practices): Kullanılan teknolojiye (Python, SQL vb.) özgü en iyi pratikler uygulanmış mı? Algoritmik verimlilik, güvenlik ve hata yönetimi gibi konular ne durumda?
 4.  Geliştirilebilecek Yönler: Kodda veya projenin genel yapısında, orijinal proje önerisi daha iyi karşılanacak şekilde ne gibi iyileştirmeler yapılabilir? (Örn: Eksik bir özellik, daha modüler bir yapı, daha verimli bir algoritma vb.)
 
-LÜTFEN DEĞERLENDİRMENİ AŞAĞIDAKİ JSON FORMATINDA, TÜRKÇE OLARAK SUN. SADECE JSON ÇIKTISI VER, BAŞKA HİÇBİR AÇIKLAMA EKLEME:
+""" + EVALUATION_OUTPUT_FORMAT
+
+# Büyük projeler için: her dosya grubu ayrı değerlendirilir (map), bulgular tek değerlendirmede birleştirilir (reduce)
+EVALUATION_CHUNK_PROMPT = """
+### ROL TANIMI ###
+Sen, yazılım geliştirici adaylarının projelerini inceleyen, deneyimli bir teknik ekip liderisin.
+
+### GÖREV ###
+Bir geliştirici adayına aşağıdaki proje önerisi verilmiştir. Adayın projesi büyük olduğu için parça parça inceleniyor;
+sana projenin {part_no}/{part_count} numaralı parçası verildi. Sadece bu parçadaki dosyalara bakarak, daha sonra diğer
+parçaların bulgularıyla birleştirilecek kısa bulgular çıkar. Bulguları Türkçe yaz.
+
+--- ORİJİNAL PROJE ÖNERİSİ ---
+Başlık: {suggestion_title}
+Açıklama: {suggestion_description}
+--- ORİJİNAL PROJE ÖNERİSİ SONU ---
+
+Projedeki incelenen tüm dosyalar: {file_list}
+
+--- ADAYIN KODU (PARÇA {part_no}/{part_count}) ---
+{project_code}
+--- ADAYIN KODU SONU ---
+
+LÜTFEN BULGULARINI AŞAĞIDAKİ JSON FORMATINDA SUN. SADECE JSON ÇIKTISI VER, BAŞKA HİÇBİR AÇIKLAMA EKLEME:
 
 {{
-  "projeAmaci": "Projenin, verilen öneri doğrultusundaki amacını bir veya iki cümleyle özetle.",
-  "genelDegerlendirme": "Buraya kodun genel bir özetini ve proje önerisine ne kadar uyumlu olduğuna dair ilk izlenimini yaz.",
-  "olumluYonler": [
-    "Tespit ettiğin birinci olumlu nokta.",
-    "Tespit ettiğin ikinci olumlu nokta."
-  ],
-  "gelistirilebilecekYonler": [
-    "Tespit ettiğin birinci geliştirilebilir nokta ve nedeni.",
-    "Tespit ettiğin ikinci geliştirilebilir nokta ve nedeni."
-  ],
-  "ogrenmeTavsiyesi": "Kullanıcının bu projeden yola çıkarak ve orijinal öneriyi göz önünde bulundurarak kendini geliştirmek için hangi konulara odaklanması gerektiğini belirt."
+  "parcaOzeti": "Bu parçadaki dosyaların ne yaptığını bir veya iki cümleyle özetle.",
+  "oneriyeUygunluk": ["Bu parçada, önerideki gereksinimlerden hangilerinin karşılandığı veya eksik kaldığı."],
+  "olumluYonler": ["Bu parçada tespit ettiğin olumlu nokta."],
+  "gelistirilebilecekYonler": ["Bu parçada tespit ettiğin geliştirilebilir nokta ve nedeni."]
 }}
-"""
\ No newline at end of file
+"""
+
+EVALUATION_REDUCE_PROMPT = """
+### ROL TANIMI ###
+Sen, yazılım geliştirici adaylarının projelerini inceleyen, deneyimli, yapıcı ve empatik bir teknik ekip liderisin. Amacın, adayın sadece mevcut kodunu değerlendirmek değil, aynı zamanda ona kariyer yolculuğunda ışık tutacak, somut ve eyleme geçirilebilir geri bildirimler sunmak.
+
+### GÖREV ###
+Bir geliştirici adayına aşağıdaki proje önerisi verilmiştir. Adayın projesi büyük olduğu için parçalar halinde incelendi;
+her parçanın bulguları aşağıdadır. Bu bulguları birleştirerek projenin tamamı için tek bir değerlendirme yaz:
+tekrarlanan noktaları birleştir, parçalar arasındaki çelişkileri gider ve projenin orijinal öneriyi ne kadar
+karşıladığını bütün olarak değerlendir. Geri bildirimi Türkçe yaz.
+
+--- ORİJİNAL PROJE ÖNERİSİ ---
+Başlık: {suggestion_title}
+Açıklama: {suggestion_description}
+--- ORİJİNAL PROJE ÖNERİSİ SONU ---
+
+İncelenen dosyalar: {file_list}
+
+--- PARÇA BULGULARI ---
+{partial_findings}
+--- PARÇA BULGULARI SONU ---
+
+""" + EVALUATION_OUTPUT_FORMAT
+
+# Kaydedilen değerlendirmeler bu sürümle saklanır; yukarıdaki prompt'lardan biri değişirse artırılmalı
+EVALUATION_PROMPT_VERSION = "1"
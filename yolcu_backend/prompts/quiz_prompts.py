@@ -47,4 +47,60 @@ Quiz aşağıdaki kurallara HARFİYEN uymalıdır:
     }}
   ]
 }}
-"""
\ No newline at end of file
+"""
+
+
+# Seviye bazlı (paralel) üretim için: her seviye ayrı bir istekle üretilir
+QUIZ_LEVELS = [
+    (1, "Temel Kavramlar ve Tanımlar",
+     "En Kolay: Sadece temel tanımlar, \"nedir?\", \"ne anlama gelir?\" gibi en basit ve temel kavramları "
+     "sorgulayan sorular."),
+    (2, "Kavramların İşleyişi",
+     "Kolay: Kavramların açıklaması, nasıl çalıştığı, temel amaçları ve basit karşılaştırmaları içeren sorular."),
+    (3, "Pratik Uygulamalar",
+     "Orta: Basit pratik uygulama soruları, küçük kod parçacıklarının ne işe yaradığını soran veya "
+     "\"bu durumda hangi yöntem kullanılır?\" tipi senaryo soruları."),
+    (4, "Problem Çözme ve Analiz",
+     "Zor: Birden fazla kavramı birleştiren, senaryo bazlı problem çözme, hata ayıklama (debugging) veya "
+     "avantaj/dezavantaj analizini gerektiren sorular."),
+    (5, "Uzman Seviyesi",
+     "En Zor / Uzman: En iyi pratikler (best practices), mimari kararlar, ileri seviye ve az bilinen konular, "
+     "performans optimizasyonu veya farklı yaklaşımların kritik analizini isteyen uzman seviye sorular."),
+]
+
+QUIZ_LEVEL_PROMPT_TEMPLATE = """
+Sen, çeşitli teknik konularda uzman bir eğitmen ve sınav hazırlama uzmanısın.
+Görevin, aşağıda belirtilen konulara göre 5 seviyeli bir quiz'in SADECE {level}. seviyesini oluşturmaktır.
+
+Ana odaklanılacak konular (Sorular bu konulardan türetilmelidir):
+{rightItems}
+
+İlişkili veya daha az öncelikli konular (Seçenekleri zenginleştirmek için kullanılabilir):
+{leftItems}
+
+Seviye {level} zorluğu: {level_description}
+
+Kurallar:
+1.  Tam olarak **5 adet çoktan seçmeli soru** olmalıdır.
+2.  Her sorunun **4 seçeneği** olmalıdır.
+3.  Her sorunun tek bir doğru cevabı belirtilmelidir.
+
+Çıktıyı **MUTLAKA** ve **SADECE** aşağıdaki JSON formatında döndür:
+
+{{
+  "level": {level},
+  "levelTitle": "{level_title}",
+  "questions": [
+    {{
+      "question": "Soru metni burada yer alacak.",
+      "options": [
+        "Seçenek A",
+        "Seçenek B",
+        "Seçenek C",
+        "Seçenek D"
+      ],
+      "answer": "Doğru olan seçenek metni. Örneğin: Seçenek A"
+    }}
+  ]
+}}
+"""
@@ -7,4 +7,25 @@ SUMMARY_PROMPT="""
 - Dikkat edilmesi gereken noktalar
 Gerektiğinde madde işaretleri kullan.
 Geri bildirimi Türkçe yaz.
-"""
\ No newline at end of file
+"""
+# Aynı ana düğümdeki (subNode) konuların özetlerini tek istekte üretmek için
+SUMMARY_BATCH_PROMPT = """
+Aşağıdaki konuların her birini, ana başlık '{center_node}' bağlamında
+öğrencilere akademik ve öğretici bir dille ayrı ayrı özetle.
+Her özet için:
+- Tanım ve önemi
+- Temel kavramlar
+- Uygulama alanları ve örnekler
+- Dikkat edilmesi gereken noktalar
+Gerektiğinde madde işaretleri kullan.
+Geri bildirimi Türkçe yaz.
+
+Konular (id: konu):
+{topics}
+
+Cevabı SADECE aşağıdaki JSON formatında ver. Anahtarlar konu id'leri, değerler o konunun özet metni olsun:
+{{"<id>": "<özet>"}}
+"""
+
+# Kaydedilen özetler bu sürümle saklanır; SUMMARY_PROMPT veya SUMMARY_BATCH_PROMPT değişirse artırılmalı
+SUMMARY_PROMPT_VERSION = "1"
@@ -0,0 +1,68 @@
+"""
+create_all yeni tabloları oluşturur ama mevcut tablolara sütun eklemez. Var olan veritabanlarında
+modele sonradan eklenen sütunlar burada, idempotent adımlarla eklenir. Uygulama açılışında
+create_all'dan hemen sonra çalışır.
+"""
+import logging
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+
+logger = logging.getLogger(__name__)
+
+# (tablo, sütun, sütun tanımı)
+ADDED_COLUMNS = [
+    ("roadmaps", "template_id", "INTEGER REFERENCES roadmap_templates(id)"),
+    ("roadmap_templates", "variant_no", "INTEGER"),
+    ("roadmaps", "title", "VARCHAR(255)"),
+    ("roadmaps", "stage_count", "INTEGER"),
+    ("roadmaps", "item_count", "INTEGER"),
+    ("quizzes", "version", "INTEGER"),
+    ("quizzes", "quiz_title", "VARCHAR(255)"),
+    ("quizzes", "level_no", "INTEGER"),
+    ("quizzes", "position", "INTEGER"),
+    ("cvs", "target_profile", "VARCHAR(50)"),
+]
+
+# Eklenen sütunlar için indeksler; yeni kurulumlarda create_all aynı isimle oluşturur
+ADDED_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_roadmaps_template_id ON roadmaps (template_id)",
+    "CREATE INDEX IF NOT EXISTS ix_quizzes_roadmap_version_level ON quizzes (roadmap_id, version, level_no)",
+    "CREATE INDEX IF NOT EXISTS ix_roadmaps_user_id_created_at ON roadmaps (user_id, created_at DESC, id DESC)",
+]
+
+# Benzersiz indeksler eski verideki tekrarlar yüzünden oluşturulamayabilir; bu durumda açılış
+# durdurulmaz, uyarı loglanır (her biri kendi transaction'ında çalışır)
+ADDED_UNIQUE_INDEXES = [
+    "CREATE UNIQUE INDEX IF NOT EXISTS uq_roadmap_templates_topic_variant ON roadmap_templates (topic_key, variant_no)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS uq_quizzes_roadmap_version_level_position "
+    "ON quizzes (roadmap_id, version, level_no, position)",
+]
+
+
+def upgrade_schema(engine: Engine) -> None:
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table, column, definition in ADDED_COLUMNS:
+            existing = {col["name"] for col in inspector.get_columns(table)}
+            if column not in existing:
+                connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {definition}"))
+                logger.info(f"Added column {table}.{column}")
+
+        for statement in ADDED_INDEXES:
+            connection.execute(text(statement))
+
+        # Ortak şablona bağlı yol haritalarında içerik boş kalır
+        if engine.dialect.name == "postgresql":
+            content = next(col for col in inspector.get_columns("roadmaps") if col["name"] == "content")
+            if not content["nullable"]:
+                connection.execute(text("ALTER TABLE roadmaps ALTER COLUMN content DROP NOT NULL"))
+                logger.info("Made roadmaps.content nullable")
+
+    for statement in ADDED_UNIQUE_INDEXES:
+        try:
+            with engine.begin() as connection:
+                connection.execute(text(statement))
+        except IntegrityError as e:
+            logger.warning(f"Could not create unique index, existing rows have duplicates: {e}")
@@ -41,12 +41,14 @@ class LoginSchema(BaseModel):
 # ---------- Roadmap Request/Response ----------
 class TopicRequest(BaseModel):
     field: str  # Kullanıcıdan gelen konu
+    fresh: bool = False  # True ise ortak şablon kullanılmaz, kullanıcıya özel yeni bir varyant üretilir
 
 
 class RoadmapOut(BaseModel):
     id: int
     user_id: int
     content: Dict[str, Any]  # JSONB için dict tipinde
+    template_id: Optional[int] = None  # ortak şablondan oluşturulduysa şablonun id'si
     created_at: datetime
     updated_at: datetime
 
@@ -54,6 +56,24 @@ class RoadmapOut(BaseModel):
         from_attributes = True
 
 
+class RoadmapListItem(BaseModel):
+    """Liste ekranı için yol haritası özeti; içerik detay endpoint'inden alınır."""
+    id: int
+    user_id: int
+    diagramTitle: Optional[str] = None
+    stage_count: Optional[int] = None
+    item_count: Optional[int] = None
+    quiz_count: int = 0
+    template_id: Optional[int] = None
+    created_at: datetime
+    updated_at: datetime
+
+
+class RoadmapListResponse(BaseModel):
+    items: List[RoadmapListItem]
+    next_cursor: Optional[str] = None  # son sayfada None
+
+
 class CVBase(BaseModel):
     file_name: str
     content: str
@@ -65,6 +85,7 @@ class CVBase(BaseModel):
     feedback: Optional[str] = None
     tips: Optional[List[str]] = None
     language: Optional[str] = None
+    target_profile: Optional[str] = None
 
 
 class CVCreate(CVBase):
@@ -80,6 +101,12 @@ class CVOut(CVBase):
     class Config:
         from_attributes = True
 
+
+class TargetProfileOut(BaseModel):
+    key: str
+    title: str
+    skills: List[str]
+
 # ---------- Project Suggestion Schemas ----------
 class ProjectIdea(BaseModel):
     id: int
@@ -110,6 +137,19 @@ class ProjectOut(ProjectBase):
         from_attributes = True
 
 
+class ProjectEvaluationOut(BaseModel):
+    id: int
+    project_id: int
+    file_name: Optional[str] = None
+    content_hash: str  # yüklemeden çıkarılan metnin SHA-256'sı
+    prompt_version: str
+    evaluation: Dict[str, Any]
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
 #-----------Hackathon----------
 
 class UserBasicInfo(BaseModel):
@@ -165,6 +205,7 @@ class MessageSchema(BaseModel):
 # ---------- Quiz Schemas ----------
 class QuizRequest(BaseModel):
     roadmap_id: int
+    regenerate: bool = False  # False ise kayıtlı son quiz varsa o döner
 
 class Question(BaseModel):
     question: str
@@ -179,4 +220,21 @@ class QuizLevel(BaseModel):
 class QuizResponse(BaseModel):
     quizTitle: str
     levels: List[QuizLevel]
+    failedLevels: List[int] = []  # seviye bazlı üretimde tekrar denemelere rağmen üretilemeyen seviyeler
+    version: Optional[int] = None  # kayıtlı quiz sürümü
+
+
+# ---------- Job Schemas ----------
+class JobOut(BaseModel):
+    id: str
+    kind: str
+    status: str
+    priority: int
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
 
+    class Config:
+        from_attributes = True
@@ -0,0 +1,104 @@
+"""
+GeminiService'in arkasındaki değiştirilebilir yapay zeka backend'leri.
+
+Bir backend şu üç metodu sağlar:
+- generate(prompt) -> AIResponse                (senkron)
+- generate_async(prompt) -> AIResponse          (asenkron)
+- stream_async(prompt) -> AsyncIterator[str]    (cevabı parça parça döndürür)
+"""
+import asyncio
+import json
+import threading
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+
+
+@dataclass
+class AIResponse:
+    text: str
+    prompt_tokens: Optional[int] = None
+    response_tokens: Optional[int] = None
+
+
+class GeminiBackend:
+    def __init__(self, api_key: str, model_name: str = 'gemini-2.5-flash'):
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key)
+        self.model_name = model_name
+        self.model = genai.GenerativeModel(model_name)
+
+    @staticmethod
+    def _to_response(response) -> AIResponse:
+        usage = getattr(response, "usage_metadata", None)
+        return AIResponse(
+            text=response.text,
+            prompt_tokens=getattr(usage, "prompt_token_count", None),
+            response_tokens=getattr(usage, "candidates_token_count", None),
+        )
+
+    def generate(self, prompt: str) -> AIResponse:
+        return self._to_response(self.model.generate_content(prompt))
+
+    async def generate_async(self, prompt: str) -> AIResponse:
+        return self._to_response(await self.model.generate_content_async(prompt))
+
+    async def stream_async(self, prompt: str) -> AsyncIterator[str]:
+        response = await self.model.generate_content_async(prompt, stream=True)
+        async for chunk in response:
+            if chunk.text:
+                yield chunk.text
+
+
+class RecordingBackend:
+    """
+    Başka bir backend'i sarar ve her prompt/cevap çiftini JSONL dosyasına ekler.
+    Kaydedilen dosya FakeAIBackend'e replay_file olarak verilebilir.
+    """
+
+    def __init__(self, inner, path: str):
+        self.inner = inner
+        self.model_name = inner.model_name
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _record(self, prompt: str, text: str) -> None:
+        line = json.dumps({"prompt": prompt, "response": text}, ensure_ascii=False)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def generate(self, prompt: str) -> AIResponse:
+        response = self.inner.generate(prompt)
+        self._record(prompt, response.text)
+        return response
+
+    async def generate_async(self, prompt: str) -> AIResponse:
+        response = await self.inner.generate_async(prompt)
+        await asyncio.to_thread(self._record, prompt, response.text)
+        return response
+
+    async def stream_async(self, prompt: str) -> AsyncIterator[str]:
+        chunks = []
+        async for chunk in self.inner.stream_async(prompt):
+            chunks.append(chunk)
+            yield chunk
+        await asyncio.to_thread(self._record, prompt, "".join(chunks))
+
+
+def build_ai_backend(backend: str, api_key: str, model_name: str = 'gemini-2.5-flash',
+                     fake_latency: str = "fixed:0", replay_file: Optional[str] = None,
+                     record_file: Optional[str] = None):
+    """Ayarlardaki AI_BACKEND değerine göre backend oluşturur ("gemini" veya "fake")."""
+    if backend == "fake":
+        from yolcu_backend.services.fake_ai_backend import FakeAIBackend
+
+        ai_backend = FakeAIBackend(latency=fake_latency, replay_file=replay_file)
+    elif backend == "gemini":
+        ai_backend = GeminiBackend(api_key=api_key, model_name=model_name)
+    else:
+        raise ValueError(f"Unknown AI backend: {backend}")
+
+    if record_file:
+        ai_backend = RecordingBackend(ai_backend, record_file)
+    return ai_backend
@@ -1,12 +1,217 @@
-import google.generativeai as genai
+import asyncio
+import contextlib
+import time
+from typing import AsyncIterator, Callable, Dict, Optional, Tuple
+
+from yolcu_backend.services.ai_backends import GeminiBackend
+from yolcu_backend.services.llm_cache import LLMCache
+from yolcu_backend.services.metrics import LLMMetrics
+from yolcu_backend.services.single_flight import SingleFlight
+
+UNKNOWN_GENERATOR = "unknown"
+
+# Önbelleğe yazılmadan önce cevabı kontrol eden fonksiyon; False dönerse (veya hata fırlatırsa) cevap önbelleğe alınmaz
+ResponseValidator = Callable[[str], bool]
+
 
 class GeminiService:
-    def __init__(self, api_key: str, model_name: str = 'gemini-2.5-flash'):
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel(model_name)
+    def __init__(self, api_key: str, model_name: str = 'gemini-2.5-flash', max_concurrency: int = 8,
+                 generator_concurrency: Optional[Dict[str, int]] = None, cache: Optional[LLMCache] = None,
+                 backend=None, metrics: Optional[LLMMetrics] = None):
+        # backend verilmezse gerçek Gemini kullanılır; test/benchmark için FakeAIBackend verilebilir
+        self.backend = backend or GeminiBackend(api_key=api_key, model_name=model_name)
+        self.model_name = self.backend.model_name
+
+        # Aynı anda Gemini'ye gidebilecek istek sayısı (global ve generator bazında)
+        self.max_concurrency = max_concurrency
+        self.generator_concurrency = generator_concurrency or {}
+        self._global_semaphore: Optional[asyncio.Semaphore] = None
+        self._generator_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+        # Cevap önbelleği; sadece cache_ttl veren çağrılar kullanır
+        self.cache = cache
+        # Aynı prompt için eşzamanlı gelen (coalesce=True) çağrılar tek bir Gemini çağrısında birleşir
+        self.single_flight = SingleFlight()
+
+        # Generator ve prompt şablonu bazında gecikme/token/hata metrikleri (/metrics)
+        self.metrics = metrics or LLMMetrics()
+        self._register_stats_metrics()
+
+    def _register_stats_metrics(self) -> None:
+        registry = self.metrics.registry
+
+        def cache_events() -> Dict[Tuple[str, ...], float]:
+            stats = self.cache.stats() if self.cache is not None else {}
+            return {(event,): stats[event] for event in ("hits", "disk_hits", "misses") if event in stats}
+
+        def single_flight_calls() -> Dict[Tuple[str, ...], float]:
+            stats = self.single_flight.stats()
+            return {(result,): stats[result] for result in ("executed", "deduplicated")}
+
+        registry.counter("llm_cache_events_total", "LLM response cache lookups by result.", ("event",),
+                         collect=cache_events)
+        registry.gauge("llm_cache_entries", "Entries in the in-memory LLM response cache.",
+                       collect=lambda: {(): self.cache.stats()["entries"]} if self.cache is not None else {})
+        registry.counter("llm_single_flight_calls_total", "Calls that ran upstream vs. joined an in-flight call.",
+                         ("result",), collect=single_flight_calls)
+        registry.gauge("llm_single_flight_in_flight", "Distinct prompts currently waiting on the LLM.",
+                       collect=lambda: {(): self.single_flight.stats()["in_flight"]})
+
+    @staticmethod
+    def _is_cacheable(text: str, validate: Optional[ResponseValidator]) -> bool:
+        """Boş ya da validate'ten geçmeyen cevaplar önbelleğe yazılmaz; aksi halde TTL boyunca bozuk cevap sunulur."""
+        if not text or not text.strip():
+            return False
+        if validate is None:
+            return True
+        try:
+            return bool(validate(text))
+        except Exception:
+            return False
+
+    @staticmethod
+    def _labels(generator: Optional[str], template: Optional[str]) -> Tuple[str, str]:
+        generator = generator or UNKNOWN_GENERATOR
+        return generator, template or generator
+
+    def record_json_parse_failure(self, generator: Optional[str], template: Optional[str] = None) -> None:
+        """Generator'lar LLM cevabındaki JSON'u ayrıştıramadığında çağırır."""
+        generator, template = self._labels(generator, template)
+        self.metrics.json_parse_failures.inc(generator=generator, template=template)
 
-    def generate_content(self, prompt: str) -> str:
-        response = self.model.generate_content(prompt)
+    def generate_content(self, prompt: str, generator: Optional[str] = None, template: Optional[str] = None) -> str:
+        generator, template = self._labels(generator, template)
+        self.metrics.observe_source(generator, template, "upstream")
+        started = time.perf_counter()
+        try:
+            response = self.backend.generate(prompt)
+        except Exception as e:
+            self.metrics.observe_error(generator, template, e)
+            raise
+        self.metrics.observe_call(generator, template, prompt, response.text, time.perf_counter() - started,
+                                  response.prompt_tokens, response.response_tokens)
         return response.text
+
     def generate_answer(self, prompt: str) -> str:
-        return self.generate_content(prompt)
\ No newline at end of file
+        return self.generate_content(prompt)
+
+    # ------------------ Async ------------------
+    def _get_global_semaphore(self) -> asyncio.Semaphore:
+        if self._global_semaphore is None:
+            self._global_semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._global_semaphore
+
+    def _get_generator_semaphore(self, generator: Optional[str]) -> Optional[asyncio.Semaphore]:
+        if not generator or generator not in self.generator_concurrency:
+            return None
+        if generator not in self._generator_semaphores:
+            self._generator_semaphores[generator] = asyncio.Semaphore(self.generator_concurrency[generator])
+        return self._generator_semaphores[generator]
+
+    async def generate_content_async(self, prompt: str, generator: Optional[str] = None,
+                                     cache_ttl: Optional[float] = None, template: Optional[str] = None,
+                                     validate: Optional[ResponseValidator] = None,
+                                     coalesce: bool = False) -> str:
+        """
+        Event loop'u bloklamadan Gemini çağrısı yapar.
+        generator: çağıran generator'ın adı; generator bazlı eşzamanlılık limiti ve metrikler için kullanılır.
+        template: prompt şablonunun adı (metrik etiketi); verilmezse generator adı kullanılır.
+        cache_ttl: verilirse cevap bu süre (saniye) boyunca önbellekten sunulur. Yaratıcı
+        çağrılar (her seferinde farklı cevap beklenen) bunu vermez.
+        validate: cevap önbelleğe yazılmadan önce çağrılır (ör. JSON ayrıştırılabiliyor mu); geçmeyen cevap
+        çağırana yine döner ama önbelleğe alınmaz.
+        coalesce: True ise aynı prompt zaten Gemini'ye gönderilmişse yeni çağrı yapılmaz, o çağrının
+        sonucu beklenir. Cevabı paylaşılabilen çağrılar bunu açıkça ister; yaratıcı ve kullanıcının taze
+        cevap istediği çağrılar vermez ve her zaman kendi cevabını alır.
+        """
+        generator, template = self._labels(generator, template)
+        prompt_key = LLMCache.make_key(self.model_name, prompt)
+        use_cache = cache_ttl is not None and self.cache is not None
+        if use_cache:
+            cached = await self.cache.get(prompt_key)
+            if cached is not None:
+                self.metrics.observe_source(generator, template, "cache")
+                return cached
+
+        async def call_upstream() -> str:
+            text = await self._call_model_async(prompt, generator, template)
+            if use_cache and self._is_cacheable(text, validate):
+                await self.cache.set(prompt_key, text, cache_ttl)
+            return text
+
+        if not coalesce:
+            self.metrics.observe_source(generator, template, "upstream")
+            return await call_upstream()
+
+        source = "shared" if self.single_flight.is_in_flight(prompt_key) else "upstream"
+        self.metrics.observe_source(generator, template, source)
+        return await self.single_flight.do(prompt_key, call_upstream)
+
+    async def _call_model_async(self, prompt: str, generator: str, template: str) -> str:
+        generator_semaphore = self._get_generator_semaphore(generator) or contextlib.nullcontext()
+
+        # Önce generator kotası, sonra global kota alınır; böylece bir generator
+        # kendi kuyruğunda beklerken global slotları işgal etmez.
+        queued = time.perf_counter()
+        async with generator_semaphore:
+            async with self._get_global_semaphore():
+                started = time.perf_counter()
+                self.metrics.queue_wait.observe(started - queued, generator=generator, template=template)
+                try:
+                    response = await self.backend.generate_async(prompt)
+                except Exception as e:
+                    self.metrics.observe_error(generator, template, e)
+                    raise
+                self.metrics.observe_call(generator, template, prompt, response.text, time.perf_counter() - started,
+                                          response.prompt_tokens, response.response_tokens)
+                return response.text
+
+    async def stream_content_async(self, prompt: str, generator: Optional[str] = None,
+                                   cache_ttl: Optional[float] = None,
+                                   template: Optional[str] = None,
+                                   validate: Optional[ResponseValidator] = None) -> AsyncIterator[str]:
+        """
+        Cevabı Gemini ürettikçe parça parça döndürür (ilk byte'a kadar geçen süreyi kısaltmak için).
+        Önbellekte varsa tek parça halinde döner; yoksa akış bitince tam metin
+        validate'ten geçerse önbelleğe yazılır.
+        Akışta backend token sayısı vermediği için token metrikleri tahminidir.
+        """
+        generator, template = self._labels(generator, template)
+        prompt_key = LLMCache.make_key(self.model_name, prompt)
+        use_cache = cache_ttl is not None and self.cache is not None
+        if use_cache:
+            cached = await self.cache.get(prompt_key)
+            if cached is not None:
+                self.metrics.observe_source(generator, template, "cache")
+                yield cached
+                return
+
+        self.metrics.observe_source(generator, template, "upstream")
+        chunks = []
+        generator_semaphore = self._get_generator_semaphore(generator) or contextlib.nullcontext()
+        queued = time.perf_counter()
+        async with generator_semaphore:
+            async with self._get_global_semaphore():
+                started = time.perf_counter()
+                self.metrics.queue_wait.observe(started - queued, generator=generator, template=template)
+                try:
+                    async for text in self.backend.stream_async(prompt):
+                        if not chunks:
+                            self.metrics.time_to_first_chunk.observe(time.perf_counter() - started,
+                                                                     generator=generator, template=template)
+                        chunks.append(text)
+                        yield text
+                except Exception as e:
+                    self.metrics.observe_error(generator, template, e)
+                    raise
+                full_text = "".join(chunks)
+                self.metrics.observe_call(generator, template, prompt, full_text, time.perf_counter() - started)
+
+        if use_cache and self._is_cacheable(full_text, validate):
+            await self.cache.set(prompt_key, full_text, cache_ttl)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            "cache": self.cache.stats() if self.cache is not None else {},
+            "single_flight": self.single_flight.stats(),
+        }
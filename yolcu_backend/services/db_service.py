@@ -1,64 +1,87 @@
-import json
+import base64
 import logging
-from sqlalchemy.orm import Session
+from typing import Iterable, Optional
+from sqlalchemy import and_, func, insert, or_, select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload, undefer
 from yolcu_backend.models import Roadmap
-from sqlalchemy.orm import Session
+from yolcu_backend.services import roadmap_index
 from .. import models
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-def get_centralnode_titles(db: Session, user_id: int) -> list[str]:
+# Eşzamanlı kayıtlarda aynı quiz sürümü alınırsa save_quiz_questions en fazla bu kadar dener
+QUIZ_SAVE_ATTEMPTS = 3
+
+# Yol haritası içeriğindeki ana düğüm başlıkları (PostgreSQL jsonpath)
+CENTRAL_NODE_TITLES_PATH = "$.mainStages[*].subNodes[*].centralNodeTitle"
+
+_CENTRAL_NODE_TITLES_JSONB_SQL = text("""
+    SELECT q.title #>> '{}' AS title
+    FROM roadmaps r
+    LEFT JOIN roadmap_templates t ON t.id = r.template_id
+    CROSS JOIN LATERAL jsonb_path_query(COALESCE(r.content, t.content), CAST(:path AS jsonpath))
+        WITH ORDINALITY AS q(title, position)
+    WHERE r.id = :roadmap_id AND jsonb_typeof(q.title) = 'string'
+    GROUP BY 1
+    ORDER BY MIN(q.position)
+""")
+
+
+def get_latest_roadmap_id(db: Session, user_id: int) -> Optional[int]:
+    """Kullanıcının en son yol haritasının id'si; içerik yüklenmez (ix_roadmaps_user_id_created_at)."""
+    # Aynı saniyede oluşturulan yol haritalarında id sırayı belirler
+    row = (db.query(Roadmap.id).filter(Roadmap.user_id == user_id)
+           .order_by(Roadmap.created_at.desc(), Roadmap.id.desc()).first())
+    return row[0] if row else None
+
+
+def _central_node_titles_from_index(db: Session, roadmap_id: int) -> list[str]:
+    rows = (db.query(models.RoadmapItem.central_node)
+            .filter(models.RoadmapItem.roadmap_id == roadmap_id, models.RoadmapItem.central_node.isnot(None))
+            .group_by(models.RoadmapItem.central_node)
+            .order_by(func.min(models.RoadmapItem.position))
+            .all())
+    return [row[0] for row in rows]
+
+
+def _central_node_titles_from_content(db: Session, roadmap_id: int) -> list[str]:
     """
-    Fetches the most recent roadmap for a specific user, parses its content,
-    and extracts all 'centralNodeTitle' values.
+    Öğe indeksi henüz oluşturulmamış yol haritaları için. PostgreSQL'de başlıklar JSONB içinden
+    veritabanında çıkarılır; diğer veritabanlarında yol haritası yüklenip indekslenir.
     """
-    logger.info(f"Fetching centralnode titles from the latest roadmap for user_id: {user_id}")
-    try:
-        # Query for the most recent roadmap for the given user
-        latest_roadmap = db.query(Roadmap).filter(Roadmap.user_id == user_id).order_by(Roadmap.created_at.desc()).first()
+    if db.get_bind().dialect.name == "postgresql":
+        rows = db.execute(_CENTRAL_NODE_TITLES_JSONB_SQL,
+                          {"path": CENTRAL_NODE_TITLES_PATH, "roadmap_id": roadmap_id}).all()
+        return [row[0] for row in rows]
 
-        if not latest_roadmap:
-            logger.warning(f"No roadmaps found for user_id: {user_id}")
-            return []
+    titles = {}
+    for item in roadmap_index.get_items(db, db.get(Roadmap, roadmap_id)):
+        if item.central_node:
+            titles[item.central_node] = None
+    return list(titles)
 
-        content_data = latest_roadmap.content
-        if not content_data:
-            logger.warning(f"Latest roadmap for user_id: {user_id} has empty content.")
-            return []
 
-        titles = set()
-        data = {}
-        # If content is a string, parse it. If it's already a dict (from JSONB), use it directly.
-        if isinstance(content_data, str):
-            try:
-                data = json.loads(content_data)
-            except json.JSONDecodeError:
-                logger.warning(f"Could not decode JSON from roadmap content for user_id: {user_id}")
-                return []
-        elif isinstance(content_data, dict):
-            data = content_data
-        else:
-            logger.warning(f"Roadmap content is of unexpected type: {type(content_data)}")
-            return []
+def get_centralnode_titles(db: Session, user_id: int, roadmap_id: Optional[int] = None) -> list[str]:
+    """
+    Returns the unique 'centralNodeTitle' values of the user's most recent roadmap, in roadmap order.
+    Only the titles are read from the database; the roadmap content is not loaded.
+    roadmap_id: id of the latest roadmap, if the caller already looked it up
+    """
+    logger.info(f"Fetching centralnode titles from the latest roadmap for user_id: {user_id}")
+    try:
+        if roadmap_id is None:
+            roadmap_id = get_latest_roadmap_id(db, user_id)
 
-        main_stages = data.get('mainStages')
-        if not isinstance(main_stages, list):
-            logger.warning(f"Could not find a 'mainStages' list in roadmap content for user_id: {user_id}")
+        if roadmap_id is None:
+            logger.warning(f"No roadmaps found for user_id: {user_id}")
             return []
 
-        for stage in main_stages:
-            sub_nodes = stage.get('subNodes')
-            if not isinstance(sub_nodes, list):
-                continue
-            
-            for sub_node in sub_nodes:
-                title = sub_node.get('centralNodeTitle')
-                if title and isinstance(title, str):
-                    titles.add(title)
-
-        unique_titles = list(titles)
+        unique_titles = _central_node_titles_from_index(db, roadmap_id)
+        if not unique_titles:
+            unique_titles = _central_node_titles_from_content(db, roadmap_id)
         logger.info(f"Found {len(unique_titles)} unique titles in the latest roadmap for user_id: {user_id}")
         return unique_titles
 
@@ -66,8 +89,272 @@ def get_centralnode_titles(db: Session, user_id: int) -> list[str]:
         logger.error(f"An unexpected error occurred while fetching roadmap titles for user_id {user_id}: {e}", exc_info=True)
         return []
 
+def encode_roadmap_cursor(roadmap_id: int) -> str:
+    return base64.urlsafe_b64encode(str(roadmap_id).encode("ascii")).decode("ascii")
+
+
+def decode_roadmap_cursor(cursor: str) -> int:
+    """Geçersiz imleçte ValueError fırlatır."""
+    try:
+        return int(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("ascii"))
+    except (UnicodeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def list_roadmaps(db: Session, user_id: int, limit: int, cursor: Optional[str] = None) -> tuple[list[dict], Optional[str]]:
+    """
+    Kullanıcının yol haritalarını yeniden eskiye, (created_at, id) üzerinden keyset sayfalama ile listeler.
+    Sadece kayıtta hesaplanan özet bilgiler okunur; içerik (content) ve şablon yüklenmez.
+    Sonraki sayfa için imleç döner; son sayfada None.
+    """
+    query = (db.query(Roadmap).filter(Roadmap.user_id == user_id)
+             .order_by(Roadmap.created_at.desc(), Roadmap.id.desc()))
+    if cursor:
+        # İmleç önceki sayfanın son satırıdır. created_at o satırdan veritabanında okunur; Python'a alınıp
+        # tekrar gönderilmediği için saklama biçimi farkları (ör. SQLite'ta saniye kesri) karşılaştırmayı bozmaz.
+        roadmap_id = decode_roadmap_cursor(cursor)
+        created_at = select(Roadmap.created_at).where(Roadmap.id == roadmap_id).scalar_subquery()
+        query = query.filter(or_(Roadmap.created_at < created_at,
+                                 and_(Roadmap.created_at == created_at, Roadmap.id < roadmap_id)))
+    # Bir fazlası okunur; varsa sonraki sayfa vardır
+    roadmaps = query.limit(limit + 1).all()
+    has_more = len(roadmaps) > limit
+    roadmaps = roadmaps[:limit]
+    roadmap_index.backfill_stats(db, roadmaps)
+
+    roadmap_ids = [roadmap.id for roadmap in roadmaps]
+    quiz_counts = dict(
+        db.query(models.Quiz.roadmap_id, func.count(func.distinct(models.Quiz.version)))
+        .filter(models.Quiz.roadmap_id.in_(roadmap_ids))
+        .group_by(models.Quiz.roadmap_id)
+        .all()
+    ) if roadmap_ids else {}
+
+    items = [{
+        "id": roadmap.id,
+        "user_id": roadmap.user_id,
+        "diagramTitle": roadmap.title,
+        "stage_count": roadmap.stage_count,
+        "item_count": roadmap.item_count,
+        "quiz_count": quiz_counts.get(roadmap.id, 0),
+        "template_id": roadmap.template_id,
+        "created_at": roadmap.created_at,
+        "updated_at": roadmap.updated_at,
+    } for roadmap in roadmaps]
+    next_cursor = encode_roadmap_cursor(roadmaps[-1].id) if has_more else None
+    return items, next_cursor
+
+
+def get_roadmap_with_content(db: Session, user_id: int, roadmap_id: int) -> Optional[Roadmap]:
+    """Detay için yol haritasını içeriği (kendi içeriği veya şablonu) ile tek sorguda yükler."""
+    return (db.query(Roadmap)
+            .options(undefer(Roadmap.own_content), joinedload(Roadmap.template))
+            .filter(Roadmap.id == roadmap_id, Roadmap.user_id == user_id)
+            .first())
+
+
 def get_projects_by_user(db: Session, user_id: int) -> list[models.Project]:
     """
     Belirli bir kullanıcı ID'sine ait tüm projeleri veritabanından getirir.
     """
     return db.query(models.Project).filter(models.Project.user_id == user_id).all()
+
+
+def create_projects(db: Session, user_id: int, project_ideas: list[dict]) -> list[dict]:
+    """
+    Proje önerilerini tek bir toplu INSERT ... RETURNING ile ekler (commit çağırana aittir).
+    Eklenen projeleri ({"id", "title", "description"}) gönderildikleri sırayla döndürür.
+    """
+    if not project_ideas:
+        return []
+    rows = [{"user_id": user_id, "title": idea["title"], "description": idea["description"]} for idea in project_ideas]
+    result = db.execute(
+        insert(models.Project).returning(models.Project.id, models.Project.title, models.Project.description,
+                                         sort_by_parameter_order=True),
+        rows,
+    )
+    return [{"id": row.id, "title": row.title, "description": row.description} for row in result]
+
+
+def get_suggestion_set(db: Session, user_id: int, roadmap_id: int) -> Optional[models.ProjectSuggestionSet]:
+    return db.query(models.ProjectSuggestionSet).filter(
+        models.ProjectSuggestionSet.user_id == user_id,
+        models.ProjectSuggestionSet.roadmap_id == roadmap_id,
+    ).first()
+
+
+def save_suggestion_set(db: Session, user_id: int, roadmap_id: int, response: dict) -> dict:
+    """
+    Öneri setini (ve aynı oturumdaki yeni projeleri) kaydeder ve commit eder. Eşzamanlı başka bir
+    istek aynı yol haritası için önce kaydettiyse bu istekteki projeler geri alınır ve mevcut set döner.
+    """
+    suggestion_set = get_suggestion_set(db, user_id, roadmap_id)
+    if suggestion_set is None:
+        db.add(models.ProjectSuggestionSet(user_id=user_id, roadmap_id=roadmap_id, response=response))
+    else:
+        suggestion_set.response = response
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        logger.info(f"Project suggestions for user_id: {user_id}, roadmap_id: {roadmap_id} were already saved.")
+        return get_suggestion_set(db, user_id, roadmap_id).response
+    return response
+
+
+def get_latest_quiz_version(db: Session, roadmap_id: int) -> Optional[int]:
+    return db.query(func.max(models.Quiz.version)).filter(models.Quiz.roadmap_id == roadmap_id).scalar()
+
+
+def _quiz_rows(roadmap_id: int, version: int, quiz_data: dict) -> list[dict]:
+    quiz_title = quiz_data.get("quizTitle")
+    rows = []
+    used_level_nos = set()
+    for level_index, level_data in enumerate(quiz_data.get("levels", []), start=1):
+        level_title = level_data.get("levelTitle", "Unknown Level")
+        # (roadmap_id, version, level_no, position) benzersiz; modelin tekrarladığı seviye numarası kaydırılır
+        level_no = level_data.get("level") or level_index
+        if not isinstance(level_no, int) or level_no in used_level_nos:
+            level_no = max(used_level_nos | {level_index - 1}) + 1
+        used_level_nos.add(level_no)
+        for position, question_data in enumerate(level_data.get("questions", [])):
+            rows.append({
+                "roadmap_id": roadmap_id,
+                "version": version,
+                "quiz_title": quiz_title,
+                "level_no": level_no,
+                "position": position,
+                "question": question_data.get("question"),
+                "level": level_title,
+                "options": question_data.get("options"),
+                "answer": question_data.get("answer"),
+            })
+    return rows
+
+
+def save_quiz_questions(db: Session, roadmap_id: int, quiz_data: dict) -> int:
+    """
+    Üretilen quiz'in sorularını yol haritasının bir sonraki quiz sürümü olarak tek bir toplu
+    INSERT ile ekler, commit eder ve sürüm numarasını döndürür. Eşzamanlı başka bir istek aynı
+    sürümü önce kaydettiyse (benzersiz indeks ihlali) bir sonraki sürümle tekrar denenir.
+    Kaydedilecek soru yoksa sürüm numarası harcanmadan ValueError fırlatılır.
+    """
+    if not _quiz_rows(roadmap_id, 0, quiz_data):
+        raise ValueError("Generated quiz has no questions to save.")
+
+    for attempt in range(QUIZ_SAVE_ATTEMPTS):
+        version = (get_latest_quiz_version(db, roadmap_id) or 0) + 1
+        rows = _quiz_rows(roadmap_id, version, quiz_data)
+        try:
+            db.execute(insert(models.Quiz), rows)
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            if attempt + 1 == QUIZ_SAVE_ATTEMPTS:
+                raise
+            logger.info(f"Quiz version {version} for roadmap_id: {roadmap_id} was taken, retrying.")
+            continue
+        quiz_data["version"] = version
+        return version
+
+
+def get_latest_quiz(db: Session, roadmap_id: int) -> Optional[dict]:
+    """
+    Yol haritasının son kaydedilen quiz'ini QuizResponse biçiminde döndürür; yoksa None.
+    Sürüm bilgisi olmayan (bu özellikten önce kaydedilmiş) sorular seviye sırası bilinmediği için kullanılmaz.
+    """
+    version = get_latest_quiz_version(db, roadmap_id)
+    if version is None:
+        return None
+
+    rows = db.query(models.Quiz).filter(
+        models.Quiz.roadmap_id == roadmap_id,
+        models.Quiz.version == version,
+    ).order_by(models.Quiz.level_no, models.Quiz.position).all()
+
+    levels = []
+    for row in rows:
+        if not levels or levels[-1]["level"] != row.level_no:
+            levels.append({"level": row.level_no, "levelTitle": row.level, "questions": []})
+        levels[-1]["questions"].append({"question": row.question, "options": row.options, "answer": row.answer})
+
+    present = {level["level"] for level in levels}
+    expected = range(1, max(present | {5}) + 1)
+    return {
+        "quizTitle": rows[0].quiz_title if rows else "",
+        "levels": levels,
+        "failedLevels": [level_no for level_no in expected if level_no not in present],
+        "version": version,
+        "roadmap_id": roadmap_id,
+    }
+
+
+def get_stored_summary(db: Session, roadmap_id: int, item_id: str, prompt_version: str) -> Optional[str]:
+    """Daha önce üretilip kaydedilmiş özeti döndürür; yoksa None."""
+    row = db.query(models.RoadmapSummary.summary).filter(
+        models.RoadmapSummary.roadmap_id == roadmap_id,
+        models.RoadmapSummary.item_id == item_id,
+        models.RoadmapSummary.prompt_version == prompt_version,
+    ).first()
+    return row[0] if row else None
+
+
+def get_stored_summary_item_ids(db: Session, roadmap_id: int, item_ids: Iterable[str], prompt_version: str) -> set[str]:
+    """Verilen öğelerden özeti zaten kaydedilmiş olanların id'lerini döndürür."""
+    rows = db.query(models.RoadmapSummary.item_id).filter(
+        models.RoadmapSummary.roadmap_id == roadmap_id,
+        models.RoadmapSummary.item_id.in_(list(item_ids)),
+        models.RoadmapSummary.prompt_version == prompt_version,
+    ).all()
+    return {row[0] for row in rows}
+
+
+def save_summary(db: Session, roadmap_id: int, item_id: str, summary: str, prompt_version: str) -> None:
+    """
+    Özeti kaydeder ve commit eder. Aynı öğe için eşzamanlı başka bir istek önce kaydettiyse
+    (benzersizlik ihlali) mevcut kayıt korunur.
+    """
+    db.add(models.RoadmapSummary(roadmap_id=roadmap_id, item_id=item_id, summary=summary,
+                                 prompt_version=prompt_version))
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        logger.info(f"Summary for roadmap_id: {roadmap_id}, item_id: {item_id} was already saved.")
+
+
+def get_stored_evaluation(db: Session, project_id: int, content_hash: str,
+                          prompt_version: str) -> Optional[models.ProjectEvaluation]:
+    """Aynı içerik için daha önce kaydedilmiş değerlendirmeyi döndürür; yoksa None."""
+    return db.query(models.ProjectEvaluation).filter(
+        models.ProjectEvaluation.project_id == project_id,
+        models.ProjectEvaluation.content_hash == content_hash,
+        models.ProjectEvaluation.prompt_version == prompt_version,
+    ).first()
+
+
+def save_evaluation(db: Session, project_id: int, content_hash: str, prompt_version: str, file_name: Optional[str],
+                    evaluation: dict) -> models.ProjectEvaluation:
+    """
+    Değerlendirmeyi kaydeder ve commit eder. Aynı içerik için eşzamanlı başka bir istek önce kaydettiyse
+    (benzersizlik ihlali) mevcut kayıt döner.
+    """
+    stored = models.ProjectEvaluation(project_id=project_id, content_hash=content_hash, prompt_version=prompt_version,
+                                      file_name=file_name, evaluation=evaluation)
+    db.add(stored)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        logger.info(f"Evaluation for project_id: {project_id}, content_hash: {content_hash} was already saved.")
+        return get_stored_evaluation(db, project_id, content_hash, prompt_version)
+    db.refresh(stored)
+    return stored
+
+
+def get_project_evaluations(db: Session, project_id: int) -> list[models.ProjectEvaluation]:
+    """Projenin değerlendirme geçmişi, yeniden eskiye."""
+    return (db.query(models.ProjectEvaluation)
+            .filter(models.ProjectEvaluation.project_id == project_id)
+            .order_by(models.ProjectEvaluation.created_at.desc(), models.ProjectEvaluation.id.desc())
+            .all())
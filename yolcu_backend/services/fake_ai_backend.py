@@ -0,0 +1,221 @@
+"""
+Ağ bağlantısı ve API kotası gerektirmeyen sahte yapay zeka backend'i.
+Yük testleri ve CI benchmark'ları için kullanılır (AI_BACKEND=fake).
+
+- Gecikme dağılımı ayarlanabilir: "fixed:0.8", "uniform:0.2,1.5", "normal:1.0,0.3", "lognormal:0.8,0.5"
+- replay_file verilirse RecordingBackend ile kaydedilmiş gerçek prompt/cevap çiftleri tekrar oynatılır
+- Kayıtta olmayan promptlar için prompt şablonuna göre deterministik, geçerli JSON/metin üretilir
+"""
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+from typing import AsyncIterator, Dict, Optional
+
+from yolcu_backend.services.ai_backends import AIResponse
+
+STREAM_CHUNK_SIZE = 40
+
+
+def parse_latency(spec: str):
+    """Gecikme tanımını, saniye döndüren bir örnekleme fonksiyonuna çevirir."""
+    kind, _, params = spec.partition(":")
+    values = [float(value) for value in params.split(",") if value.strip()] if params else []
+    kind = kind.strip().lower()
+
+    if kind == "fixed":
+        delay = values[0] if values else 0.0
+        return lambda rng: delay
+    if kind == "uniform":
+        low, high = values
+        return lambda rng: rng.uniform(low, high)
+    if kind == "normal":
+        mean, std = values
+        return lambda rng: max(0.0, rng.gauss(mean, std))
+    if kind == "lognormal":
+        # median ve sigma ile: uzun kuyruklu, gerçek LLM gecikmelerine benzer dağılım
+        median, sigma = values
+        return lambda rng: rng.lognormvariate(0, sigma) * median
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+def _normalize(prompt: str) -> str:
+    return " ".join(prompt.split())
+
+
+class FakeAIBackend:
+    def __init__(self, latency: str = "fixed:0", replay_file: Optional[str] = None, seed: int = 0):
+        self.model_name = "fake"
+        self._sample_latency = parse_latency(latency)
+        self._rng = random.Random(seed)
+        self._replay: Dict[str, str] = {}
+        if replay_file:
+            self._load_replay(replay_file)
+
+    def _load_replay(self, path: str) -> None:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    self._replay[_normalize(record["prompt"])] = record["response"]
+
+    # ------------------ Backend arayüzü ------------------
+    def generate(self, prompt: str) -> AIResponse:
+        time.sleep(self._sample_latency(self._rng))
+        return self._respond(prompt)
+
+    async def generate_async(self, prompt: str) -> AIResponse:
+        await asyncio.sleep(self._sample_latency(self._rng))
+        return self._respond(prompt)
+
+    async def stream_async(self, prompt: str) -> AsyncIterator[str]:
+        text = self._respond(prompt).text
+        chunks = [text[i:i + STREAM_CHUNK_SIZE] for i in range(0, len(text), STREAM_CHUNK_SIZE)] or [""]
+        total = self._sample_latency(self._rng)
+
+        # Gecikmenin bir kısmı ilk parçaya kadar, kalanı parçalar arasında geçer
+        await asyncio.sleep(total * 0.3)
+        per_chunk = total * 0.7 / len(chunks)
+        for chunk in chunks:
+            yield chunk
+            await asyncio.sleep(per_chunk)
+
+    def _respond(self, prompt: str) -> AIResponse:
+        text = self._replay.get(_normalize(prompt))
+        if text is None:
+            text = canned_response(prompt)
+        # Token sayısı için kaba tahmin (~4 karakter = 1 token)
+        return AIResponse(text=text, prompt_tokens=len(prompt) // 4, response_tokens=len(text) // 4)
+
+
+# ------------------ Şablona göre hazır cevaplar ------------------
+def _prompt_rng(prompt: str) -> random.Random:
+    seed = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16], 16)
+    return random.Random(seed)
+
+
+def _paragraphs(rng: random.Random, topic: str, count: int) -> str:
+    sentences = [
+        f"{topic}, modern yazılım geliştirmede sık karşılaşılan temel bir konudur.",
+        f"{topic} öğrenirken önce temel kavramları, ardından pratik uygulamaları ele almak faydalıdır.",
+        "Küçük örnek projelerle ilerlemek öğrenilen bilginin kalıcı olmasını sağlar.",
+        "Resmi dokümantasyon ve topluluk kaynakları bu aşamada en iyi yardımcılarındır.",
+        "Hata ayıklama ve test yazma alışkanlığı erken kazanılmalıdır.",
+        "Gerçek hayattaki kullanım örneklerini incelemek konunun neden önemli olduğunu gösterir.",
+    ]
+    return "\n\n".join(" ".join(rng.sample(sentences, 3)) for _ in range(count))
+
+
+def _fake_roadmap(prompt: str, rng: random.Random) -> str:
+    match = re.search(r'for the topic: "(.+?)"', prompt)
+    field = match.group(1) if match else "Yazılım"
+    item_no = 0
+    stages = []
+    for stage_no in range(1, 5):
+        nodes = []
+        for node_no in range(1, 3):
+            sides = {}
+            for side in ("leftItems", "rightItems"):
+                sides[side] = []
+                for _ in range(rng.randint(2, 4)):
+                    item_no += 1
+                    sides[side].append({"id": f"uuid_{item_no}", "name": f"{field} Konsept {item_no}"})
+            nodes.append({"centralNodeTitle": f"{field} Alt Konu {stage_no}.{node_no}", **sides})
+        stages.append({"stageName": f"{field} Aşama {stage_no}", "subNodes": nodes})
+    return "```json\n" + json.dumps({"diagramTitle": field, "mainStages": stages}, ensure_ascii=False, indent=2) + "\n```"
+
+
+def _fake_quiz_level(level: int, rng: random.Random) -> dict:
+    questions = []
+    for question_no in range(1, 6):
+        options = [f"Seçenek {letter}" for letter in "ABCD"]
+        questions.append({
+            "question": f"{level}. Seviye, {question_no}. Soru metni",
+            "options": options,
+            "answer": rng.choice(options),
+        })
+    return {"level": level, "levelTitle": f"Seviye {level}", "questions": questions}
+
+
+def _fake_quiz(rng: random.Random) -> str:
+    levels = [_fake_quiz_level(level, rng) for level in range(1, 6)]
+    return json.dumps({"quizTitle": "Konu Değerlendirme Sınavı", "levels": levels}, ensure_ascii=False)
+
+
+def _fake_suggestions(rng: random.Random) -> str:
+    levels = []
+    for level in range(1, 6):
+        projects = [
+            {
+                "title": f"Proje {level}.{project_no}",
+                "description": f"Seviye {level} için örnek proje {rng.randint(100, 999)}. "
+                               "Bu proje temel becerileri sergiler ve portfolyoya değer katar.",
+            }
+            for project_no in range(1, 6)
+        ]
+        levels.append({"level_name": f"Seviye {level}", "projects": projects})
+    return "```json\n" + json.dumps({"project_levels": levels}, ensure_ascii=False) + "\n```"
+
+
+def _fake_evaluation(rng: random.Random) -> str:
+    return json.dumps({
+        "projeAmaci": "Proje, önerilen uygulamanın temel özelliklerini gerçekleştirmeyi amaçlıyor.",
+        "genelDegerlendirme": f"Kod genel olarak okunabilir ve öneriyle uyumlu (puan: {rng.randint(50, 95)}).",
+        "olumluYonler": ["Anlamlı isimlendirme kullanılmış.", "Dosya yapısı düzenli."],
+        "gelistirilebilecekYonler": ["Hata yönetimi eksik.", "Test bulunmuyor."],
+        "ogrenmeTavsiyesi": "Birim testleri ve hata yönetimi konularına odaklan.",
+    }, ensure_ascii=False)
+
+
+def _fake_evaluation_chunk(rng: random.Random) -> str:
+    return json.dumps({
+        "parcaOzeti": f"Bu parça uygulamanın {rng.choice(['veri', 'arayüz', 'servis'])} katmanını içeriyor.",
+        "oneriyeUygunluk": ["Önerideki temel işlevlerden biri gerçekleştirilmiş."],
+        "olumluYonler": ["Fonksiyonlar küçük ve tek işe odaklı."],
+        "gelistirilebilecekYonler": ["Girdi doğrulaması eksik."],
+    }, ensure_ascii=False)
+
+
+def _fake_summary_batch(prompt: str, rng: random.Random) -> str:
+    topics = re.findall(r"^- (\S+): (.+)$", prompt, re.MULTILINE)
+    summaries = {item_id: _paragraphs(rng, name, 2) for item_id, name in topics}
+    return "```json\n" + json.dumps(summaries, ensure_ascii=False, indent=2) + "\n```"
+
+
+def _fake_relevance(prompt: str) -> str:
+    topics_match = re.search(r"Yol haritası konuları: (\[.*?\])\n", prompt)
+    question_match = re.search(r"Kullanıcının sorusu: '(.*?)'\n", prompt)
+    if not topics_match:
+        return "İlgisiz"
+    topics = json.loads(topics_match.group(1))
+    question = question_match.group(1).lower() if question_match else ""
+    for topic in topics:
+        if topic.lower() in question:
+            return topic
+    return topics[0] if topics else "İlgisiz"
+
+
+def canned_response(prompt: str) -> str:
+    rng = _prompt_rng(prompt)
+    if '"mainStages"' in prompt:
+        return _fake_roadmap(prompt, rng)
+    if '"quizTitle"' in prompt:
+        return _fake_quiz(rng)
+    if '"levelTitle"' in prompt:
+        level = re.search(r'"level": (\d+)', prompt)
+        return json.dumps(_fake_quiz_level(int(level.group(1)) if level else 1, rng), ensure_ascii=False)
+    if '"project_levels"' in prompt:
+        return _fake_suggestions(rng)
+    if '"projeAmaci"' in prompt:
+        return _fake_evaluation(rng)
+    if '"parcaOzeti"' in prompt:
+        return _fake_evaluation_chunk(rng)
+    if "Yol haritası konuları:" in prompt:
+        return _fake_relevance(prompt)
+    if "Konular (id: konu):" in prompt:
+        return _fake_summary_batch(prompt, rng)
+    if "motivasyon mesajı" in prompt:
+        return f"Her satır kod, hedefine bir adım daha yaklaştırıyor! #{rng.randint(1, 1000)}"
+    return _paragraphs(rng, "Bu konu", rng.randint(2, 4))
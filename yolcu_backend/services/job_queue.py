@@ -0,0 +1,264 @@
+"""
+Uzun süren AI işleri için arka plan iş kuyruğu.
+
+İstek, işi jobs tablosuna "queued" olarak yazar ve hemen iş id'sini döndürür; sınırlı sayıda
+worker işleri önceliğe (küçük değer önce), sonra geliş sırasına göre çalıştırır ve sonucu
+tabloya yazar. İstemci durumu GET ile sorgular veya websocket'ten bildirim alır.
+
+İki kuyruk türü vardır:
+- memory: tek süreç için. İş id'leri bellekteki bir öncelik kuyruğunda bekler.
+- database: birden fazla süreç/sunucu aynı jobs tablosundan iş çeker. İş alma, "queued" durumundaki
+  satırı koşullu UPDATE ile "running" yapmaktır; PostgreSQL'de aday satır FOR UPDATE SKIP LOCKED ile
+  seçildiği için worker'lar birbirini beklemez.
+
+Her iki türde de iş satırı veritabanındadır; süreç kapanırsa yarıda kalan işler JOB_TIMEOUT_SECONDS
+sonunda tekrar kuyruğa alınır (en fazla max_attempts kez). Bu kontrol açılışta ve sonra
+recover_interval saniyede bir yapılır; böylece başka bir süreçte yarıda kalan işler de toplanır.
+
+submit senkron endpoint'lerden (thread havuzundan) çağrılabilir; kuyruğa bildirim event loop'a
+call_soon_threadsafe ile aktarılır.
+"""
+import asyncio
+import itertools
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from yolcu_backend.models import Job
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+FINISHED_STATUSES = (SUCCEEDED, FAILED)
+
+# handler(db, job) -> JSON'a çevrilebilir sonuç
+JobHandler = Callable[[Session, Job], Awaitable[Any]]
+
+
+class _MemorySource:
+    """Tek süreçte iş id'lerini öncelik sırasıyla tutar."""
+
+    def __init__(self):
+        self._queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._sequence = itertools.count()
+
+    def put(self, job_id: str, priority: int) -> None:
+        self._queue.put_nowait((priority, next(self._sequence), job_id))
+
+    async def next_job_id(self, db: Session) -> Optional[str]:
+        _, _, job_id = await self._queue.get()
+        return job_id
+
+
+class _DatabaseSource:
+    """Sıradaki işi jobs tablosundan seçer; boşsa yeni iş eklenene veya yoklama süresi dolana kadar bekler."""
+
+    def __init__(self, poll_interval: float):
+        self.poll_interval = poll_interval
+        self._wakeup = asyncio.Event()
+
+    def put(self, job_id: str, priority: int) -> None:
+        self._wakeup.set()
+
+    async def next_job_id(self, db: Session) -> Optional[str]:
+        row = (db.query(Job.id).filter(Job.status == QUEUED)
+               .order_by(Job.priority, Job.created_at)
+               .with_for_update(skip_locked=True)
+               .first())
+        if row is not None:
+            return row[0]
+        db.rollback()
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+        return None
+
+
+class JobQueue:
+    def __init__(self, session_factory: Callable[[], Session], backend: str = "memory", workers: int = 4,
+                 poll_interval: float = 1.0, job_timeout: float = 600, max_attempts: int = 2,
+                 priorities: Optional[Dict[str, int]] = None,
+                 on_finished: Optional[Callable[[Job], Awaitable[None]]] = None, recover_interval: float = 60):
+        if backend not in ("memory", "database"):
+            raise ValueError(f"Unknown job queue backend: {backend}")
+        self.session_factory = session_factory
+        self.backend = backend
+        self.workers = max(1, workers)
+        self.poll_interval = poll_interval
+        self.job_timeout = job_timeout
+        self.max_attempts = max_attempts
+        self.priorities = priorities or {}
+        self.on_finished = on_finished
+        self.recover_interval = recover_interval
+        self._handlers: Dict[str, JobHandler] = {}
+        self._source = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: List[asyncio.Task] = []
+        # Bu süreçte çalışmakta olan işler; süreleri dolmak üzere olsa da periyodik kurtarma bunlara dokunmaz
+        self._running: set = set()
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        self._handlers[kind] = handler
+
+    def submit(self, db: Session, user_id: int, kind: str, payload: Dict[str, Any],
+               priority: Optional[int] = None) -> Job:
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for job kind: {kind}")
+        job = Job(id=uuid.uuid4().hex, user_id=user_id, kind=kind, status=QUEUED, payload=payload,
+                  priority=self.priorities.get(kind, 0) if priority is None else priority)
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        self._enqueue([(job.id, job.priority)])
+        return job
+
+    def _enqueue(self, jobs: List[Tuple[str, int]]) -> None:
+        """İşleri kuyruğa bildirir; asyncio kuyrukları thread-safe olmadığı için event loop üzerinden."""
+        source, loop = self._source, self._loop
+        if source is None or loop is None or not jobs:
+            return
+        for job_id, priority in jobs:
+            loop.call_soon_threadsafe(source.put, job_id, priority)
+
+    # --- Worker'lar ---
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._source = _MemorySource() if self.backend == "memory" else _DatabaseSource(self.poll_interval)
+        self._enqueue(self._recover(load_queued=True))
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._recover_periodically()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        self._source = None
+        self._loop = None
+
+    def _recover(self, load_queued: bool = False) -> List[Tuple[str, int]]:
+        """
+        Süresi aşılmış "running" işleri (çalıştıran süreç kapanmış) tekrar kuyruğa alır veya başarısız sayar.
+        Kuyruğa bildirilmesi gereken (iş id, öncelik) çiftlerini döndürür: memory kuyruğunda tekrar
+        kuyruğa alınan işler, load_queued=True ise (açılışta) bekleyen tüm işler.
+        """
+        db = self.session_factory()
+        try:
+            stale_before = datetime.utcnow() - timedelta(seconds=self.job_timeout)
+            running_here = set(self._running)
+            stale = [job for job in db.query(Job).filter(Job.status == RUNNING, Job.started_at < stale_before).all()
+                     if job.id not in running_here]
+            requeued = []
+            for job in stale:
+                if job.attempts < self.max_attempts:
+                    job.status = QUEUED
+                    requeued.append((job.id, job.priority))
+                else:
+                    job.status, job.error, job.finished_at = FAILED, "Job was interrupted.", datetime.utcnow()
+            db.commit()
+            if stale:
+                logger.warning(f"Recovered {len(stale)} interrupted jobs")
+
+            if self.backend != "memory":
+                # database kuyruğu işleri tablodan çeker; bekleyen worker'ları uyandırmak yeterli
+                return requeued[:1]
+            if load_queued:
+                return db.query(Job.id, Job.priority).filter(Job.status == QUEUED).all()
+            return requeued
+        finally:
+            db.close()
+
+    async def _recover_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.recover_interval)
+            try:
+                self._enqueue(await asyncio.to_thread(self._recover))
+            except Exception:
+                logger.exception("Job recovery failed")
+
+    @staticmethod
+    def _claim(db: Session, job_id: str) -> bool:
+        """İşi "queued" durumundaysa "running" yapar; başka bir worker önce aldıysa False döner."""
+        claimed = db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == QUEUED)
+            .values(status=RUNNING, started_at=datetime.utcnow(), attempts=Job.attempts + 1)
+        ).rowcount
+        db.commit()
+        return claimed == 1
+
+    async def _worker(self) -> None:
+        while True:
+            db = self.session_factory()
+            try:
+                job_id = await self._source.next_job_id(db)
+                if job_id is not None and self._claim(db, job_id):
+                    self._running.add(job_id)
+                    try:
+                        await self._run(db, job_id)
+                    finally:
+                        self._running.discard(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Job worker error")
+                await asyncio.sleep(self.poll_interval)
+            finally:
+                db.close()
+
+    async def _run(self, db: Session, job_id: str) -> None:
+        job = db.get(Job, job_id)
+        handler = self._handlers.get(job.kind)
+        try:
+            if handler is None:
+                raise ValueError(f"No handler registered for job kind: {job.kind}")
+            result = await asyncio.wait_for(handler(db, job), timeout=self.job_timeout)
+            job = db.get(Job, job_id)
+            job.status, job.result = SUCCEEDED, result
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Job {job_id} ({job.kind}) failed: {e!r}")
+            job = db.get(Job, job_id)
+            job.status = FAILED
+            if isinstance(e, HTTPException):
+                job.error = str(e.detail)
+            elif isinstance(e, asyncio.TimeoutError):
+                job.error = "Job timed out."
+            else:
+                job.error = str(e) or type(e).__name__
+        job.finished_at = datetime.utcnow()
+        db.commit()
+        db.refresh(job)
+
+        if self.on_finished is not None:
+            try:
+                await self.on_finished(job)
+            except Exception:
+                logger.exception(f"Job finished callback failed for {job_id}")
+
+
+def get_user_job(db: Session, user_id: int, job_id: str) -> Optional[Job]:
+    return db.query(Job).filter(Job.id == job_id, Job.user_id == user_id).first()
+
+
+def get_finished_jobs(db: Session, user_id: int, since: datetime) -> List[Job]:
+    """Kullanıcının since'ten sonra biten işleri (database kuyruğunda başka süreçlerin bitirdikleri dahil)."""
+    return (db.query(Job)
+            .filter(Job.user_id == user_id, Job.status.in_(FINISHED_STATUSES), Job.finished_at > since)
+            .order_by(Job.finished_at)
+            .all())
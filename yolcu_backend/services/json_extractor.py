@@ -0,0 +1,248 @@
+"""
+LLM cevaplarından JSON çıkaran ortak yardımcılar.
+
+Gemini cevapları çoğu zaman ```json blokları, baştaki/sondaki açıklamalar, sondaki fazladan
+virgüller veya yarıda kesilmiş bir çıktı içerir. Buradaki ayrıştırıcı metni tek geçişte tarar:
+ilk '{' veya '[' karakterinden itibaren parantez dengesini (string'leri hesaba katarak) takip eder,
+belge kapanınca durur ve gerekirse küçük onarımlar yapar. Metin parça parça beslenebildiği için
+akış sırasında bir dizinin (ör. "mainStages") elemanları kapandıkça teker teker döndürülebilir.
+"""
+import json
+import re
+from typing import Any, List, Optional
+
+
+class JSONExtractionError(ValueError):
+    pass
+
+
+def _repair(fragment: str) -> str:
+    """
+    Dize dışındaki sondaki virgülleri siler; yarıda kalmış string ve parantezleri kapatır.
+    """
+    out = []
+    stack = []
+    in_string = False
+    escape = False
+    for char in fragment:
+        if in_string:
+            out.append(char)
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+            continue
+
+        if char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]":
+            # "a": 1, } -> "a": 1 }
+            _drop_trailing_comma(out)
+            if stack:
+                stack.pop()
+        out.append(char)
+
+    if in_string:
+        if escape:
+            out.pop()
+        out.append('"')
+    while stack:
+        _drop_trailing_comma(out)
+        if _last_significant(out) == ":":
+            out.append("null")
+        out.append(stack.pop())
+    return "".join(out)
+
+
+def _last_significant_index(out: List[str]) -> int:
+    index = len(out) - 1
+    while index >= 0 and out[index].isspace():
+        index -= 1
+    return index
+
+
+def _last_significant(out: List[str]) -> Optional[str]:
+    index = _last_significant_index(out)
+    return out[index] if index >= 0 else None
+
+
+def _drop_trailing_comma(out: List[str]) -> None:
+    index = _last_significant_index(out)
+    if index >= 0 and out[index] == ",":
+        del out[index]
+
+
+def _loads(fragment: str) -> Any:
+    try:
+        return json.loads(fragment, strict=False)
+    except json.JSONDecodeError:
+        pass
+    try:
+        return json.loads(_repair(fragment), strict=False)
+    except json.JSONDecodeError as e:
+        raise JSONExtractionError(f"Could not parse JSON from AI response: {e}") from e
+
+
+_STRUCTURAL = re.compile(r'["{}\[\]]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+
+
+class StreamingJSONExtractor:
+    """
+    Parça parça gelen LLM çıktısından JSON belgesini çıkarır.
+
+    array_key verilirse (ör. "mainStages" veya "levels"), kök nesnedeki bu dizinin her elemanı
+    kapandığı anda parse edilir ve feed() tarafından döndürülür.
+    """
+
+    def __init__(self, array_key: Optional[str] = None):
+        self.array_key = array_key
+        # Gelen parçaların tamamı result() için saklanır; tarama ise sadece henüz işlenmemiş
+        # kısmı tutan _buffer üzerinde yapılır (her feed'de tüm metni yeniden kopyalamamak için)
+        self._chunks: List[str] = []
+        self._buffer = ""
+        self._offset = 0  # _buffer[0]'ın tüm metindeki konumu
+        self._scan_pos = 0
+
+        # _start ve _end tüm metne göre; diğer konumlar _buffer'a göredir
+        self._start: Optional[int] = None
+        self._end: Optional[int] = None
+        self._depth = 0
+        self._in_string = False
+        self._string_start = 0
+        self._last_root_string: Optional[str] = None
+
+        self._array_depth: Optional[int] = None
+        self._element_start: Optional[int] = None
+
+    @property
+    def done(self) -> bool:
+        return self._end is not None
+
+    def feed(self, chunk: str) -> List[Any]:
+        """Yeni parçayı işler ve bu parçayla tamamlanan dizi elemanlarını döndürür."""
+        if self.done or not chunk:
+            return []
+        self._chunks.append(chunk)
+        self._buffer += chunk
+        text = self._buffer
+        completed = []
+        pos = self._scan_pos
+
+        if self._start is None:
+            brace, bracket = text.find("{", pos), text.find("[", pos)
+            candidates = [index for index in (brace, bracket) if index != -1]
+            if not candidates:
+                self._scan_pos = len(text)
+                self._discard_scanned()
+                return completed
+            pos = min(candidates)
+            self._start = self._offset + pos
+            self._depth = 1
+            pos += 1
+
+        # Karakter karakter yürümek yerine sadece yapısal karakterlere atlanır
+        while True:
+            if self._in_string:
+                match = _STRING_SPECIAL.search(text, pos)
+                if match is None:
+                    pos = len(text)
+                    break
+                pos = match.start()
+                if text[pos] == "\\":
+                    if pos + 1 >= len(text):
+                        # Kaçış karakteri parçanın sonunda; devamı gelince tekrar bakılır
+                        break
+                    pos += 2
+                    continue
+                self._in_string = False
+                if self._depth == 1:
+                    self._last_root_string = text[self._string_start + 1:pos]
+                pos += 1
+                continue
+
+            match = _STRUCTURAL.search(text, pos)
+            if match is None:
+                pos = len(text)
+                break
+            pos = match.start()
+            char = text[pos]
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = pos
+            elif char in "{[":
+                if self._array_depth is not None and self._depth == self._array_depth:
+                    self._element_start = pos
+                self._depth += 1
+                if (char == "[" and self._depth == 2 and self.array_key is not None
+                        and self._array_depth is None and self._last_root_string == self.array_key):
+                    self._array_depth = 2
+            else:
+                self._depth -= 1
+                if self._array_depth is not None:
+                    if self._depth == self._array_depth and self._element_start is not None:
+                        completed.append(_loads(text[self._element_start:pos + 1]))
+                        self._element_start = None
+                    elif self._depth < self._array_depth:
+                        # Hedef dizi kapandı
+                        self._array_depth = None
+                        self.array_key = None
+                if self._depth == 0:
+                    self._end = self._offset + pos + 1
+                    pos += 1
+                    break
+            pos += 1
+
+        self._scan_pos = pos
+        self._discard_scanned()
+        return completed
+
+    def _discard_scanned(self) -> None:
+        """Taranmış ve artık gerekmeyen baştaki kısmı _buffer'dan atar."""
+        keep = self._scan_pos
+        if self._element_start is not None:
+            keep = min(keep, self._element_start)
+        if self._in_string:
+            keep = min(keep, self._string_start)
+        if keep <= 0:
+            return
+        self._buffer = self._buffer[keep:]
+        self._offset += keep
+        self._scan_pos -= keep
+        if self._in_string:
+            self._string_start -= keep
+        if self._element_start is not None:
+            self._element_start -= keep
+
+    def result(self) -> Any:
+        """Şimdiye kadar beslenen metinden belgenin tamamını döndürür (gerekirse onararak)."""
+        if self._start is None:
+            raise JSONExtractionError("Could not find a JSON object in the AI response.")
+        text = "".join(self._chunks)
+        self._chunks = [text]
+        end = self._end if self._end is not None else len(text)
+        return _loads(text[self._start:end])
+
+
+def extract_json(raw_text: str) -> Any:
+    """LLM cevabındaki ilk JSON belgesini tek geçişte bulur ve parse eder."""
+    extractor = StreamingJSONExtractor()
+    extractor.feed(raw_text)
+    return extractor.result()
+
+
+def extract_complete_json(raw_text: str) -> Any:
+    """
+    extract_json gibidir ama yarıda kesilmiş belgeyi onarmaz, hata verir.
+    Önbelleğe yazılacak cevapların tam olduğunu doğrulamak için kullanılır.
+    """
+    extractor = StreamingJSONExtractor()
+    extractor.feed(raw_text)
+    if not extractor.done:
+        raise JSONExtractionError("The JSON document in the AI response is incomplete.")
+    return extractor.result()
@@ -0,0 +1,201 @@
+"""
+CV anahtar kelime ve ATS skorlaması için tek geçişli eşleştirme motoru.
+
+CV metni bir kez kelimelere ayrılır (TokenizedText); kelime sayımı ve beceri eşleştirmesi aynı
+kelime listesini kullanır. Beceri sözlüğündeki tüm ifadeler (çok kelimeliler dahil) kelime düzeyinde
+bir Aho-Corasick otomatına konur; metin, sözlük büyüklüğünden bağımsız olarak tek geçişte taranır.
+Otomat süreç başına bir kez kurulur (get_keyword_engine).
+
+Kelimeler küçük harfe çevrilir ve "ı" "i"ye katlanır (Türkçe ve İngilizce karışık CV'lerde "API",
+"apı" ve "api" aynı kelime olur). "c++", "c#", ".net", "node.js" gibi teknoloji adları tek kelime
+olarak kalır; "/" ve "-" ayırıcı sayılır (sözlükteki ifadeler de aynı şekilde ayrıldığı için
+"CI/CD" metindeki "ci/cd" ile eşleşir).
+"""
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from yolcu_backend.services.skill_dictionary import DEFAULT_PROFILE, SKILLS, TARGET_PROFILES, TargetProfile
+
+# Kelime karakterleri; içte "." (node.js), başta "." (.net), sonda "+"/"#" (c++, c#) kelimeye dahildir
+_TOKEN = re.compile(r"\.?\w+(?:\.\w+)*[+#]*")
+
+STOPWORDS = frozenset({
+    "ve", "ile", "bir", "için", "olarak", "gibi", "daha", "çok", "olan", "bu", "da", "de",
+    "the", "to", "of", "in", "a", "an", "on", "at", "and", "for", "with", "as", "by", "from", "or",
+})
+
+# Ağırlıklı skorda bir anahtar kelimenin en fazla kaç tekrarı sayılır
+MAX_KEYWORD_REPEATS = 10
+TOP_KEYWORDS = 15
+
+
+def tokenize(text: str) -> List[str]:
+    # "İ".lower() "i" + birleşen nokta (U+0307) verir; nokta atılır
+    return _TOKEN.findall(text.lower().replace("ı", "i").replace("\u0307", ""))
+
+
+@dataclass
+class TokenizedText:
+    """Bir kez kelimelere ayrılmış metin; sayım ve eşleştirme adımları bunu paylaşır."""
+    tokens: List[str]
+    counts: Counter = field(default_factory=Counter)
+
+    @classmethod
+    def from_text(cls, text: str) -> "TokenizedText":
+        tokens = tokenize(text)
+        return cls(tokens, Counter(tokens))
+
+
+class AhoCorasick:
+    """
+    Kelime dizileri üzerinde çok desenli eşleştirici. Desenler (kelime dizisi, değer) çiftleridir;
+    aynı değere birden çok desen (eş anlamlılar) bağlanabilir.
+    """
+
+    def __init__(self, patterns: Iterable[Tuple[Sequence[str], str]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[str, int]]] = [[]]  # (değer, desen uzunluğu)
+        for tokens, value in patterns:
+            if tokens:
+                self._add(tokens, value)
+        self._build_links()
+
+    def _add(self, tokens: Sequence[str], value: str) -> None:
+        state = 0
+        for token in tokens:
+            next_state = self._goto[state].get(token)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][token] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = next_state
+        if (value, len(tokens)) not in self._out[state]:
+            self._out[state].append((value, len(tokens)))
+
+    def _build_links(self) -> None:
+        queue = list(self._goto[0].values())
+        for state in queue:  # BFS; kuyruk dolaşılırken büyür
+            for token, child in self._goto[state].items():
+                queue.append(child)
+                fail = self._fail[state]
+                while fail and token not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(token, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def count(self, tokens: Sequence[str]) -> Counter:
+        """
+        Her değerin metinde kaç kez geçtiğini sayar. Aynı yerden başlayan eş anlamlılar
+        ("restful" ve "restful api") tek geçiş sayılır.
+        """
+        counts: Counter = Counter()
+        seen = set()
+        goto, fail, out = self._goto, self._fail, self._out
+        root = goto[0]
+        state = 0
+        for position, token in enumerate(tokens):
+            if not state and token not in root:  # kelimelerin çoğu hiçbir desenle başlamaz
+                continue
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            for value, length in out[state]:
+                start = position - length + 1
+                if (value, start) not in seen:
+                    seen.add((value, start))
+                    counts[value] += 1
+        return counts
+
+
+def keyword_score(counts: Counter, keywords: Sequence[str]) -> Dict:
+    """
+    Bulunan/eksik anahtar kelimeler ve skorlar. basic_score bulunan oranı, advanced_score tekrar
+    sayısına göre ağırlıklı oran (kelime başına en fazla MAX_KEYWORD_REPEATS), final ikisinin ortalaması.
+    """
+    found = [kw for kw in keywords if counts.get(kw)]
+    missing = [kw for kw in keywords if not counts.get(kw)]
+    basic_score = round(len(found) / len(keywords) * 100, 2) if keywords else 0
+    max_weighted = len(keywords) * MAX_KEYWORD_REPEATS
+    weighted = sum(min(MAX_KEYWORD_REPEATS, counts.get(kw, 0)) for kw in keywords)
+    weighted_pct = weighted / max_weighted * 100 if max_weighted else 0
+    return {
+        "basic_score": basic_score,
+        "found_keywords": found,
+        "missing_keywords": missing,
+        "total_keywords": len(keywords),
+        "found_count": len(found),
+        "advanced_score": round(weighted_pct, 2),
+        "final_score": round((basic_score + weighted_pct) / 2, 2),
+    }
+
+
+class KeywordEngine:
+    def __init__(self, skills: Dict[str, Sequence[str]] = SKILLS,
+                 profiles: Dict[str, TargetProfile] = TARGET_PROFILES, default_profile: str = DEFAULT_PROFILE):
+        for profile in profiles.values():
+            unknown = [skill for skill in profile.skills if skill not in skills]
+            if unknown:
+                raise ValueError(f"Profile '{profile.key}' references unknown skills: {unknown}")
+        if default_profile not in profiles:
+            raise ValueError(f"Unknown default profile: {default_profile}")
+
+        self.profiles = profiles
+        self.default_profile = default_profile
+        self._skill_order = {skill: index for index, skill in enumerate(skills)}
+        self._matcher = AhoCorasick(
+            (tokenize(term), skill) for skill, aliases in skills.items() for term in (skill, *aliases)
+        )
+
+    @staticmethod
+    def top_keywords(tokenized: TokenizedText, top_n: int = TOP_KEYWORDS) -> List[str]:
+        """En sık geçen kelimeler (bağlaçlar, kısa kelimeler ve sayılar hariç)."""
+        counts = ((word, count) for word, count in tokenized.counts.items()
+                  if len(word) > 2 and word.isalpha() and word not in STOPWORDS)
+        return [word for word, _ in sorted(counts, key=lambda item: -item[1])[:top_n]]
+
+    @staticmethod
+    def match(tokenized: TokenizedText, keywords: Sequence[str]) -> Counter:
+        """Sözlük dışı, çağıranın verdiği anahtar kelimeleri tek geçişte sayar."""
+        return AhoCorasick((tokenize(keyword), keyword) for keyword in keywords).count(tokenized.tokens)
+
+    def skill_counts(self, tokenized: TokenizedText) -> Counter:
+        return self._matcher.count(tokenized.tokens)
+
+    def choose_profile(self, skill_counts: Counter) -> TargetProfile:
+        """Becerilerinin en büyük oranı CV'de geçen profil; hiçbiri geçmiyorsa varsayılan profil."""
+        best, best_ratio = self.profiles[self.default_profile], 0.0
+        for profile in self.profiles.values():
+            ratio = sum(1 for skill in profile.skills if skill_counts.get(skill)) / len(profile.skills)
+            if ratio > best_ratio:
+                best, best_ratio = profile, ratio
+        return best
+
+    def analyze(self, text: str, target_profile: Optional[str] = None) -> Dict:
+        """
+        CV metnini bir kez kelimelere ayırıp hedef profile göre skorlar. target_profile verilmezse
+        CV'ye en uygun profil seçilir. Bilinmeyen profil için ValueError.
+        """
+        if target_profile is not None and target_profile not in self.profiles:
+            raise ValueError(f"Unknown target profile: {target_profile}")
+
+        tokenized = TokenizedText.from_text(text)
+        skill_counts = self.skill_counts(tokenized)
+        profile = self.profiles[target_profile] if target_profile else self.choose_profile(skill_counts)
+
+        result = keyword_score(skill_counts, profile.skills)
+        result["target_profile"] = profile.key
+        result["skills"] = sorted(skill_counts, key=lambda skill: (-skill_counts[skill], self._skill_order[skill]))
+        result["top_keywords"] = self.top_keywords(tokenized)
+        return result
+
+
+@lru_cache(maxsize=1)
+def get_keyword_engine() -> KeywordEngine:
+    """Sözlükten kurulan paylaşılan motor (süreç başına bir kez)."""
+    return KeywordEngine()
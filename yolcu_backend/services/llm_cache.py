@@ -0,0 +1,114 @@
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+
+class SQLiteCacheStore:
+    """
+    LLM cevapları için kalıcı (disk) katman. Sunucu yeniden başlasa da cevaplar korunur.
+    get/set/delete metotlarını sağlayan herhangi bir nesne bunun yerine kullanılabilir.
+    Metotlar senkron ve bloklayıcıdır; LLMCache bunları asyncio.to_thread ile çağırır.
+    Süresi dolmuş satırlar set sırasında en fazla purge_interval saniyede bir topluca silinir.
+    """
+
+    def __init__(self, path: str, purge_interval: float = 10 * 60):
+        self._lock = threading.Lock()
+        self.purge_interval = purge_interval
+        self._last_purge = time.time()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def set(self, key: str, value: str, expires_at: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at),
+            )
+            now = time.time()
+            if now - self._last_purge >= self.purge_interval:
+                self._conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+                self._last_purge = now
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+
+class LLMCache:
+    """
+    (model, normalize edilmiş prompt) anahtarlı LLM cevap önbelleği.
+    Bellekte LRU + TTL, isteğe bağlı olarak arkasında kalıcı bir disk katmanı.
+    Bellek katmanı event loop'ta, disk katmanı thread havuzunda çalışır.
+    """
+
+    def __init__(self, max_entries: int = 1024, disk_store=None):
+        self.max_entries = max_entries
+        self.disk_store = disk_store
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model_name: str, prompt: str) -> str:
+        normalized_prompt = " ".join(prompt.split())
+        return hashlib.sha256(f"{model_name}\n{normalized_prompt}".encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, expires_at = entry
+            if expires_at > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+
+        if self.disk_store is not None:
+            disk_entry = await asyncio.to_thread(self.disk_store.get, key)
+            if disk_entry is not None:
+                value, expires_at = disk_entry
+                if expires_at > now:
+                    self._remember(key, value, expires_at)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return value
+                await asyncio.to_thread(self.disk_store.delete, key)
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: str, ttl: float) -> None:
+        expires_at = time.time() + ttl
+        self._remember(key, value, expires_at)
+        if self.disk_store is not None:
+            await asyncio.to_thread(self.disk_store.set, key, value, expires_at)
+
+    def _remember(self, key: str, value: str, expires_at: float) -> None:
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+        }
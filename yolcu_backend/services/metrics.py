@@ -0,0 +1,217 @@
+"""
+Prometheus metin formatında metrik üreten küçük, bağımlılıksız bir kayıt defteri.
+
+Sadece uygulamanın ihtiyaç duyduğu kadarını içerir: etiketli Counter, Gauge ve Histogram.
+/metrics uç noktası MetricsRegistry.render() çıktısını döndürür.
+"""
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Saniye cinsinden LLM gecikmeleri için (ilk token ~0.3 sn, uzun roadmap cevapları ~60 sn)
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 40.0, 60.0, 120.0)
+# Prompt/cevap büyüklükleri için (karakter veya token)
+SIZE_BUCKETS = (100, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000, 250000)
+
+
+def estimate_tokens(text: str) -> int:
+    """Backend token sayısı döndürmediğinde kullanılan kaba tahmin (~4 karakter = 1 token)."""
+    return (len(text) + 3) // 4
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric(ABC):
+    """Metrik türlerinin ortak tabanı; alt sınıflar örnek satırlarını _samples ile üretir."""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    @abstractmethod
+    def _samples(self) -> Iterable[str]:
+        """Metriğin Prometheus örnek satırları (HELP/TYPE satırları hariç)."""
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return lines
+
+
+class _SimpleMetric(_Metric):
+    """
+    Tek değerli metrikler için ortak kod. collect verilirse değerler okunduğu anda o
+    fonksiyondan ({etiket değerleri: değer}) alınır (ör. önbellek istatistikleri).
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 collect: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None):
+        super().__init__(name, documentation, labelnames)
+        self._collect = collect
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> Iterable[str]:
+        with self._lock:
+            values = dict(self._values)
+        if self._collect is not None:
+            values.update(self._collect())
+        for key, value in sorted(values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Counter(_SimpleMetric):
+    type_name = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_SimpleMetric):
+    type_name = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # anahtar -> (bucket sayaçları, toplam, adet)
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], float, int]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total, count = self._values.get(key) or ([0] * len(self.buckets), 0.0, 0)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            self._values[key] = (counts, total + value, count + 1)
+
+    def _samples(self) -> Iterable[str]:
+        with self._lock:
+            items = sorted((key, (list(counts), total, count)) for key, (counts, total, count) in self._values.items())
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {count}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                collect: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None) -> Counter:
+        return self.register(Counter(name, documentation, labelnames, collect))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+              collect: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, collect))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class LLMMetrics:
+    """GeminiService çağrıları için generator ve prompt şablonu bazında metrikler."""
+
+    LABELS = ("generator", "template")
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        self.registry = registry or MetricsRegistry()
+        registry = self.registry
+        self.requests = registry.counter(
+            "llm_requests_total", "LLM requests by generator, template and how they were served "
+                                  "(upstream, cache or shared in-flight call).", self.LABELS + ("source",))
+        self.errors = registry.counter(
+            "llm_errors_total", "Upstream LLM calls that raised, by exception type.", self.LABELS + ("error",))
+        self.json_parse_failures = registry.counter(
+            "llm_json_parse_failures_total", "LLM responses whose JSON could not be parsed.", self.LABELS)
+        self.duration = registry.histogram(
+            "llm_request_duration_seconds", "Wall time of upstream LLM calls, excluding queue wait.", self.LABELS)
+        self.queue_wait = registry.histogram(
+            "llm_queue_wait_seconds", "Time spent waiting for a concurrency slot before calling the LLM.",
+            self.LABELS)
+        self.time_to_first_chunk = registry.histogram(
+            "llm_time_to_first_chunk_seconds", "Time until the first streamed chunk arrived.", self.LABELS)
+        self.prompt_chars = registry.histogram(
+            "llm_prompt_chars", "Prompt size in characters.", self.LABELS, buckets=SIZE_BUCKETS)
+        self.prompt_tokens = registry.counter(
+            "llm_prompt_tokens_total", "Prompt tokens sent (estimated when the backend does not report them).",
+            self.LABELS)
+        self.response_tokens = registry.counter(
+            "llm_response_tokens_total", "Response tokens received (estimated when the backend does not report "
+                                         "them).", self.LABELS)
+        self.response_token_sizes = registry.histogram(
+            "llm_response_tokens", "Response size in tokens per call.", self.LABELS, buckets=SIZE_BUCKETS)
+
+    def observe_call(self, generator: str, template: str, prompt: str, text: str, duration: float,
+                     prompt_tokens: Optional[int] = None, response_tokens: Optional[int] = None) -> None:
+        labels = {"generator": generator, "template": template}
+        prompt_tokens = prompt_tokens if prompt_tokens is not None else estimate_tokens(prompt)
+        response_tokens = response_tokens if response_tokens is not None else estimate_tokens(text)
+        self.duration.observe(duration, **labels)
+        self.prompt_chars.observe(len(prompt), **labels)
+        self.prompt_tokens.inc(prompt_tokens, **labels)
+        self.response_tokens.inc(response_tokens, **labels)
+        self.response_token_sizes.observe(response_tokens, **labels)
+
+    def observe_error(self, generator: str, template: str, error: BaseException) -> None:
+        self.errors.inc(generator=generator, template=template, error=type(error).__name__)
+
+    def observe_source(self, generator: str, template: str, source: str) -> None:
+        self.requests.inc(generator=generator, template=template, source=source)
@@ -0,0 +1,91 @@
+import asyncio
+import logging
+import random
+from collections import deque
+from typing import Optional
+
+from yolcu_backend.prompts.motivational_prompt import MOTIVATIONAL_PROMPT
+
+logger = logging.getLogger(__name__)
+
+
+class MotivationalMessagePool:
+    """
+    Önceden üretilmiş motivasyon mesajlarını bellekte tutar.
+    Arka plandaki görev havuzu belirli aralıklarla tazeler; Gemini'ye ulaşılamazsa
+    eldeki (eski) mesajlar sunulmaya devam eder.
+
+    İlk doldurma açılışta hemen yapılmaz: her worker 0..startup_jitter saniye arasında rastgele bekler
+    (aynı anda açılan worker'lar Gemini'ye birlikte yüklenmesin diye), havuzdan mesaj istenirse beklemeden başlar.
+    Başarısız çağrılarda tur bırakılmaz; retry_delay'den başlayıp katlanan bir beklemeyle devam edilir.
+    """
+
+    def __init__(self, ai_service, size: int = 20, refresh_interval: float = 300, refresh_batch: int = 3,
+                 startup_jitter: float = 30, retry_delay: float = 2):
+        self.ai_service = ai_service
+        self.size = size
+        self.refresh_interval = refresh_interval
+        self.refresh_batch = refresh_batch
+        self.startup_jitter = startup_jitter
+        self.retry_delay = retry_delay
+        self._messages: deque[str] = deque(maxlen=size)
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    @staticmethod
+    def format_message(raw_response: str) -> str:
+        return " ".join(raw_response.replace("**", " ").replace("*", "").split())
+
+    def get_message(self) -> Optional[str]:
+        if not self._messages:
+            # Havuz henüz dolmadıysa bekleyen ilk doldurma hemen başlasın
+            if self._wakeup is not None:
+                self._wakeup.set()
+            return None
+        return random.choice(self._messages)
+
+    async def generate_message(self) -> str:
+        """Gemini'den yeni bir mesaj üretir ve havuza ekler."""
+        raw_response = await self.ai_service.generate_content_async(MOTIVATIONAL_PROMPT, generator="motivational")
+        message = self.format_message(raw_response)
+        if message:
+            self._messages.append(message)
+        return message
+
+    async def refill(self) -> None:
+        # Havuz boşsa tamamen doldurulur, doluysa en eski birkaç mesaj yenileriyle değiştirilir
+        missing = self.size - len(self._messages)
+        count = missing if missing > 0 else self.refresh_batch
+        delay = self.retry_delay
+        for attempt in range(count):
+            try:
+                await self.generate_message()
+                delay = self.retry_delay
+            except Exception as e:
+                logger.warning(f"Motivational pool refresh failed, serving {len(self._messages)} stale messages: {e}")
+                if attempt + 1 < count:
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, self.refresh_interval)
+
+    async def _run(self) -> None:
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=random.uniform(0, self.startup_jitter))
+        except asyncio.TimeoutError:
+            pass
+        while True:
+            await self.refill()
+            await asyncio.sleep(self.refresh_interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
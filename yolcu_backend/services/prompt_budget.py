@@ -0,0 +1,252 @@
+"""
+Prompt'lara giren büyük içerikleri (ZIP'teki proje kodu, CV metni) token bütçesine sığdırır.
+
+İçerik körlemesine belli bir karakterde kesilmez; sırasıyla dosya ("--- Dosya: x ---"),
+bölüm (başlık / üst seviye def-class), paragraf ve satır sınırlarından bölünür. Sığan parçalar
+olduğu gibi alınır, sığmayan ilk parça bir alt seviyede bölünerek kısmen alınır, kalanlar atılır.
+Nelerin atıldığı (en üst seviyedeki parça adıyla) BudgetedText.dropped içinde raporlanır.
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Tuple
+
+from yolcu_backend.services.metrics import estimate_tokens
+
+FILE_HEADER = re.compile(r"^--- Dosya: (.+?) ---$", re.MULTILINE)
+SECTION_HEADER = re.compile(
+    r"^(?:#{1,6} |(?:async )?def |class |[A-ZÇĞİÖŞÜ][A-ZÇĞİÖŞÜ0-9 &/]{2,40}:?$|[^\n]{1,40}:$)",
+    re.MULTILINE,
+)
+PARAGRAPH_BREAK = re.compile(r"\n[ \t]*\n")
+
+UNITS = ("file", "section", "paragraph", "line")
+
+# Sığmayan bir parçayı bölmeye değmeyecek kadar az yer kaldıysa parça tümüyle atılır
+MIN_PARTIAL_TOKENS = 50
+# İçerik kısaltıldığında modele eklenen not için ilk denemede ayrılan pay; not daha uzun çıkarsa
+# ölçülen taşma kadar daha fazla yer ayrılıp içerik yeniden sığdırılır
+OMISSION_NOTE_TOKENS = 120
+OMISSION_NOTE_MAX_NAMES = 15
+
+
+@dataclass
+class DroppedPart:
+    unit: str
+    name: str
+    tokens: int
+    partial: bool = False
+
+    def to_dict(self) -> Dict:
+        data = {"unit": self.unit, "name": self.name, "tokens": self.tokens}
+        if self.partial:
+            data["partial"] = True
+        return data
+
+
+@dataclass
+class BudgetedText:
+    text: str
+    tokens: int
+    budget: int
+    dropped: List[DroppedPart] = field(default_factory=list)
+
+    @property
+    def truncated(self) -> bool:
+        return bool(self.dropped)
+
+    def report(self) -> Dict:
+        return {
+            "budget_tokens": self.budget,
+            "kept_tokens": self.tokens,
+            "dropped_tokens": sum(part.tokens for part in self.dropped),
+            "dropped": [part.to_dict() for part in self.dropped],
+        }
+
+
+def _split_at(text: str, starts: List[int]) -> List[str]:
+    bounds = sorted({0, *starts, len(text)})
+    return [text[start:end] for start, end in zip(bounds, bounds[1:]) if start < end]
+
+
+def _split(text: str, unit: str) -> List[str]:
+    """Metni, birleştirildiğinde yine aynı metni verecek parçalara böler."""
+    if unit == "file":
+        return _split_at(text, [match.start() for match in FILE_HEADER.finditer(text)])
+    if unit == "section":
+        return _split_at(text, [match.start() for match in SECTION_HEADER.finditer(text)])
+    if unit == "paragraph":
+        return _split_at(text, [match.end() for match in PARAGRAPH_BREAK.finditer(text)])
+    return text.splitlines(keepends=True)
+
+
+def _piece_name(piece: str, unit: str) -> str:
+    if unit == "file":
+        match = FILE_HEADER.match(piece)
+        if match:
+            return match.group(1)
+    first_line = next((line.strip() for line in piece.splitlines() if line.strip()), "")
+    return first_line[:60]
+
+
+class PromptBudget:
+    """
+    Bir prompt şablonunu, içine konacak büyük içeriği token bütçesine sığdırarak doldurur.
+
+    max_tokens tüm prompt için geçerlidir; şablonun sabit kısmı ve diğer alanlar önce düşülür,
+    kalan bütçe içerik alanına ayrılır.
+    """
+
+    def __init__(self, template: str, max_tokens: int, count_tokens: Callable[[str], int] = estimate_tokens):
+        self.template = template
+        self.max_tokens = max_tokens
+        self.count_tokens = count_tokens
+
+    def build(self, content_field: str, content: str, **fields: str) -> Tuple[str, BudgetedText]:
+        overhead = self.count_tokens(self.template.format(**fields, **{content_field: ""}))
+        fitted = self.fit(content, max(0, self.max_tokens - overhead))
+        return self.template.format(**fields, **{content_field: fitted.text}), fitted
+
+    def fit(self, content: str, budget: int) -> BudgetedText:
+        tokens = self.count_tokens(content)
+        if tokens <= budget:
+            return BudgetedText(text=content, tokens=tokens, budget=budget)
+
+        # Notun uzunluğu atılan parçalara bağlı olduğu için not eklendikten sonra ölçülür;
+        # bütçe aşılıyorsa içerik, taşma kadar daha küçük bir bütçeyle yeniden sığdırılır
+        reserve = min(OMISSION_NOTE_TOKENS, budget)
+        while True:
+            kept, dropped = self._fit_unit(content, 0, budget - reserve)
+            text = kept.rstrip() + self._omission_note(dropped)
+            tokens = self.count_tokens(text)
+            if tokens <= budget or reserve >= budget:
+                break
+            reserve = min(budget, reserve + tokens - budget)
+
+        if tokens > budget:
+            # Bütçe notun kendisine bile yetmiyor
+            text, _ = self._hard_cut(text, budget)
+            tokens = self.count_tokens(text)
+        return BudgetedText(text=text, tokens=tokens, budget=budget, dropped=dropped)
+
+    def chunk(self, content: str, budget: int) -> List[str]:
+        """
+        İçeriği sırası korunarak, her biri budget'a sığan ardışık parçalara böler. Parçalar mümkün
+        olduğunca dosya sınırlarından, sığmayan dosyalar bölüm/paragraf/satır sınırlarından bölünür.
+        """
+        budget = max(1, budget)
+        # Alt seviyede bölünen parçaların artıkları komşularıyla birleştirilir
+        merged: List[str] = []
+        merged_tokens = 0
+        for piece in self._chunk_unit(content, 0, budget):
+            piece_tokens = self.count_tokens(piece)
+            if merged and merged_tokens + piece_tokens <= budget:
+                merged[-1] += piece
+                merged_tokens += piece_tokens
+            else:
+                merged.append(piece)
+                merged_tokens = piece_tokens
+        return merged
+
+    def _chunk_unit(self, text: str, level: int, budget: int) -> List[str]:
+        if self.count_tokens(text) <= budget:
+            return [text]
+        if level >= len(UNITS):
+            chunks = []
+            while text:
+                head, _ = self._hard_cut(text, budget)
+                head = head or text[:1]
+                chunks.append(head)
+                text = text[len(head):]
+            return chunks
+
+        pieces = _split(text, UNITS[level])
+        if len(pieces) <= 1:
+            return self._chunk_unit(text, level + 1, budget)
+
+        chunks: List[str] = []
+        current, current_tokens = "", 0
+        for piece in pieces:
+            piece_tokens = self.count_tokens(piece)
+            if piece_tokens > budget:
+                if current:
+                    chunks.append(current)
+                    current, current_tokens = "", 0
+                chunks.extend(self._chunk_unit(piece, level + 1, budget))
+            elif current_tokens + piece_tokens <= budget:
+                current += piece
+                current_tokens += piece_tokens
+            else:
+                chunks.append(current)
+                current, current_tokens = piece, piece_tokens
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def _fit_unit(self, text: str, level: int, budget: int) -> Tuple[str, List[DroppedPart]]:
+        if self.count_tokens(text) <= budget:
+            return text, []
+        if level >= len(UNITS):
+            return self._hard_cut(text, budget)
+
+        unit = UNITS[level]
+        pieces = _split(text, unit)
+        if len(pieces) <= 1:
+            return self._fit_unit(text, level + 1, budget)
+
+        # Önce tümüyle sığan parçalar (sırayla) seçilir; böylece büyük bir parça küçük
+        # bölümlerin (ör. CV'deki "Yetenekler") yerini kaplamaz.
+        sizes = [self.count_tokens(piece) for piece in pieces]
+        keep = [False] * len(pieces)
+        remaining = budget
+        for index, piece_tokens in enumerate(sizes):
+            if piece_tokens <= remaining:
+                keep[index] = True
+                remaining -= piece_tokens
+
+        # Kalan yer, sığmayan ilk parçanın bir alt seviyede bölünerek kısmen alınmasına kullanılır
+        partial_index = next((index for index, kept in enumerate(keep) if not kept), None)
+        partial_text = ""
+        if partial_index is not None and remaining >= MIN_PARTIAL_TOKENS:
+            partial_text, _ = self._fit_unit(pieces[partial_index], level + 1, remaining)
+        else:
+            partial_index = None
+
+        kept_pieces: List[str] = []
+        dropped: List[DroppedPart] = []
+        for index, piece in enumerate(pieces):
+            if keep[index]:
+                kept_pieces.append(piece)
+                continue
+            name = _piece_name(piece, unit)
+            if index == partial_index:
+                kept_pieces.append(partial_text)
+                dropped.append(DroppedPart(unit=unit, name=name, partial=True,
+                                           tokens=sizes[index] - self.count_tokens(partial_text)))
+            elif name:
+                dropped.append(DroppedPart(unit=unit, name=name, tokens=sizes[index]))
+        return "".join(kept_pieces), dropped
+
+    def _hard_cut(self, text: str, budget: int) -> Tuple[str, List[DroppedPart]]:
+        """Bölünecek sınır kalmadıysa (ör. tek satırlık minified dosya) bütçeye sığan en uzun önek alınır."""
+        low, high = 0, len(text)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.count_tokens(text[:middle]) <= budget:
+                low = middle
+            else:
+                high = middle - 1
+        dropped_tokens = self.count_tokens(text[low:])
+        part = DroppedPart(unit="text", name=_piece_name(text, "text"), tokens=dropped_tokens, partial=True)
+        return text[:low], [part]
+
+    @staticmethod
+    def _omission_note(dropped: List[DroppedPart]) -> str:
+        names = []
+        for part in dropped:
+            if part.name not in names:
+                names.append(part.name)
+        listed = ", ".join(names[:OMISSION_NOTE_MAX_NAMES])
+        if len(names) > OMISSION_NOTE_MAX_NAMES:
+            listed += f" ve {len(names) - OMISSION_NOTE_MAX_NAMES} diğer"
+        return (f"\n\n[Not: İçerik uzunluk sınırı nedeniyle kısaltıldı; "
+                f"{sum(part.tokens for part in dropped)} token'lık kısım gönderilmedi: {listed}]")
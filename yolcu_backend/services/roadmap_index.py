@@ -0,0 +1,196 @@
+"""
+Yol haritası öğeleri için düz indeks (roadmap_items tablosu).
+
+Roadmap kaydedilirken mainStages -> subNodes -> leftItems/rightItems ağacı bir kez gezilir ve
+her öğe (item_id, konu, ana düğüm, aşama) satır olarak yazılır. Özet, quiz, sohbet ve proje önerisi
+akışları JSON'u tekrar tekrar gezmek yerine bu indeksi kullanır; (roadmap_id, item_id) benzersiz
+olduğu için tek öğe araması indeksli tek bir sorgudur.
+
+LLM çıktısı item_id'lerin benzersiz olduğunu garanti etmez. Yeni kaydedilen yol haritalarında
+eksik veya tekrarlanan id'ler içerikte yeniden yazılır. Bu tablo eklenmeden önce kaydedilmiş yol
+haritaları ilk erişimde indekslenir; içerikleri değiştirilmez, tekrarlanan id'lerin ilki kullanılır.
+"""
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from yolcu_backend.models import Roadmap, RoadmapItem, RoadmapTemplate
+
+logger = logging.getLogger(__name__)
+
+SIDES = ("leftItems", "rightItems")
+TITLE_MAX_LENGTH = 255
+
+
+def iter_items(content: Dict[str, Any]):
+    """(aşama sırası, aşama, düğüm, taraf, öğe) demetlerini yol haritasındaki sırayla döndürür."""
+    for stage_index, stage in enumerate(content.get("mainStages") or []):
+        for node in stage.get("subNodes") or []:
+            for side in SIDES:
+                for item in node.get(side) or []:
+                    if isinstance(item, dict):
+                        yield stage_index, stage, node, side, item
+
+
+def ensure_unique_item_ids(content: Dict[str, Any]) -> int:
+    """
+    Eksik veya tekrarlanan item id'lerini içerikte yerinde yeniden yazar.
+    Yeni id öğenin ağaçtaki konumundan türetilir; böylece aynı içerik her seferinde aynı id'leri
+    (ve şablonlarda aynı content_hash'i) alır. Yeniden yazılan id sayısını döndürür.
+    """
+    items = list(iter_items(content))
+    taken = {item.get("id") for *_, item in items}
+    seen = set()
+    rewritten = 0
+    for position, (stage_index, _, _, _, item) in enumerate(items):
+        item_id = item.get("id")
+        if not isinstance(item_id, str) or not item_id or item_id in seen:
+            item_id = f"item_{stage_index}_{position}"
+            suffix = 1
+            while item_id in taken or item_id in seen:
+                suffix += 1
+                item_id = f"item_{stage_index}_{position}_{suffix}"
+            item["id"] = item_id
+            rewritten += 1
+        seen.add(item_id)
+    return rewritten
+
+
+def _item_rows(roadmap_id: int, content: Dict[str, Any]) -> List[Dict[str, Any]]:
+    rows = []
+    seen = set()
+    for stage_index, stage, node, side, item in iter_items(content):
+        item_id, name = item.get("id"), item.get("name")
+        if not item_id or not name or item_id in seen:
+            continue
+        seen.add(item_id)
+        rows.append({
+            "roadmap_id": roadmap_id,
+            "item_id": str(item_id),
+            "name": str(name),
+            "side": side,
+            "central_node": node.get("centralNodeTitle"),
+            "stage_name": stage.get("stageName"),
+            "stage_index": stage_index,
+            "position": len(rows),
+        })
+    return rows
+
+
+def content_stats(content: Dict[str, Any], item_count: int) -> Dict[str, Any]:
+    """Liste ekranında gösterilen başlık ve aşama/öğe sayıları."""
+    title = content.get("diagramTitle")
+    return {
+        "title": str(title)[:TITLE_MAX_LENGTH] if title else None,
+        "stage_count": len(content.get("mainStages") or []),
+        "item_count": item_count,
+    }
+
+
+def index_roadmap(db: Session, roadmap: Roadmap) -> int:
+    """Yol haritasının öğelerini roadmap_items tablosuna yazar (commit çağırana aittir)."""
+    rows = _item_rows(roadmap.id, roadmap.content or {})
+    if rows:
+        db.execute(insert(RoadmapItem), rows)
+    return len(rows)
+
+
+def create_roadmap(db: Session, user_id: int, content: Optional[Dict[str, Any]] = None,
+                   template: Optional[RoadmapTemplate] = None) -> Roadmap:
+    """
+    Yeni yol haritasını, item id'lerini benzersizleştirerek ve indeksini oluşturarak kaydeder.
+    template verilirse içerik kopyalanmaz, yol haritası ortak şablona bağlanır.
+    """
+    if template is not None:
+        roadmap = Roadmap(user_id=user_id, template=template)
+    else:
+        rewritten = ensure_unique_item_ids(content)
+        if rewritten:
+            logger.warning(f"Rewrote {rewritten} missing/duplicate item ids in generated roadmap for user_id: {user_id}")
+        roadmap = Roadmap(user_id=user_id, content=content)
+    db.add(roadmap)
+    db.flush()
+    item_count = index_roadmap(db, roadmap)
+    for key, value in content_stats(roadmap.content or {}, item_count).items():
+        setattr(roadmap, key, value)
+    db.commit()
+    db.refresh(roadmap)
+    return roadmap
+
+
+def _backfill(db: Session, roadmap: Roadmap) -> bool:
+    """Tablo eklenmeden önce kaydedilmiş yol haritalarını ilk erişimde indeksler."""
+    try:
+        if not index_roadmap(db, roadmap):
+            return False
+        db.commit()
+    except IntegrityError:
+        # Eşzamanlı başka bir istek aynı yol haritasını indekslemiş
+        db.rollback()
+        return True
+    logger.info(f"Backfilled item index for roadmap_id: {roadmap.id}")
+    return True
+
+
+def backfill_stats(db: Session, roadmaps: List[Roadmap]) -> None:
+    """Özet bilgiler eklenmeden önce kaydedilmiş yol haritalarının bilgilerini bir kez hesaplar."""
+    missing = [roadmap for roadmap in roadmaps if roadmap.stage_count is None]
+    if not missing:
+        return
+    for roadmap in missing:
+        content = roadmap.content or {}
+        stats = content_stats(content, len(_item_rows(roadmap.id, content)))
+        # Bilgi eklemek yol haritasını değiştirmez; updated_at korunur
+        db.execute(update(Roadmap).where(Roadmap.id == roadmap.id).values(**stats, updated_at=Roadmap.updated_at))
+    db.commit()
+    logger.info(f"Backfilled stats for {len(missing)} roadmaps")
+
+
+def _is_indexed(db: Session, roadmap: Roadmap) -> bool:
+    return db.query(RoadmapItem.id).filter(RoadmapItem.roadmap_id == roadmap.id).first() is not None
+
+
+def get_item(db: Session, roadmap: Roadmap, item_id: str) -> Optional[RoadmapItem]:
+    query = db.query(RoadmapItem).filter(RoadmapItem.roadmap_id == roadmap.id, RoadmapItem.item_id == item_id)
+    item = query.first()
+    if item is None and not _is_indexed(db, roadmap) and _backfill(db, roadmap):
+        item = query.first()
+    return item
+
+
+def get_items(db: Session, roadmap: Roadmap) -> List[RoadmapItem]:
+    query = db.query(RoadmapItem).filter(RoadmapItem.roadmap_id == roadmap.id).order_by(RoadmapItem.position)
+    items = query.all()
+    if not items and _backfill(db, roadmap):
+        items = query.all()
+    return items
+
+
+def get_node_items(db: Session, roadmap: Roadmap, central_node: str) -> List[RoadmapItem]:
+    """Bir ana düğümün (subNode) öğelerini yol haritasındaki sırayla döndürür."""
+    return [item for item in get_items(db, roadmap) if item.central_node == central_node]
+
+
+def get_quiz_items(db: Session, roadmap: Roadmap) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
+    """Quiz için sol ve sağ öğeleri ({"id", "name"}) yol haritasındaki sırayla döndürür."""
+    left_items, right_items = [], []
+    for item in get_items(db, roadmap):
+        target = left_items if item.side == "leftItems" else right_items
+        target.append({"id": item.item_id, "name": item.name})
+    return left_items, right_items
+
+
+def get_topics(db: Session, roadmap: Roadmap) -> List[str]:
+    """Sohbet için yol haritası başlığı, ana düğüm başlıkları ve öğe adlarından oluşan benzersiz konu listesi."""
+    topics = {}
+    title = (roadmap.content or {}).get("diagramTitle")
+    if title:
+        topics[title] = None
+    for item in get_items(db, roadmap):
+        if item.central_node:
+            topics[item.central_node] = None
+        topics[item.name] = None
+    return list(topics)
@@ -0,0 +1,89 @@
+"""
+Konu bazında paylaşılan yol haritası şablonları (roadmap_templates tablosu).
+
+Aynı konuyu ("Python", "python ", "PYTHON!") isteyen kullanıcılar Gemini'ye tekrar gitmeden
+ortak bir şablona bağlanır; yol haritası satırı içeriği kopyalamaz, template_id ile şablonu gösterir.
+Bir konu için ROADMAP_TEMPLATE_VARIANTS kadar varyant üretilir, sonrakiler bunlardan birini alır.
+Her varyant (topic_key, variant_no) yuvasına yazılır; eşzamanlı üretilen fazla varyantlar kaydedilmez,
+mevcut bir şablon döner. Şablonlar içerik özetiyle (SHA-256) saklandığı için aynı içerik iki kez yazılmaz.
+"""
+import hashlib
+import json
+import logging
+import random
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from yolcu_backend.models import RoadmapTemplate
+from yolcu_backend.services.roadmap_index import ensure_unique_item_ids
+from yolcu_backend.services.topic_matcher import normalize
+
+logger = logging.getLogger(__name__)
+
+TOPIC_KEY_MAX_LENGTH = 255
+
+
+def topic_key(field: str) -> str:
+    """Büyük/küçük harf, Türkçe karakter ve noktalama farklarını yok sayan konu anahtarı."""
+    key = normalize(field) or field.strip().lower()
+    return key[:TOPIC_KEY_MAX_LENGTH]
+
+
+def content_hash(content: Dict[str, Any]) -> str:
+    canonical = json.dumps(content, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _template_ids(db: Session, key: str) -> List[int]:
+    return [row[0] for row in db.query(RoadmapTemplate.id).filter(RoadmapTemplate.topic_key == key).all()]
+
+
+def pick_template(db: Session, key: str, variants: int) -> Optional[RoadmapTemplate]:
+    """
+    Konunun tüm varyantları üretilmişse bunlardan birini rastgele döndürür.
+    Henüz eksik varyant varsa None döner; çağıran yeni bir varyant üretir.
+    """
+    template_ids = _template_ids(db, key)
+    if not template_ids or len(template_ids) < variants:
+        return None
+    return db.get(RoadmapTemplate, random.choice(template_ids))
+
+
+def save_template(db: Session, key: str, field: str, content: Dict[str, Any], variants: int) -> RoadmapTemplate:
+    """
+    Yeni üretilen içeriği konunun bir sonraki boş varyant yuvasına kaydeder. Aynı içerik zaten varsa
+    (ör. eşzamanlı iki istek aynı Gemini cevabını paylaştıysa) mevcut şablon döner. Konunun variants
+    kadar şablonu varsa (eşzamanlı başka istekler yuvaları doldurduysa) içerik kaydedilmez, mevcut
+    şablonlardan biri döner.
+    """
+    rewritten = ensure_unique_item_ids(content)
+    if rewritten:
+        logger.warning(f"Rewrote {rewritten} missing/duplicate item ids in roadmap template for topic: {key}")
+
+    digest = content_hash(content)
+    # Her IntegrityError başka bir isteğin yuvayı (veya aynı içeriği) yazdığı anlamına gelir;
+    # en fazla variants + 1 denemede ya kaydedilir ya da sınıra ulaşılır
+    for _ in range(variants + 1):
+        existing = db.query(RoadmapTemplate).filter(RoadmapTemplate.content_hash == digest).first()
+        if existing is not None:
+            return existing
+
+        template_ids = _template_ids(db, key)
+        if len(template_ids) >= variants:
+            logger.info(f"Roadmap templates for topic: {key} are full, discarding the generated variant")
+            return db.get(RoadmapTemplate, random.choice(template_ids))
+
+        template = RoadmapTemplate(topic_key=key, field=field, content=content, content_hash=digest,
+                                   variant_no=len(template_ids))
+        db.add(template)
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            continue
+        db.refresh(template)
+        logger.info(f"Saved roadmap template id: {template.id} (variant {template.variant_no}) for topic: {key}")
+        return template
+    raise RuntimeError(f"Could not save a roadmap template for topic: {key}")
@@ -0,0 +1,142 @@
+"""
+CV analizinde aranan beceri/ATS anahtar kelimeleri ve hedef profiller.
+
+SKILLS: kanonik ad -> eş anlamlılar. Kanonik ad da ayrıca aranır; eşleştirme büyük/küçük harf
+duyarsızdır ve çok kelimeli ifadeler ("machine learning", "spring boot") kelime sınırlarında eşleşir.
+Gündelik anlamı olan kısa kelimeler ("go", "rest", "spring", "express") yanlış eşleşme vermesin diye
+kanonik ad dahil sadece belirgin biçimleriyle ("Golang", "REST API", "Spring Boot") yazılmıştır.
+
+TARGET_PROFILES: CV'nin karşılaştırıldığı hedef rol; becerileri SKILLS'teki kanonik adlardır.
+"""
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+SKILLS: Dict[str, Tuple[str, ...]] = {
+    # Diller
+    "Python": (),
+    "Java": (),
+    "JavaScript": ("js", "ecmascript"),
+    "TypeScript": (),
+    "C++": ("cpp",),
+    "C#": ("csharp",),
+    "Golang": ("go lang",),
+    "Kotlin": (),
+    "Swift": (),
+    "Dart": (),
+    "PHP": (),
+    "Ruby": (),
+    "SQL": (),
+    # Web
+    "HTML": ("html5",),
+    "CSS": ("css3",),
+    "Sass": ("scss",),
+    "Tailwind CSS": ("tailwind", "tailwindcss"),
+    "React": ("react.js", "reactjs"),
+    "Next.js": ("nextjs",),
+    "Angular": ("angularjs",),
+    "Vue.js": ("vue", "vuejs"),
+    "Redux": (),
+    "Node.js": ("nodejs", "node js"),
+    "Express.js": ("expressjs",),
+    "Django": (),
+    "Flask": (),
+    "FastAPI": (),
+    "Spring Boot": ("springboot", "spring framework"),
+    ".NET": ("dotnet", "asp.net", ".net core"),
+    "REST API": ("rest apis", "restful", "restful api", "restful apis", "rest servisleri"),
+    "GraphQL": (),
+    # Veritabanları
+    "PostgreSQL": ("postgres",),
+    "MySQL": (),
+    "MongoDB": ("mongo",),
+    "Redis": (),
+    "SQLite": (),
+    "Elasticsearch": ("elastic search",),
+    # Mobil
+    "Android": (),
+    "iOS": (),
+    "Flutter": (),
+    "React Native": (),
+    # Veri / yapay zeka
+    "Machine Learning": ("makine öğrenmesi", "makine öğrenimi"),
+    "Deep Learning": ("derin öğrenme",),
+    "Data Analysis": ("veri analizi", "data analytics"),
+    "Data Visualization": ("veri görselleştirme",),
+    "Statistics": ("istatistik",),
+    "NLP": ("natural language processing", "doğal dil işleme"),
+    "Computer Vision": ("bilgisayarlı görü", "görüntü işleme", "image processing"),
+    "Pandas": (),
+    "NumPy": (),
+    "scikit-learn": ("sklearn", "scikit learn"),
+    "TensorFlow": (),
+    "PyTorch": (),
+    "Jupyter": ("jupyter notebook",),
+    "Power BI": ("powerbi",),
+    "Tableau": (),
+    # DevOps / bulut
+    "Git": (),
+    "GitHub": (),
+    "Linux": (),
+    "Docker": (),
+    "Kubernetes": ("k8s",),
+    "CI/CD": ("continuous integration", "continuous delivery", "sürekli entegrasyon"),
+    "Jenkins": (),
+    "GitHub Actions": (),
+    "Terraform": (),
+    "Ansible": (),
+    "AWS": ("amazon web services",),
+    "Azure": ("microsoft azure",),
+    "GCP": ("google cloud", "google cloud platform"),
+    "Nginx": (),
+    "Bash": ("shell scripting",),
+    "Microservices": ("microservice", "mikroservis", "mikroservisler"),
+    # Süreç / yöntem
+    "Unit Testing": ("unit test", "unit tests", "birim test", "birim testi", "pytest", "junit", "jest"),
+    "Agile": ("çevik",),
+    "Scrum": (),
+    "OOP": ("object oriented programming", "object-oriented programming", "nesne yönelimli programlama"),
+    "Data Structures": ("veri yapıları",),
+    "Algorithms": ("algoritmalar",),
+    "Figma": (),
+}
+
+
+@dataclass(frozen=True)
+class TargetProfile:
+    key: str
+    title: str
+    skills: Tuple[str, ...]
+
+
+TARGET_PROFILES: Dict[str, TargetProfile] = {profile.key: profile for profile in (
+    TargetProfile("general", "Software Developer", (
+        "Git", "SQL", "OOP", "Data Structures", "Algorithms", "REST API", "Unit Testing", "Linux", "Agile",
+        "Docker",
+    )),
+    TargetProfile("backend", "Backend Developer", (
+        "Python", "Java", "SQL", "PostgreSQL", "REST API", "Docker", "Git", "Linux", "Redis", "Microservices",
+        "Unit Testing", "CI/CD",
+    )),
+    TargetProfile("frontend", "Frontend Developer", (
+        "JavaScript", "TypeScript", "HTML", "CSS", "React", "Redux", "Next.js", "REST API", "Git", "Figma",
+        "Unit Testing", "Tailwind CSS",
+    )),
+    TargetProfile("fullstack", "Full Stack Developer", (
+        "JavaScript", "TypeScript", "React", "Node.js", "Express.js", "HTML", "CSS", "SQL", "MongoDB", "REST API",
+        "Docker", "Git",
+    )),
+    TargetProfile("data_science", "Data Scientist", (
+        "Python", "SQL", "Pandas", "NumPy", "scikit-learn", "Machine Learning", "Deep Learning", "Statistics",
+        "Data Visualization", "Jupyter", "TensorFlow", "PyTorch",
+    )),
+    TargetProfile("mobile", "Mobile Developer", (
+        "Kotlin", "Swift", "Android", "iOS", "Flutter", "Dart", "React Native", "REST API", "Git", "Unit Testing",
+    )),
+    TargetProfile("devops", "DevOps Engineer", (
+        "Linux", "Docker", "Kubernetes", "CI/CD", "Terraform", "Ansible", "AWS", "Bash", "Git", "Jenkins", "Nginx",
+        "Python",
+    )),
+)}
+
+# Hiçbir profilin becerisi bulunamadığında karşılaştırılan profil
+DEFAULT_PROFILE = "general"
@@ -0,0 +1,16 @@
+import json
+from typing import Any, Optional
+
+# Proxy'lerin (ör. nginx) olayları tamponlamadan hemen iletmesi için
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+}
+
+
+def format_sse(data: Any, event: Optional[str] = None) -> str:
+    """Veriyi Server-Sent Events formatında tek bir olaya çevirir."""
+    payload = json.dumps(data, ensure_ascii=False)
+    if event:
+        return f"event: {event}\ndata: {payload}\n\n"
+    return f"data: {payload}\n\n"
@@ -0,0 +1,102 @@
+"""
+Gemini'den parça parça gelen metni, tam cevaba uygulanan temizleme kurallarıyla
+aynı sonucu verecek şekilde artımlı olarak temizleyen yardımcılar.
+"""
+
+
+class _StarStripper:
+    """`text.replace("**", "")` işleminin artımlı karşılığı."""
+
+    def __init__(self):
+        self._star_pending = False
+
+    def feed(self, chunk: str) -> str:
+        out = []
+        for char in chunk:
+            if char == "*":
+                if self._star_pending:
+                    self._star_pending = False
+                else:
+                    self._star_pending = True
+                continue
+            if self._star_pending:
+                out.append("*")
+                self._star_pending = False
+            out.append(char)
+        return "".join(out)
+
+    def flush(self) -> str:
+        if self._star_pending:
+            self._star_pending = False
+            return "*"
+        return ""
+
+
+class SummaryStreamCleaner:
+    """
+    SummaryCreator.clean_summary_text ile aynı çıktıyı üretir:
+    ** işaretleri kaldırılır, satırlar kırpılır, boş satırlar atılır ve başa konu başlığı eklenir.
+    """
+
+    def __init__(self, main_topic: str):
+        self._stars = _StarStripper()
+        self._header = f"{main_topic}:\n"
+        self._header_sent = False
+        self._line_started = False
+        self._any_line = False
+        self._pending_space = ""
+
+    def _clean(self, text: str) -> str:
+        out = []
+        if not self._header_sent:
+            out.append(self._header)
+            self._header_sent = True
+        for char in text:
+            if char == "\n":
+                self._line_started = False
+                self._pending_space = ""
+            elif char.isspace():
+                # Satır içi boşluk, ancak arkasından yazı gelirse yazılır (satır sonu kırpma)
+                if self._line_started:
+                    self._pending_space += char
+            else:
+                if not self._line_started:
+                    if self._any_line:
+                        out.append("\n")
+                    self._line_started = True
+                    self._any_line = True
+                else:
+                    out.append(self._pending_space)
+                self._pending_space = ""
+                out.append(char)
+        return "".join(out)
+
+    def feed(self, chunk: str) -> str:
+        return self._clean(self._stars.feed(chunk))
+
+    def flush(self) -> str:
+        return self._clean(self._stars.flush())
+
+
+class ChatAnswerStreamCleaner:
+    """`raw_answer.replace('\\n', ' ').strip()` işleminin artımlı karşılığı."""
+
+    def __init__(self):
+        self._started = False
+        self._pending_space = ""
+
+    def feed(self, chunk: str) -> str:
+        out = []
+        for char in chunk.replace("\n", " "):
+            if char.isspace():
+                if self._started:
+                    self._pending_space += char
+                continue
+            out.append(self._pending_space)
+            self._pending_space = ""
+            self._started = True
+            out.append(char)
+        return "".join(out)
+
+    def flush(self) -> str:
+        return ""
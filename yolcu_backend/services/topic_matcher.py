@@ -0,0 +1,153 @@
+"""
+Sohbet sorusunun yol haritasındaki hangi konuyla ilgili olduğunu süreç içinde bulan eşleştirici.
+
+Konular Türkçe'ye uygun şekilde normalize edilir (İ/ı dönüşümü, ş->s, ğ->g gibi harf katlama,
+noktalama ve soru kalıplarının atılması) ve kelime + karakter trigram indeksine konur.
+Türkçe ekler ("Python'da", "listeleri") trigram ve kelime öneki eşleşmesiyle yakalanır.
+
+Eşleşme yeterince güçlü ve tek anlamlıysa sonuç doğrudan kullanılır; değilse (confident=False)
+çağıran taraf eski yöntemle LLM'e sorar.
+"""
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+_TURKISH_LOWER = str.maketrans({"I": "ı", "İ": "i"})
+_FOLD = str.maketrans({"ç": "c", "ğ": "g", "ı": "i", "ö": "o", "ş": "s", "ü": "u", "â": "a", "î": "i", "û": "u"})
+_NON_WORD = re.compile(r"[^a-z0-9+#]+")
+
+# Soru kalıpları ve bağlaçlar; konu adıyla eşleşmeye katkı vermezler (katlanmış halleriyle)
+STOPWORDS = frozenset({
+    "ve", "ile", "veya", "ya", "da", "de", "bir", "bu", "su", "o", "icin", "gibi", "en", "cok", "daha",
+    "ne", "neden", "nedir", "nelerdir", "nasil", "niye", "hangi", "kim", "mi", "mu", "midir", "mudur",
+    "hakkinda", "anlat", "anlatir", "anlatabilir", "misin", "musun", "acikla", "aciklar", "aciklayabilir",
+    "ornek", "verir", "ver", "yapilir", "kullanilir", "nerede", "zaman", "ogrenmek", "istiyorum", "bana",
+    "the", "a", "an", "and", "or", "of", "to", "in", "what", "is", "how", "why", "for", "with",
+})
+
+MIN_PREFIX_LENGTH = 3
+TOKEN_WEIGHT = 0.6
+TRIGRAM_WEIGHT = 0.4
+# Bu skorun altındaki veya rakibine bu farktan yakın eşleşmeler LLM'e bırakılır
+CONFIDENT_SCORE = 0.75
+CONFIDENT_MARGIN = 0.15
+INDEX_CACHE_SIZE = 256
+
+
+def normalize(text: str) -> str:
+    """Türkçe'ye uygun küçük harfe çevirir, harfleri katlar ve noktalamayı boşluğa çevirir."""
+    text = text.translate(_TURKISH_LOWER).lower().translate(_FOLD)
+    return " ".join(_NON_WORD.sub(" ", text).split())
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in normalize(text).split() if token not in STOPWORDS]
+
+
+def trigrams(tokens: Iterable[str]) -> Set[str]:
+    grams = set()
+    for token in tokens:
+        padded = f" {token} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _matching_tokens(topic_token: str, question_tokens: FrozenSet[str]) -> Set[str]:
+    """Konu kelimesiyle eşleşen soru kelimeleri ("python'da" -> "pythonda" gibi ekli halleri dahil)."""
+    if topic_token in question_tokens:
+        return {topic_token}
+    if len(topic_token) < MIN_PREFIX_LENGTH:
+        return set()
+    return {token for token in question_tokens
+            if token.startswith(topic_token) or (len(token) >= MIN_PREFIX_LENGTH and topic_token.startswith(token))}
+
+
+@dataclass(frozen=True)
+class TopicMatch:
+    topic: Optional[str]
+    score: float
+    confident: bool
+
+
+@dataclass(frozen=True)
+class _IndexedTopic:
+    name: str
+    tokens: Tuple[str, ...]
+    grams: FrozenSet[str]
+
+
+class TopicIndex:
+    def __init__(self, topics: Iterable[str]):
+        self.topics: List[_IndexedTopic] = []
+        self._by_gram: Dict[str, List[int]] = defaultdict(list)
+        for name in topics:
+            tokens = tuple(dict.fromkeys(tokenize(name)))
+            if not tokens:
+                continue
+            topic = _IndexedTopic(name=name, tokens=tokens, grams=frozenset(trigrams(tokens)))
+            for gram in topic.grams:
+                self._by_gram[gram].append(len(self.topics))
+            self.topics.append(topic)
+
+    def _score(self, topic: _IndexedTopic, question_tokens: FrozenSet[str],
+               question_grams: Set[str]) -> Tuple[float, FrozenSet[str]]:
+        """(skor, eşleşen soru kelimeleri) döner."""
+        matched_topic_tokens = 0
+        matched_question_tokens: Set[str] = set()
+        for token in topic.tokens:
+            matches = _matching_tokens(token, question_tokens)
+            if matches:
+                matched_topic_tokens += 1
+                matched_question_tokens |= matches
+        token_coverage = matched_topic_tokens / len(topic.tokens)
+        gram_coverage = len(topic.grams & question_grams) / len(topic.grams)
+        return TOKEN_WEIGHT * token_coverage + TRIGRAM_WEIGHT * gram_coverage, frozenset(matched_question_tokens)
+
+    def match(self, question: str, general_topics: Iterable[str] = ()) -> TopicMatch:
+        """
+        general_topics: yol haritasının ana başlığı gibi genel konular. Soruda daha özel bir konu
+        da güçlü şekilde geçiyorsa ("Python'da sözlükler") genel konu rakip sayılmaz.
+        """
+        question_tokens = frozenset(tokenize(question))
+        if not question_tokens or not self.topics:
+            return TopicMatch(topic=None, score=0.0, confident=False)
+        question_grams = trigrams(question_tokens)
+
+        candidates = {index for gram in question_grams for index in self._by_gram.get(gram, ())}
+        general = set(general_topics)
+        scored = []
+        for index in candidates:
+            topic = self.topics[index]
+            score, matched = self._score(topic, question_tokens, question_grams)
+            scored.append((score, len(matched), matched, topic.name))
+        if not scored:
+            return TopicMatch(topic=None, score=0.0, confident=False)
+
+        specific_strong = any(score >= CONFIDENT_SCORE and name not in general for score, _, _, name in scored)
+        if specific_strong:
+            scored = [item for item in scored if item[3] not in general]
+
+        # Aynı skorda daha çok kelimesi eşleşen (daha özel) konu öne geçer
+        scored.sort(key=lambda item: (item[0], item[1]), reverse=True)
+        best_score, _, best_matched, best_topic = scored[0]
+        confident = best_score >= CONFIDENT_SCORE
+        for score, _, matched, _ in scored[1:]:
+            if best_score - score >= CONFIDENT_MARGIN:
+                break
+            # "Fonksiyonlar" ile "Lambda Fonksiyonları" gibi, eşleşmesi en iyinin alt kümesi olan konu rakip sayılmaz
+            if not matched <= best_matched:
+                confident = False
+                break
+        return TopicMatch(topic=best_topic, score=round(best_score, 3), confident=confident)
+
+
+@lru_cache(maxsize=INDEX_CACHE_SIZE)
+def _cached_index(topics: Tuple[str, ...]) -> TopicIndex:
+    return TopicIndex(topics)
+
+
+def get_topic_index(topics: Iterable[str]) -> TopicIndex:
+    """Aynı konu listesi için indeksi bir kez kurar; sonraki sorularda önbellekten döner."""
+    return _cached_index(tuple(sorted(set(topics))))
@@ -0,0 +1,59 @@
+"""
+Yüklenen dosyalar (CV, proje) için bellek içi işleme hattı.
+
+Yükleme parça parça okunur ve boyut sınırı okuma sırasında uygulanır; sınırı aşan dosyanın
+tamamı belleğe alınmaz. Okunan baytlar diske yazılmadan ayrıştırılır (PDF'ler fitz.open(stream=...)
+ile açılır). PyMuPDF, chardet ve langdetect CPU yoğun olduğu için ayrıştırma event loop yerine
+süreç havuzunda çalışır; havuza verilen fonksiyonlar modül seviyesinde (pickle edilebilir) olmalıdır.
+"""
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException, UploadFile
+
+READ_CHUNK_SIZE = 64 * 1024
+
+
+async def read_upload(file: UploadFile, max_bytes: int, chunk_size: int = READ_CHUNK_SIZE) -> bytes:
+    """Yüklemeyi parça parça okur; max_bytes aşılınca okumayı bırakıp 413 döner."""
+    too_large = HTTPException(status_code=413, detail=f"File too large (max {max_bytes / (1024 * 1024):.3g}MB).")
+    # Boyut biliniyorsa hiç okumadan reddedilir
+    if file.size is not None and file.size > max_bytes:
+        raise too_large
+
+    chunks = []
+    total = 0
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            break
+        total += len(chunk)
+        if total > max_bytes:
+            raise too_large
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+class ParsePool:
+    """
+    Ayrıştırma işlerini ayrı süreçlerde çalıştırır. workers=0 ise süreç havuzu kurulmaz,
+    işler event loop'un varsayılan thread havuzunda çalışır (ör. testlerde veya tek çekirdekte).
+    """
+
+    def __init__(self, workers: int = 2):
+        self.workers = workers
+        self._executor: Optional[Executor] = None
+
+    def start(self) -> None:
+        if self.workers > 0 and self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
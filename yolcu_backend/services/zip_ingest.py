@@ -0,0 +1,230 @@
+"""
+Proje değerlendirmesi için ZIP arşivlerini diske çıkarmadan, sınırlı bellekle okur.
+
+Üyeler arşivden tek tek akış olarak okunur (zipfile.open); başlıktaki boyut bilgisine güvenilmez,
+okunan bayt sayısı dosya başına ve toplamda sınırlanır (zip bombası diski/belleği dolduramaz).
+Bağımlılık/derleme klasörleri, kilit dosyaları ve küçültülmüş (minified) dosyalar hiç açılmaz;
+ilk baytlarında NUL veya bilinen ikili imzalar olan dosyalar ikili kabul edilip atlanır.
+
+Dosyalar önem sırasıyla okunur ve bu sırayla döner (README, giriş noktaları, bağımlılık tanımları,
+kaynak kod, testler, veri dosyaları); boyut/sayı sınırları ve sondan kısaltan prompt bütçesi önce
+önemsiz dosyaları dışarıda bırakır.
+Atlanan dosyalar nedenleriyle raporlanır; yok sayılan klasörler tek satırda, dosya sayısıyla verilir.
+"""
+import io
+import posixpath
+import zipfile
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+FILE_HEADER_TEMPLATE = "--- Dosya: {path} ---\n{content}"
+
+SNIFF_BYTES = 8 * 1024
+READ_CHUNK_SIZE = 64 * 1024
+
+IGNORED_DIRS = {
+    ".git", ".hg", ".svn", "node_modules", "bower_components", "vendor", "venv", ".venv", "env",
+    "site-packages", "__pycache__", ".mypy_cache", ".pytest_cache", ".tox", ".gradle", ".idea", ".vscode",
+    "dist", "build", "out", "target", "bin", "obj", ".next", ".nuxt", "coverage", "Pods", "__MACOSX",
+}
+IGNORED_FILES = {
+    "package-lock.json", "yarn.lock", "pnpm-lock.yaml", "poetry.lock", "Pipfile.lock", "composer.lock",
+    "Gemfile.lock", "Cargo.lock", "go.sum", ".DS_Store", "Thumbs.db",
+}
+MINIFIED_SUFFIXES = (".min.js", ".min.css", ".map")
+# Açmadan atlanan ikili uzantılar; diğerleri ilk baytlarına bakılarak ayıklanır
+BINARY_EXTENSIONS = {
+    ".png", ".jpg", ".jpeg", ".gif", ".bmp", ".ico", ".webp", ".pdf", ".zip", ".gz", ".tar", ".rar", ".7z",
+    ".jar", ".war", ".class", ".exe", ".dll", ".so", ".dylib", ".o", ".a", ".pyc", ".pyo", ".whl",
+    ".mp3", ".mp4", ".wav", ".mov", ".avi", ".ttf", ".otf", ".woff", ".woff2", ".eot", ".db", ".sqlite",
+    ".psd", ".docx", ".xlsx", ".pptx",
+}
+BINARY_SIGNATURES = (b"\x89PNG", b"%PDF", b"PK\x03\x04", b"GIF8", b"\xff\xd8\xff", b"\x7fELF", b"\xca\xfe\xba\xbe")
+
+README_NAMES = ("readme",)
+ENTRY_POINT_STEMS = {"main", "app", "index", "server", "manage", "program", "application"}
+MANIFEST_NAMES = {
+    "package.json", "requirements.txt", "pyproject.toml", "setup.py", "setup.cfg", "pom.xml", "build.gradle",
+    "build.gradle.kts", "cargo.toml", "go.mod", "gemfile", "composer.json", "dockerfile", "docker-compose.yml",
+    "makefile",
+}
+SOURCE_EXTENSIONS = {
+    ".py", ".js", ".jsx", ".ts", ".tsx", ".java", ".kt", ".kts", ".go", ".rs", ".c", ".h", ".cpp", ".hpp",
+    ".cc", ".cs", ".rb", ".php", ".swift", ".m", ".scala", ".dart", ".vue", ".svelte", ".html", ".css",
+    ".scss", ".sql", ".sh", ".ipynb",
+}
+DATA_EXTENSIONS = {".json", ".csv", ".tsv", ".xml", ".svg", ".txt", ".log", ".lock"}
+
+# Önem sırası (küçük önce)
+RANK_README, RANK_ENTRY_POINT, RANK_MANIFEST, RANK_SOURCE, RANK_OTHER, RANK_TEST, RANK_DATA = range(7)
+
+
+@dataclass
+class ZipLimits:
+    max_total_bytes: int = 10 * 1024 * 1024  # okunan (açılmış) toplam bayt
+    max_file_bytes: int = 1024 * 1024
+    max_files: int = 500  # okunan dosya sayısı
+
+
+@dataclass
+class SkippedFile:
+    path: str
+    reason: str
+    files: int = 1  # yok sayılan klasörlerde atlanan dosya sayısı
+
+    def to_dict(self) -> Dict:
+        data = {"path": self.path, "reason": self.reason}
+        if self.files > 1:
+            data["files"] = self.files
+        return data
+
+
+@dataclass
+class IngestedProject:
+    files: List[Tuple[str, str]] = field(default_factory=list)  # (yol, içerik), önem sırasıyla
+    skipped: List[SkippedFile] = field(default_factory=list)
+    total_bytes: int = 0
+
+    def text(self) -> str:
+        return "\n\n".join(FILE_HEADER_TEMPLATE.format(path=path, content=content) for path, content in self.files)
+
+    def skipped_report(self) -> List[Dict]:
+        return [skipped.to_dict() for skipped in self.skipped]
+
+
+def _ignored_dir(path: str) -> Optional[str]:
+    """Yol yok sayılan bir klasörün altındaysa o klasörün yolunu ("a/node_modules/") döndürür."""
+    parts = path.split("/")[:-1]
+    for depth, part in enumerate(parts):
+        if part in IGNORED_DIRS:
+            return "/".join(parts[:depth + 1]) + "/"
+    return None
+
+
+def _skip_reason_by_name(path: str) -> Optional[str]:
+    name = posixpath.basename(path)
+    lower = name.lower()
+    if name in IGNORED_FILES:
+        return "lockfile"
+    if lower.endswith(MINIFIED_SUFFIXES):
+        return "minified"
+    if posixpath.splitext(lower)[1] in BINARY_EXTENSIONS:
+        return "binary"
+    return None
+
+
+def looks_binary(head: bytes) -> bool:
+    return b"\x00" in head or head.startswith(BINARY_SIGNATURES)
+
+
+def relevance_key(path: str) -> Tuple[int, int, str]:
+    """(önem, klasör derinliği, yol); README ve giriş noktaları önce, testler ve veri dosyaları sonra."""
+    lower = path.lower()
+    name = posixpath.basename(lower)
+    stem, ext = posixpath.splitext(name)
+    parts = lower.split("/")[:-1]
+    if stem in README_NAMES:
+        rank = RANK_README
+    elif name in MANIFEST_NAMES:
+        rank = RANK_MANIFEST
+    elif ("test" in parts or "tests" in parts or "__tests__" in parts or stem.startswith("test_")
+          or stem.endswith(("_test", ".test", ".spec"))):
+        rank = RANK_TEST
+    elif ext in SOURCE_EXTENSIONS:
+        rank = RANK_ENTRY_POINT if stem in ENTRY_POINT_STEMS else RANK_SOURCE
+    elif ext in DATA_EXTENSIONS:
+        rank = RANK_DATA
+    else:
+        rank = RANK_OTHER
+    return rank, len(parts), lower
+
+
+def _read_member(zip_ref: zipfile.ZipFile, member: zipfile.ZipInfo, limit: int) -> Tuple[Optional[bytes], str]:
+    """
+    Üyeyi en fazla limit bayt okur. (içerik, "") veya (None, atlanma nedeni) döndürür.
+    İlk parça ikili imza/NUL için kontrol edilir; ikiliyse gerisi okunmaz.
+    """
+    chunks = []
+    total = 0
+    with zip_ref.open(member) as stream:
+        head = stream.read(SNIFF_BYTES)
+        if looks_binary(head):
+            return None, "binary"
+        chunks.append(head)
+        total = len(head)
+        while total <= limit:
+            chunk = stream.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            total += len(chunk)
+    if total > limit:
+        return None, "too_large"
+    return b"".join(chunks), ""
+
+
+def read_zip(data: bytes, limits: Optional[ZipLimits] = None) -> IngestedProject:
+    """
+    Arşivdeki metin dosyalarını önem sırasıyla okur; sınırlar önce önemli dosyalara harcanır.
+    Önce isimden ayıklama yapılır (hiçbir üye açılmaz), kalan adaylar önem sırasıyla okunur.
+    """
+    limits = limits or ZipLimits()
+    project = IngestedProject()
+    ignored_dirs: Dict[str, SkippedFile] = {}
+
+    with zipfile.ZipFile(io.BytesIO(data)) as zip_ref:
+        candidates = []
+        for member in zip_ref.infolist():
+            if member.is_dir():
+                continue
+            path = member.filename.replace("\\", "/").lstrip("/")
+
+            ignored_dir = _ignored_dir(path)
+            if ignored_dir is not None:
+                if ignored_dir in ignored_dirs:
+                    ignored_dirs[ignored_dir].files += 1
+                else:
+                    ignored_dirs[ignored_dir] = SkippedFile(ignored_dir, "ignored_dir")
+                    project.skipped.append(ignored_dirs[ignored_dir])
+                continue
+
+            reason = _skip_reason_by_name(path)
+            if reason is None and member.file_size > limits.max_file_bytes:
+                reason = "too_large"
+            if reason is not None:
+                project.skipped.append(SkippedFile(path, reason))
+                continue
+            candidates.append((relevance_key(path), path, member))
+
+        candidates.sort(key=lambda candidate: candidate[0])
+        for _, path, member in candidates:
+            remaining = limits.max_total_bytes - project.total_bytes
+            if len(project.files) >= limits.max_files:
+                project.skipped.append(SkippedFile(path, "file_count_limit"))
+                continue
+            if remaining <= 0:
+                project.skipped.append(SkippedFile(path, "total_size_limit"))
+                continue
+
+            # Başlıktaki boyut yanlış olabilir; okuma miktarı her durumda sınırlanır
+            limit = min(limits.max_file_bytes, remaining)
+            try:
+                raw, reason = _read_member(zip_ref, member, limit)
+            except (RuntimeError, zipfile.BadZipFile, NotImplementedError, EOFError):
+                # Şifreli, bozuk veya desteklenmeyen sıkıştırma
+                raw, reason = None, "unreadable"
+            if raw is None:
+                if reason == "too_large" and limit < limits.max_file_bytes:
+                    reason = "total_size_limit"
+                project.skipped.append(SkippedFile(path, reason))
+                continue
+
+            try:
+                content = raw.decode("utf-8", errors="strict")
+            except UnicodeDecodeError:
+                project.skipped.append(SkippedFile(path, "not_utf8"))
+                continue
+            project.files.append((path, content))
+            project.total_bytes += len(raw)
+
+    return project
@@ -1,8 +1,68 @@
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
-    GEMINI_API_KEY: str
+    GEMINI_API_KEY: str = ""
     database_url: str
+
+    # Yapay zeka backend'i: "gemini" veya ağ gerektirmeyen "fake" (yük testi / CI için)
+    AI_BACKEND: str = "gemini"
+    AI_FAKE_LATENCY: str = "uniform:0.5,2.0"  # fixed:s | uniform:a,b | normal:ort,std | lognormal:medyan,sigma
+    AI_REPLAY_FILE: str | None = None  # fake backend'in tekrar oynatacağı prompt/cevap kayıtları (JSONL)
+    AI_RECORD_FILE: str | None = None  # verilirse tüm prompt/cevap çiftleri bu dosyaya kaydedilir
+
+    # Gemini eşzamanlılık limitleri
+    AI_MAX_CONCURRENCY: int = 8
+    AI_GENERATOR_CONCURRENCY: dict[str, int] = {}
+
+    # Prompt token bütçeleri (şablon adı -> toplam token); verilmeyenler için generator varsayılanı kullanılır
+    PROMPT_TOKEN_BUDGETS: dict[str, int] = {"evaluation": 30000, "evaluation_chunk": 30000, "cv_feedback": 2000}
+
+    # Bütçeye sığmayan projeler dosya gruplarına bölünüp paralel değerlendirilir, bulgular tek değerlendirmede birleştirilir
+    EVALUATION_MAP_REDUCE: bool = True
+    EVALUATION_MAX_CHUNKS: int = 8
+    EVALUATION_CONCURRENCY: int = 4
+
+    # LLM cevap önbelleği
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_MAX_ENTRIES: int = 1024
+    LLM_CACHE_DB_PATH: str | None = None  # verilirse önbellek SQLite ile diske de yazılır
+
+    # Aynı konu için kullanıcılar arasında paylaşılan yol haritası varyantı sayısı (0: paylaşım kapalı)
+    ROADMAP_TEMPLATE_VARIANTS: int = 3
+
+    # Quiz seviyeleri ayrı isteklerle paralel üretilir; hatalı seviyeler en fazla bu kadar kez tekrar denenir
+    QUIZ_PARALLEL_LEVELS: bool = True
+    QUIZ_LEVEL_RETRIES: int = 2
+
+    # Konu özetlerinin arka planda toplu üretimi (bir ana düğüm açıldığında)
+    SUMMARY_PREFETCH_ENABLED: bool = True
+    SUMMARY_PREFETCH_BATCH_SIZE: int = 8  # tek prompt'a konan en fazla öğe sayısı
+
+    # Arka plan iş kuyruğu: "memory" (tek süreç) veya birden fazla sürecin paylaştığı "database"
+    JOB_QUEUE_BACKEND: str = "memory"
+    JOB_WORKERS: int = 4
+    JOB_POLL_INTERVAL: float = 1.0  # database kuyruğunda boştayken yoklama aralığı (saniye)
+    JOB_TIMEOUT_SECONDS: int = 600
+    JOB_MAX_ATTEMPTS: int = 2  # yarıda kalan (süreç kapanan) işler en fazla bu kadar kez çalıştırılır
+    JOB_RECOVER_INTERVAL_SECONDS: int = 60  # yarıda kalan işlerin kontrol aralığı
+    JOB_PRIORITIES: dict[str, int] = {"quiz": 0, "project_suggestions": 0, "roadmap": 1, "cv_analysis": 2,
+                                      "project_evaluation": 3}
+
+    # Yüklenen dosyalar: boyut sınırları (okunurken uygulanır) ve ayrıştırma süreç havuzu (0: süreç yerine thread)
+    CV_UPLOAD_MAX_BYTES: int = 5 * 1024 * 1024
+    PROJECT_UPLOAD_MAX_BYTES: int = 20 * 1024 * 1024
+    UPLOAD_PARSE_WORKERS: int = 2
+    # Proje ZIP'lerinden okunacak en fazla açılmış bayt (toplam / dosya başına) ve dosya sayısı
+    ZIP_MAX_TOTAL_BYTES: int = 10 * 1024 * 1024
+    ZIP_MAX_FILE_BYTES: int = 1024 * 1024
+    ZIP_MAX_FILES: int = 500
+
+    # Motivasyon mesajı havuzu
+    MOTIVATIONAL_POOL_SIZE: int = 20
+    MOTIVATIONAL_POOL_REFRESH_SECONDS: int = 300
+    # Her worker ilk doldurmadan önce 0..bu kadar saniye rastgele bekler
+    MOTIVATIONAL_POOL_STARTUP_JITTER_SECONDS: int = 30
+
     class Config:
         env_file = ".env"
 